@@ -10,7 +10,13 @@ https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
 import os
 
 from django.core.asgi import get_asgi_application
+from django.urls import get_resolver
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'GSSC.settings')
 
 application = get_asgi_application()
+
+# Import the URLconf, and with it every view module, while the worker boots:
+# with a preloading server (gunicorn --preload) forked workers share these
+# pages and the first request does not pay for the imports.
+get_resolver().url_patterns
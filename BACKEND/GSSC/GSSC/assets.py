@@ -0,0 +1,309 @@
+"""
+Static files and the frontend build, served by Django itself.
+
+`npm run build` in FRONTEND/GSSC writes the SPA to FRONTEND/GSSC/dist,
+`manage.py collectstatic` collects it into STATIC_ROOT together with the
+admin's files through CompressedManifestStaticFilesStorage:
+
+    - every file also gets a content hashed copy (app.3f2a91c0d4e5.css) and
+      index.html references those, so a deploy never serves stale assets
+    - text files get .gz (and .br with the 'brotli' package) variants next
+      to them, compressed once at build time instead of on every request
+
+StaticAssetMiddleware indexes STATIC_ROOT in memory when the worker starts,
+so serving a file is a dict lookup and an open(), no per-request stat or
+path resolution. Hashed files are sent with a one year `immutable`
+Cache-Control, the others with MAX_AGE. Browser navigations to any other
+URL get the SPA's index.html (held in memory, revalidated with its ETag),
+React Router takes it from there. API calls don't ask for text/html and
+pass through, and API URLs opened in a browser (MIDDLEWARE_LANES
+['API_PREFIXES'] paths a view answers) are never the SPA. Files collected after the worker started are only seen
+after a restart, as with any deploy.
+"""
+
+import gzip
+import mimetypes
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.urls import Resolver404, resolve
+from django.utils.http import parse_etags
+
+from .lanes import lane_settings
+from .lazy import is_available, lazy_import
+
+brotli = lazy_import('brotli', feature='Brotli precompressed assets')
+
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+
+def asset_settings() -> dict:
+    config = {
+        'MAX_AGE': 60,
+        'INDEX': 'index.html',
+        'INDEX_EXCLUDE': ('admin/',),
+        # Vite content hashes everything under its assetsDir
+        'IMMUTABLE_PREFIXES': ('assets/',),
+        'COMPRESS_EXTENSIONS': ('.css', '.js', '.mjs', '.json', '.map', '.html', '.svg', '.txt', '.xml', '.ico'),
+        'COMPRESS_MIN_SIZE': 512,
+        'COMPRESS_WORKERS': 4,
+    }
+    config.update(getattr(settings, 'FRONTEND_ASSETS', {}))
+    return config
+
+
+#=============================================================
+# COLLECTSTATIC
+#=============================================================
+
+def compress_file(path: str) -> list:
+    """
+    Writes the .gz / .br variants of a file that are worth it, returns their paths
+    """
+    with open(path, 'rb') as source:
+        data = source.read()
+
+    written = []
+    for encoding, suffix in ENCODINGS:
+        if encoding == 'br' and not is_available('brotli'):
+            continue
+        target = path + suffix
+        if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(path):
+            written.append(target)
+            continue
+
+        # mtime=0 keeps the .gz identical between two builds of the same file
+        compressed = brotli.compress(data) if encoding == 'br' else gzip.compress(data, 9, mtime=0)
+        if len(compressed) >= len(data) * 0.95:
+            if os.path.exists(target):
+                os.remove(target)
+            continue
+
+        with open(target, 'wb') as output:
+            output.write(compressed)
+        written.append(target)
+
+    return written
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Hashed names plus precompressed variants, also rewrites the asset URLs of HTML files
+    """
+    patterns = ManifestStaticFilesStorage.patterns + (
+        (
+            '*.html',
+            (
+                (
+                    r"""(?P<matched>(?P<attribute>src|href)=["'](?P<url>[^"'#?]+)["'])""",
+                    '%(attribute)s="%(url)s"',
+                ),
+            ),
+        ),
+    )
+
+    def stored_name(self, name):
+        # Without any manifest (no collectstatic yet: development, tests)
+        # {% static %} falls back to the plain names instead of failing
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+
+        config = asset_settings()
+        extensions = tuple(config['COMPRESS_EXTENSIONS'])
+        names = set(paths) | set(self.hashed_files.values())
+        targets = [
+            self.path(name) for name in names
+            if name.endswith(extensions) and self.exists(name) and self.size(name) >= config['COMPRESS_MIN_SIZE']
+        ]
+
+        # zlib and brotli release the GIL
+        with ThreadPoolExecutor(max_workers=config['COMPRESS_WORKERS']) as pool:
+            list(pool.map(compress_file, targets))
+
+
+#=============================================================
+# SERVING
+#=============================================================
+
+@dataclass
+class Asset:
+    path: str
+    content_type: str
+    size: int
+    etag: str
+    cache_control: str
+    # encoding -> (path, size) of the precompressed variants
+    variants: dict = field(default_factory=dict)
+    # index.html is kept in memory, encoding -> bytes
+    content: dict = None
+
+
+def content_type_of(path: str) -> str:
+    content_type, _ = mimetypes.guess_type(path)
+    content_type = content_type or 'application/octet-stream'
+    if content_type.startswith('text/') or content_type in ('application/javascript', 'application/json', 'image/svg+xml'):
+        content_type += '; charset=utf-8'
+    return content_type
+
+
+def build_index(root: Path, static_url: str, hashed_names: set, config: dict) -> dict:
+    """
+    {url: Asset} of every file under root, one walk when the worker starts
+    """
+    immutable_prefixes = tuple(config['IMMUTABLE_PREFIXES'])
+    suffixes = tuple(suffix for _, suffix in ENCODINGS)
+    index = {}
+
+    for directory, _, filenames in os.walk(root):
+        present = set(filenames)
+        for filename in filenames:
+            if filename.endswith(suffixes) or filename == ManifestStaticFilesStorage.manifest_name:
+                continue
+
+            path = os.path.join(directory, filename)
+            name = Path(path).relative_to(root).as_posix()
+            stat = os.stat(path)
+            immutable = name in hashed_names or name.startswith(immutable_prefixes)
+
+            index[static_url + name] = Asset(
+                path=path,
+                content_type=content_type_of(path),
+                size=stat.st_size,
+                # Weak, the same ETag covers the identity and the compressed bodies
+                etag=f'W/"{stat.st_size:x}-{stat.st_mtime_ns:x}"',
+                cache_control=IMMUTABLE if immutable else f"public, max-age={config['MAX_AGE']}",
+                variants={
+                    encoding: (path + suffix, os.path.getsize(path + suffix))
+                    for encoding, suffix in ENCODINGS if filename + suffix in present
+                },
+            )
+
+    return index
+
+
+def accepted_encodings(request) -> set:
+    accepted = set()
+    for part in request.headers.get('Accept-Encoding', '').split(','):
+        token, _, params = part.strip().partition(';')
+        if params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            accepted.add(token.strip().lower())
+    return accepted
+
+
+class StaticAssetMiddleware:
+    """
+    Serves STATIC_ROOT and the SPA's index.html from an in-memory index,
+    goes right after SecurityMiddleware
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.config = asset_settings()
+
+        root = getattr(settings, 'STATIC_ROOT', None)
+        if not root or not os.path.isdir(root):
+            raise MiddlewareNotUsed('STATIC_ROOT has not been collected')
+
+        hashed_names = set(getattr(staticfiles_storage, 'hashed_files', {}).values())
+        self.static_url = settings.STATIC_URL
+        self.files = build_index(Path(root), self.static_url, hashed_names, self.config)
+
+        self.index = self.load_index()
+        prefix = settings.FORCE_SCRIPT_NAME or '/'
+        self.index_exclude = tuple(prefix + excluded for excluded in self.config['INDEX_EXCLUDE']) + (self.static_url,)
+        self.api_prefixes = tuple(lane_settings()['API_PREFIXES'])
+
+    def load_index(self):
+        """
+        The collected index.html with hashed asset URLs, None without a frontend build
+        """
+        name = self.config['INDEX']
+        try:
+            name = staticfiles_storage.stored_name(name)
+        except ValueError:
+            return None
+
+        asset = self.files.get(self.static_url + name)
+        if asset is None:
+            return None
+
+        content = {}
+        for encoding, (path, _) in [(None, (asset.path, asset.size)), *asset.variants.items()]:
+            with open(path, 'rb') as source:
+                content[encoding] = source.read()
+
+        return Asset(
+            path=asset.path,
+            content_type=asset.content_type,
+            size=asset.size,
+            etag=asset.etag,
+            cache_control='no-cache',
+            variants=asset.variants,
+            content=content,
+        )
+
+    def __call__(self, request):
+        if request.method in ('GET', 'HEAD'):
+            asset = self.files.get(request.path)
+            if asset is None and self.index is not None and self.is_navigation(request):
+                asset = self.index
+            if asset is not None:
+                return self.serve(request, asset)
+
+        return self.get_response(request)
+
+    def is_navigation(self, request) -> bool:
+        if 'text/html' not in request.headers.get('Accept', '') or request.path.startswith(self.index_exclude):
+            return False
+        if request.path_info.startswith(self.api_prefixes):
+            # API URLs stay the API when a browser opens them (CSV downloads,
+            # DRF pages). SPA routes sharing a prefix, /calculator/solar,
+            # match no URL pattern and still get the index.
+            try:
+                resolve(request.path_info)
+            except Resolver404:
+                return True
+            return False
+        return True
+
+    def serve(self, request, asset: Asset):
+        headers = {'ETag': asset.etag, 'Cache-Control': asset.cache_control}
+        if asset.variants:
+            headers['Vary'] = 'Accept-Encoding'
+
+        etags = parse_etags(request.headers.get('If-None-Match', ''))
+        if asset.etag in etags or '*' in etags:
+            response = HttpResponseNotModified()
+            for name, value in headers.items():
+                response[name] = value
+            return response
+
+        accepted = accepted_encodings(request)
+        encoding = next((encoding for encoding, _ in ENCODINGS if encoding in asset.variants and encoding in accepted), None)
+        path, size = asset.variants[encoding] if encoding else (asset.path, asset.size)
+        if encoding:
+            headers['Content-Encoding'] = encoding
+
+        if request.method == 'HEAD':
+            response = HttpResponse(content_type=asset.content_type, headers=headers)
+        elif asset.content is not None:
+            response = HttpResponse(asset.content[encoding], content_type=asset.content_type, headers=headers)
+        else:
+            response = FileResponse(open(path, 'rb'), content_type=asset.content_type, headers=headers)
+            response.headers.pop('Content-Disposition', None)
+        response['Content-Length'] = str(size)
+        return response
@@ -0,0 +1,382 @@
+"""
+Project-wide two-tier cache for GSSC project.
+
+L1  per-process LRU, no I/O, entries live at most L1_MAX_AGE seconds
+L2  settings.CACHES['default'], shared by every worker on the host
+
+Features:
+    - single-flight: concurrent misses for one key compute it once, in-process
+      through a per-key lock and across processes through a lock file in the
+      FileBasedCache directory (created with O_EXCL, its add() is a check
+      then a write, not atomic), or an add() on the backends where that is
+      atomic (memcached, Redis, locmem, database)
+    - jittered TTLs so entries written together do not expire together
+    - tags: invalidate_tags("catalog") drops every entry stored with that tag
+
+Usage:
+    @cached(ttl=600, tags=("catalog",))
+    def quotation_options(): ...
+
+    get_cache().get_or_set("key", compute, ttl=60, tags=("user:42",))
+"""
+
+import functools
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+
+MISSING = object()
+
+DEFAULTS = {
+    'ALIAS': 'default',
+    'L1_MAX_ENTRIES': 1024,
+    'L1_MAX_AGE': 5,
+    'JITTER': 0.1,
+    'LOCK_TIMEOUT': 10,
+    'LOCK_POLL': 0.05,
+}
+
+
+def make_key(*args, **kwargs) -> str:
+    payload = json.dumps([args, kwargs], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+class LRUCache:
+    """
+    L1: {key: (expires_at, value, tags)} in least recently used order
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+
+            expires_at, value, _ = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return MISSING
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, expires_at: float, tags=()):
+        with self._lock:
+            self._entries[key] = (expires_at, value, frozenset(tags))
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def drop_tags(self, tags):
+        tags = set(tags)
+        with self._lock:
+            for key in [k for k, (_, _, t) in self._entries.items() if t & tags]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class TwoTierCache:
+    def __init__(self, **options):
+        self.options = {**DEFAULTS, **options}
+        self.l1 = LRUCache(self.options['L1_MAX_ENTRIES'])
+        self.l2 = caches[self.options['ALIAS']]
+
+        self._flights = {}
+        self._flights_lock = threading.Lock()
+
+        self._stats_lock = threading.Lock()
+        self._stats = dict.fromkeys(
+            ('l1_hits', 'l2_hits', 'misses', 'stale', 'computes',
+             'waited', 'lock_timeouts', 'invalidations'),
+            0,
+        )
+
+    def _count(self, name: str, amount: int = 1):
+        with self._stats_lock:
+            self._stats[name] += amount
+
+    #=============================================================
+    # TAGS
+    #=============================================================
+
+    def _tag_versions(self, tags) -> dict:
+        """
+        Current version of each tag. Missing tags get a fresh time-based
+        version so an evicted tag key can never revalidate old entries.
+        """
+        if not tags:
+            return {}
+
+        keys = {f'tag:{tag}': tag for tag in tags}
+        found = self.l2.get_many(list(keys))
+
+        for key in keys:
+            if key not in found:
+                self.l2.add(key, time.time_ns(), None)
+                found[key] = self.l2.get(key)
+
+        return {keys[key]: version for key, version in found.items()}
+
+    def tag_version(self, tag):
+        """
+        Changes every time the tag is invalidated, usable as a data version
+        """
+        return self._tag_versions((tag,))[tag]
+
+    def invalidate_tags(self, *tags):
+        for tag in tags:
+            self.l2.set(f'tag:{tag}', time.time_ns(), None)
+        self.l1.drop_tags(tags)
+        self._count('invalidations', len(tags))
+
+    #=============================================================
+    # GET / SET
+    #=============================================================
+
+    def get(self, key):
+        """
+        Returns the cached value or MISSING
+        """
+        value = self.l1.get(key)
+        if value is not MISSING:
+            self._count('l1_hits')
+            return value
+
+        stored = self.l2.get(f'value:{key}')
+        if stored is None:
+            self._count('misses')
+            return MISSING
+
+        value, tag_versions, expires_at = stored
+        if tag_versions and self._tag_versions(tag_versions) != tag_versions:
+            self._count('stale')
+            self._count('misses')
+            return MISSING
+
+        self.l1.set(
+            key,
+            value,
+            min(expires_at, time.time() + self.options['L1_MAX_AGE']),
+            tag_versions,
+        )
+        self._count('l2_hits')
+        return value
+
+    def set(self, key, value, ttl: float = 300, tags=(), tag_versions=None):
+        """
+        tag_versions: the versions read before the value was computed. An
+        invalidation since then leaves the entry stale in L2 and keeps it
+        out of L1, instead of stamping old data with the new version.
+        """
+        jitter = self.options['JITTER']
+        ttl = ttl * random.uniform(1 - jitter, 1 + jitter)
+        expires_at = time.time() + ttl
+        current = self._tag_versions(tags)
+        if tag_versions is None:
+            tag_versions = current
+
+        self.l2.set(f'value:{key}', (value, tag_versions, expires_at), ttl)
+        if tag_versions == current:
+            self.l1.set(key, value, min(expires_at, time.time() + self.options['L1_MAX_AGE']), tags)
+
+    def delete(self, key):
+        self.l1.delete(key)
+        self.l2.delete(f'value:{key}')
+
+    #=============================================================
+    # SINGLE FLIGHT
+    #=============================================================
+
+    @contextmanager
+    def _flight(self, key):
+        with self._flights_lock:
+            lock, users = self._flights.get(key, (threading.Lock(), 0))
+            self._flights[key] = (lock, users + 1)
+
+        try:
+            with lock:
+                yield
+        finally:
+            with self._flights_lock:
+                lock, users = self._flights[key]
+                if users == 1:
+                    del self._flights[key]
+                else:
+                    self._flights[key] = (lock, users - 1)
+
+    def _lock_path(self, key):
+        # FileBasedCache keeps its directory in _dir, other backends have none
+        directory = getattr(self.l2, '_dir', None)
+        if directory is None:
+            return None
+        return os.path.join(directory, 'locks', hashlib.sha1(key.encode()).hexdigest() + '.lock')
+
+    def _acquire_lock(self, key) -> bool:
+        """
+        Takes the cross-process lock of a key, False when another process holds it
+        """
+        path = self._lock_path(key)
+        if path is None:
+            return self.l2.add(f'lock:{key}', 1, self.options['LOCK_TIMEOUT'])
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        for _ in range(2):
+            try:
+                os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return True
+            except FileExistsError:
+                pass
+
+            try:
+                if time.time() - os.path.getmtime(path) < self.options['LOCK_TIMEOUT']:
+                    return False
+                # Left behind by a process that died while computing
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+        return False
+
+    def _release_lock(self, key):
+        path = self._lock_path(key)
+        if path is None:
+            self.l2.delete(f'lock:{key}')
+            return
+
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _compute(self, key, compute, ttl, tags):
+        # Read before computing: data the value was built from may change meanwhile
+        tag_versions = self._tag_versions(tags)
+        value = compute()
+        self._count('computes')
+        self.set(key, value, ttl, tags, tag_versions)
+        return value
+
+    def get_or_set(self, key, compute, ttl: float = 300, tags=()):
+        value = self.get(key)
+        if value is not MISSING:
+            return value
+
+        # Only one thread per process goes on, the rest wait here and
+        # usually find the value on their second look
+        with self._flight(key):
+            value = self.get(key)
+            if value is not MISSING:
+                return value
+
+            lock_timeout = self.options['LOCK_TIMEOUT']
+
+            if self._acquire_lock(key):
+                try:
+                    return self._compute(key, compute, ttl, tags)
+                finally:
+                    self._release_lock(key)
+
+            # Another process holds the lock, wait for its result
+            deadline = time.monotonic() + lock_timeout
+            while time.monotonic() < deadline:
+                time.sleep(self.options['LOCK_POLL'])
+                value = self.get(key)
+                if value is not MISSING:
+                    self._count('waited')
+                    return value
+
+            self._count('lock_timeouts')
+            return self._compute(key, compute, ttl, tags)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+
+        lookups = stats['l1_hits'] + stats['l2_hits'] + stats['misses']
+        stats['l1_entries'] = len(self.l1)
+        stats['hit_rate'] = round((stats['l1_hits'] + stats['l2_hits']) / lookups, 4) if lookups else 0.0
+        return stats
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> TwoTierCache:
+    global _cache
+
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = TwoTierCache(**getattr(settings, 'GSSC_CACHE', {}))
+
+    return _cache
+
+
+def reset_cache():
+    """
+    Forgets this process' cache, the next get_cache() reads the settings again
+    """
+    global _cache
+    with _cache_lock:
+        _cache = None
+
+
+def invalidate_tags(*tags):
+    get_cache().invalidate_tags(*tags)
+
+
+def cached(ttl: float = 300, tags=(), key=None):
+    """
+    Caches a function's return value in the two-tier cache.
+
+    tags  tuple of tags, or a callable taking the function's arguments
+    key   callable building the key from the function's arguments,
+          defaults to a hash of all arguments
+
+    Cached values are shared between callers, treat them as read-only.
+    """
+    def decorator(func):
+        prefix = f'{func.__module__}.{func.__qualname__}'
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            suffix = key(*args, **kwargs) if key else make_key(*args, **kwargs)
+            entry_tags = tags(*args, **kwargs) if callable(tags) else tags
+
+            return get_cache().get_or_set(
+                f'{prefix}:{suffix}',
+                lambda: func(*args, **kwargs),
+                ttl,
+                entry_tags,
+            )
+
+        wrapper.uncached = func
+        return wrapper
+
+    return decorator
@@ -0,0 +1,98 @@
+"""
+Middleware lanes: the JSON API skips the browser-session middleware.
+
+The API authenticates with JWT bearer tokens; it never reads a session,
+never shows a flash message and its DRF views are CSRF exempt. Only the
+admin (and future server rendered pages) need SessionMiddleware,
+CsrfViewMiddleware, AuthenticationMiddleware and MessageMiddleware.
+
+Each of them is replaced in MIDDLEWARE by a Lean* subclass that passes
+requests under MIDDLEWARE_LANES['API_PREFIXES'] straight through:
+
+    API lane     /price-tracker/  /calculator/  /quotation/  /auth/  /ai-chatbot/
+                 no session, no CSRF cookie, no message storage,
+                 request.user is anonymous until DRF's JWT authentication sets it
+    full lane    everything else, /admin/ included, exactly as before
+
+The order of MIDDLEWARE stays the same and the admin's system checks
+still find their middleware (subclasses count). `manage.py bench_middleware`
+measures both lanes against the stock stack.
+"""
+
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.messages.middleware import MessageMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.middleware.csrf import CsrfViewMiddleware
+
+
+def lane_settings() -> dict:
+    config = {
+        'API_PREFIXES': ('/price-tracker/', '/calculator/', '/quotation/', '/auth/', '/ai-chatbot/'),
+    }
+    config.update(getattr(settings, 'MIDDLEWARE_LANES', {}))
+    return config
+
+
+class APILaneMixin:
+    """
+    Skips the middleware for requests on the API lane
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        # Read once per handler, the check per request is one startswith()
+        self.api_prefixes = tuple(lane_settings()['API_PREFIXES'])
+
+    def on_api_lane(self, request) -> bool:
+        return request.path_info.startswith(self.api_prefixes)
+
+    def __call__(self, request):
+        if self.on_api_lane(request):
+            self.skipped(request)
+            # A coroutine in async mode, returned as is like MiddlewareMixin does
+            return self.get_response(request)
+        return super().__call__(request)
+
+    def skipped(self, request):
+        """
+        Whatever an API request still needs from the skipped middleware
+        """
+
+
+class LeanSessionMiddleware(APILaneMixin, SessionMiddleware):
+    pass
+
+
+class LeanCsrfViewMiddleware(APILaneMixin, CsrfViewMiddleware):
+    def process_view(self, request, callback, callback_args, callback_kwargs):
+        # Registered by the handler on its own, __call__ doesn't cover it
+        if self.on_api_lane(request):
+            return None
+        return super().process_view(request, callback, callback_args, callback_kwargs)
+
+
+class LeanAuthenticationMiddleware(APILaneMixin, AuthenticationMiddleware):
+    def skipped(self, request):
+        request.user = AnonymousUser()
+
+
+class LeanMessageMiddleware(APILaneMixin, MessageMiddleware):
+    pass
+
+
+# Lean middleware -> the stock one it replaces
+STOCK_MIDDLEWARE = {
+    'GSSC.lanes.LeanSessionMiddleware': 'django.contrib.sessions.middleware.SessionMiddleware',
+    'GSSC.lanes.LeanCsrfViewMiddleware': 'django.middleware.csrf.CsrfViewMiddleware',
+    'GSSC.lanes.LeanAuthenticationMiddleware': 'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'GSSC.lanes.LeanMessageMiddleware': 'django.contrib.messages.middleware.MessageMiddleware',
+}
+
+
+def stock_middleware(middleware=None) -> list:
+    """
+    MIDDLEWARE with every lean middleware swapped back for the stock one
+    """
+    return [STOCK_MIDDLEWARE.get(path, path) for path in (middleware or settings.MIDDLEWARE)]
@@ -0,0 +1,51 @@
+"""
+Lazy imports for heavy or optional subsystems.
+
+Modules such as numpy, a PDF renderer or the chatbot index cost tens of
+milliseconds and megabytes to import. Every worker boot and every
+`manage.py` call would pay for them even though most never use them, so
+they are imported on first use instead:
+
+    np = lazy_import('numpy', feature='Monte Carlo sizing')
+
+    def simulate(...):
+        samples = np.random.default_rng(seed)...   # imported here, once
+
+    if is_available('numpy'):                      # no import, just a lookup
+        ...
+
+`manage.py profile_imports` shows what a cold start imports,
+`manage.py bench_startup` checks boot time and RSS against STARTUP_BUDGET.
+"""
+
+import importlib
+import importlib.util
+
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.functional import SimpleLazyObject
+
+
+def is_available(name: str) -> bool:
+    """
+    Whether the module can be imported, without importing it
+    """
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def lazy_import(name: str, feature: str = None):
+    """
+    Proxy for a module that is imported on first attribute access.
+    A missing optional dependency raises ImproperlyConfigured when used.
+    """
+    def load():
+        try:
+            return importlib.import_module(name)
+        except ImportError as error:
+            raise ImproperlyConfigured(
+                f"{feature or name} needs the '{name}' package, install it to enable this feature"
+            ) from error
+
+    return SimpleLazyObject(load)
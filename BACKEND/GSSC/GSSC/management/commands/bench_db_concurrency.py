@@ -0,0 +1,120 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark catalog reads running alongside quotation-style writes on SQLite, "
+        "default rollback journal vs. the pragmas from settings.SQLITE_PRAGMAS"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--readers", type=int, default=4)
+        parser.add_argument("--writers", type=int, default=2)
+        parser.add_argument("--seconds", type=float, default=3.0)
+        parser.add_argument("--rows", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        modes = {
+            "rollback journal": ["PRAGMA journal_mode=DELETE", "PRAGMA busy_timeout=5000"],
+            "settings pragmas": settings.SQLITE_PRAGMAS,
+        }
+
+        self.stdout.write(
+            f"{options['readers']} readers, {options['writers']} writers, "
+            f"{options['seconds']}s per mode, {options['rows']} catalog rows"
+        )
+        self.stdout.write(
+            f"{'mode':<18} {'reads/s':>9} {'writes/s':>9} {'read p50 ms':>12} {'read p99 ms':>12}"
+        )
+
+        for name, pragmas in modes.items():
+            with tempfile.TemporaryDirectory() as tmp:
+                result = self.run_mode(os.path.join(tmp, "bench.sqlite3"), pragmas, options)
+
+            self.stdout.write(
+                f"{name:<18} {result['reads']:>9.0f} {result['writes']:>9.0f} "
+                f"{result['p50']:>12.2f} {result['p99']:>12.2f}"
+            )
+
+    def connect(self, path, pragmas):
+        connection = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+        for pragma in pragmas:
+            connection.execute(pragma)
+        return connection
+
+    def run_mode(self, path, pragmas, options):
+        setup = self.connect(path, pragmas)
+        setup.execute(
+            "CREATE TABLE product (id INTEGER PRIMARY KEY, category TEXT, company TEXT, price REAL)"
+        )
+        setup.execute("CREATE TABLE quotation (id INTEGER PRIMARY KEY, items TEXT, total REAL)")
+        setup.executemany(
+            "INSERT INTO product (category, company, price) VALUES (?, ?, ?)",
+            [(("solar_panel", "inverter", "battery")[i % 3], f"Company {i}", 1000 + i)
+             for i in range(options["rows"])],
+        )
+        setup.close()
+
+        stop = threading.Event()
+        read_latencies = []
+        write_counts = []
+        lock = threading.Lock()
+
+        def reader():
+            connection = self.connect(path, pragmas)
+            latencies = []
+            while not stop.is_set():
+                start = time.perf_counter()
+                connection.execute(
+                    "SELECT id, company, price FROM product WHERE category = ? "
+                    "ORDER BY id DESC LIMIT 10",
+                    ("solar_panel",),
+                ).fetchall()
+                latencies.append(time.perf_counter() - start)
+            connection.close()
+            with lock:
+                read_latencies.extend(latencies)
+
+        def writer():
+            connection = self.connect(path, pragmas)
+            count = 0
+            while not stop.is_set():
+                connection.execute("BEGIN IMMEDIATE")
+                connection.execute(
+                    "INSERT INTO quotation (items, total) VALUES (?, ?)", ('[{"qty": 1}]', 1000.0)
+                )
+                # Time spent inside the transaction, e.g. serializing items
+                time.sleep(0.002)
+                connection.execute("COMMIT")
+                count += 1
+            connection.close()
+            with lock:
+                write_counts.append(count)
+
+        threads = (
+            [threading.Thread(target=reader) for _ in range(options["readers"])]
+            + [threading.Thread(target=writer) for _ in range(options["writers"])]
+        )
+        for thread in threads:
+            thread.start()
+        time.sleep(options["seconds"])
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        read_latencies.sort()
+        count = len(read_latencies) or 1
+
+        return {
+            "reads": len(read_latencies) / options["seconds"],
+            "writes": sum(write_counts) / options["seconds"],
+            "p50": read_latencies[count // 2] * 1000 if read_latencies else 0.0,
+            "p99": read_latencies[min(count - 1, int(count * 0.99))] * 1000 if read_latencies else 0.0,
+        }
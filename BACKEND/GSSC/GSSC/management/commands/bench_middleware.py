@@ -0,0 +1,106 @@
+import gc
+import statistics
+import time
+
+from django.conf import settings
+from django.core.handlers.base import BaseHandler
+from django.core.management.base import BaseCommand
+from django.http import JsonResponse
+from django.test import override_settings
+from django.test.client import RequestFactory
+from django.urls import re_path
+from django.views.decorators.csrf import csrf_exempt
+
+from GSSC.lanes import stock_middleware
+
+
+@csrf_exempt
+def empty_view(request):
+    """
+    Does nothing, so only the middleware and the URL resolution are timed.
+    CSRF exempt like every DRF view.
+    """
+    return JsonResponse({})
+
+
+# URLconf of the benchmark requests, every path goes to empty_view
+urlpatterns = [re_path(r"", empty_view)]
+
+CASES = (
+    ("API GET /price-tracker/", "get", "/price-tracker/"),
+    ("API POST /quotation/calculate/", "post", "/quotation/calculate/"),
+    ("admin GET /admin/", "get", "/admin/"),
+)
+
+
+def percentiles(latencies: list) -> tuple:
+    ordered = sorted(latencies)
+    return (
+        statistics.mean(ordered) * 1e6,
+        ordered[len(ordered) // 2] * 1e6,
+        ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1e6,
+    )
+
+
+def load_handler(middleware: list) -> BaseHandler:
+    with override_settings(MIDDLEWARE=middleware):
+        handler = BaseHandler()
+        handler.load_middleware()
+    return handler
+
+
+class Command(BaseCommand):
+    help = (
+        "Per-request cost of the middleware stack, stock Django middleware vs "
+        "the lanes of GSSC/lanes.py, measured around an empty view"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=20_000)
+
+    def handle(self, *args, **options):
+        stacks = {
+            "stock": load_handler(stock_middleware()),
+            "lanes": load_handler(list(settings.MIDDLEWARE)),
+        }
+
+        self.stdout.write(f"{options['requests']} requests per case, microseconds per request")
+        self.stdout.write(
+            f"{'case':<32} {'stack':<6} {'mean':>8} {'p50':>8} {'p99':>8} {'saved':>7}"
+        )
+        for name, method, path in CASES:
+            results = {stack: self.measure(handler, method, path, options["requests"])
+                       for stack, handler in stacks.items()}
+            saved = 1 - results["lanes"][0] / results["stock"][0]
+            for stack, row in results.items():
+                self.stdout.write(
+                    f"{name:<32} {stack:<6} {row[0]:>8.1f} {row[1]:>8.1f} {row[2]:>8.1f} "
+                    + (f"{saved:>6.0%}" if stack == "lanes" else "")
+                )
+
+    def measure(self, handler: BaseHandler, method: str, path: str, requests: int) -> tuple:
+        factory = RequestFactory(HTTP_HOST="localhost")
+
+        def build():
+            if method == "post":
+                request = factory.post(path, data=b'{"items": []}', content_type="application/json")
+            else:
+                request = factory.get(path, HTTP_ACCEPT="application/json")
+            request.urlconf = __name__
+            return request
+
+        for _ in range(min(requests, 500)):
+            handler.get_response(build())
+
+        latencies = []
+        gc.disable()
+        try:
+            for _ in range(requests):
+                request = build()
+                start = time.perf_counter()
+                handler.get_response(request)
+                latencies.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+
+        return percentiles(latencies)
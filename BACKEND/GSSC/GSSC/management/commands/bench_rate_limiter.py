@@ -0,0 +1,136 @@
+import multiprocessing
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+from django.test.client import RequestFactory
+from rest_framework.request import Request
+
+from GSSC.throttling import BucketStore, TokenBucketThrottle, rate_limit_settings, reset_rate_limits
+
+
+def consume_loop(path, worker, requests, keys, queue):
+    """
+    One worker process hammering the shared store, reports its latencies
+    """
+    store = BucketStore(path)
+    latencies = []
+    busy = 0
+    for i in range(requests):
+        key = f"ip:10.0.{worker}.{i % keys}"
+        start = time.perf_counter()
+        try:
+            store.consume(key, 1, 1e9, 1e9)
+        except sqlite3.Error:
+            busy += 1   # the throttle lets these requests through
+        latencies.append(time.perf_counter() - start)
+    queue.put((latencies, busy))
+
+
+def percentiles(latencies: list) -> tuple:
+    ordered = sorted(latencies)
+    return (
+        statistics.mean(ordered) * 1e6,
+        ordered[len(ordered) // 2] * 1e6,
+        ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1e6,
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark of the token bucket limiter: overhead of one throttle check, "
+        "of a denied request and of the shared store under concurrent workers"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=20_000)
+        parser.add_argument("--keys", type=int, default=500, help="distinct clients")
+        parser.add_argument("--processes", type=int, default=4)
+        parser.add_argument("--budget-us", type=float, default=500,
+                            help="fail when a throttle check's p99 is above this")
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bench-rate-limits.sqlite3")
+            config = rate_limit_settings()
+            config["DATABASE"] = path
+
+            with override_settings(RATE_LIMITS=config):
+                allowed = self.throttle_checks(options, capacity=1e9)
+                denied = self.throttle_checks(options, capacity=1)
+                reset_rate_limits()
+
+            concurrent, throughput, busy = self.concurrent(path, options)
+
+        self.stdout.write(
+            f"{options['requests']} requests over {options['keys']} clients, "
+            f"{options['processes']} processes for the shared store"
+        )
+        self.stdout.write(f"{'case':<28} {'mean us':>9} {'p50 us':>9} {'p99 us':>9}")
+        for name, row in (
+            ("throttle check, allowed", allowed),
+            ("throttle check, denied", denied),
+            ("store, concurrent workers", concurrent),
+        ):
+            self.stdout.write(f"{name:<28} {row[0]:>9.1f} {row[1]:>9.1f} {row[2]:>9.1f}")
+        self.stdout.write(
+            f"shared store throughput: {throughput:,.0f} consumes/s, "
+            f"{busy} let through on a busy store"
+        )
+
+        if allowed[2] > options["budget_us"]:
+            raise CommandError(
+                f"throttle check p99 {allowed[2]:.0f} us is over the {options['budget_us']:.0f} us budget"
+            )
+        self.stdout.write(self.style.SUCCESS(f"Within budget ({options['budget_us']:.0f} us p99)"))
+
+    def throttle_checks(self, options, capacity: float) -> tuple:
+        """
+        Latency of TokenBucketThrottle.allow_request, as DRF calls it per request
+        """
+        reset_rate_limits()
+        config = rate_limit_settings()
+        config["ANON"] = {"CAPACITY": capacity, "REFILL_PER_SECOND": 1e-6}
+        factory = RequestFactory()
+        requests = [
+            Request(factory.get("/price-tracker/", REMOTE_ADDR=f"10.1.{i // 250}.{i % 250}"))
+            for i in range(options["keys"])
+        ]
+        throttle = TokenBucketThrottle()
+
+        latencies = []
+        with override_settings(RATE_LIMITS=config):
+            for i in range(options["requests"]):
+                request = requests[i % len(requests)]
+                start = time.perf_counter()
+                throttle.allow_request(request, None)
+                latencies.append(time.perf_counter() - start)
+
+        return percentiles(latencies)
+
+    def concurrent(self, path, options):
+        BucketStore(path).connection().close()   # schema and WAL mode in place before the race
+
+        context = multiprocessing.get_context("fork")
+        queue = context.Queue()
+        per_process = options["requests"] // options["processes"]
+        workers = [
+            context.Process(target=consume_loop, args=(path, worker, per_process, options["keys"], queue))
+            for worker in range(options["processes"])
+        ]
+
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        results = [queue.get() for _ in workers]
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+
+        latencies = [latency for worker_latencies, _ in results for latency in worker_latencies]
+        busy = sum(worker_busy for _, worker_busy in results)
+        return percentiles(latencies), len(latencies) / elapsed, busy
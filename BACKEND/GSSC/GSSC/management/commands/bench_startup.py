@@ -0,0 +1,51 @@
+import statistics
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from GSSC.startup import TARGETS, measure
+
+
+class Command(BaseCommand):
+    help = (
+        "Cold start benchmark: boot time and RSS of fresh interpreters, "
+        "fails when over settings.STARTUP_BUDGET"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--target", choices=sorted(TARGETS), default="wsgi")
+        parser.add_argument("--runs", type=int, default=5)
+
+    def handle(self, *args, **options):
+        target = options["target"]
+        budget = {"BOOT_SECONDS": 1.0, "RSS_MB": 80}
+        budget.update(getattr(settings, "STARTUP_BUDGET", {}).get(target, {}))
+
+        runs = [measure(target) for _ in range(options["runs"])]
+
+        boot = statistics.median(run["seconds"] for run in runs)
+        rss_mb = max(run["rss"] for run in runs) / 1024 / 1024
+        anon = [run["rss_anon"] for run in runs if run["rss_anon"] is not None]
+
+        self.stdout.write(
+            f"{target}: boot median {boot * 1000:.0f} ms "
+            f"(min {min(run['seconds'] for run in runs) * 1000:.0f}, "
+            f"max {max(run['seconds'] for run in runs) * 1000:.0f}) over {len(runs)} runs"
+        )
+        self.stdout.write(
+            f"RSS {rss_mb:.1f} MB"
+            + (f", anonymous {max(anon) / 1024 / 1024:.1f} MB" if anon else "")
+        )
+
+        over = []
+        if boot > budget["BOOT_SECONDS"]:
+            over.append(f"boot {boot:.2f}s > {budget['BOOT_SECONDS']}s")
+        if rss_mb > budget["RSS_MB"]:
+            over.append(f"RSS {rss_mb:.1f} MB > {budget['RSS_MB']} MB")
+
+        if over:
+            raise CommandError(f"{target} is over its startup budget: {', '.join(over)}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Within budget ({budget['BOOT_SECONDS']}s, {budget['RSS_MB']} MB)"
+        ))
@@ -0,0 +1,52 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+
+from GSSC.startup import TARGETS, import_profile
+
+
+def package_of(module: str) -> str:
+    parts = module.split(".")
+    # APPS.QUOTATION_GENERATOR, django.db, rest_framework.generics, ...
+    return ".".join(parts[:2]) if parts[0] in ("APPS", "django", "GSSC") else parts[0]
+
+
+class Command(BaseCommand):
+    help = (
+        "Import-time report of a cold start (python -X importtime): "
+        "slowest modules and time per package"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--target", choices=sorted(TARGETS), default="wsgi")
+        parser.add_argument("--limit", type=int, default=20)
+
+    def handle(self, *args, **options):
+        rows = import_profile(options["target"])
+        limit = options["limit"]
+
+        total_us = sum(cumulative for _, _, cumulative, depth in rows if depth == 0)
+        project_us = sum(self_us for name, self_us, _, _ in rows if name.split(".")[0] in ("APPS", "GSSC"))
+
+        self.stdout.write(
+            f"{options['target']}: {len(rows)} modules imported in {total_us / 1000:.1f} ms, "
+            f"{project_us / 1000:.1f} ms of it in project code"
+        )
+
+        self.stdout.write("\nSlowest top-level imports (cumulative, includes what they import):")
+        top_level = [row for row in rows if row[3] == 0]
+        for name, _, cumulative_us, _ in sorted(top_level, key=lambda row: -row[2])[:limit]:
+            self.stdout.write(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+        packages = defaultdict(int)
+        for name, self_us, _, _ in rows:
+            packages[package_of(name)] += self_us
+
+        self.stdout.write("\nTime per package (self time only):")
+        for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[:limit]:
+            self.stdout.write(f"  {self_us / 1000:8.1f} ms  {package}")
+
+        project = [row for row in rows if row[0].split(".")[0] in ("APPS", "GSSC")]
+        self.stdout.write("\nProject modules (cumulative):")
+        for name, _, cumulative_us, _ in sorted(project, key=lambda row: -row[2])[:limit]:
+            self.stdout.write(f"  {cumulative_us / 1000:8.1f} ms  {name}")
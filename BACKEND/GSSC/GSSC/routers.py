@@ -0,0 +1,102 @@
+"""
+Database routing for GSSC project.
+
+Reads of the apps listed in REPLICA_APP_LABELS go to one of the
+DATABASE_REPLICAS aliases, everything else uses the primary ('default').
+
+Read-your-writes: once a request writes anything, or opens a transaction on
+the primary, every later read in that request is pinned to the primary so
+it never sees a replica that is behind. The pin lives in a pinning_scope(),
+ReplicaPinningMiddleware opens one per request. Outside any scope (management
+commands, background threads) reads use the primary, nothing tracks their
+writes there.
+"""
+
+import itertools
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+PRIMARY_DB = 'default'
+
+# None outside any pinning_scope()
+_pinned_to_primary = ContextVar('pinned_to_primary', default=None)
+_replica_cycle = None
+_replica_cycle_key = None
+_replica_lock = threading.Lock()
+
+
+@contextmanager
+def pinning_scope(pinned: bool = False):
+    """
+    Replica reads until the first write inside the block, the pin ends with it
+    """
+    token = _pinned_to_primary.set(pinned)
+    try:
+        yield
+    finally:
+        _pinned_to_primary.reset(token)
+
+
+def pin_to_primary():
+    # Outside a scope everything is on the primary already
+    if _pinned_to_primary.get() is False:
+        _pinned_to_primary.set(True)
+
+
+def is_pinned_to_primary() -> bool:
+    return _pinned_to_primary.get() is not False
+
+
+def _next_replica():
+    """
+    Round-robin over DATABASE_REPLICAS, rebuilt if the setting changes
+    """
+    global _replica_cycle, _replica_cycle_key
+
+    replicas = tuple(getattr(settings, 'DATABASE_REPLICAS', ()))
+    if not replicas:
+        return None
+
+    with _replica_lock:
+        if replicas != _replica_cycle_key:
+            _replica_cycle = itertools.cycle(replicas)
+            _replica_cycle_key = replicas
+        return next(_replica_cycle)
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label not in getattr(settings, 'REPLICA_APP_LABELS', ()):
+            return PRIMARY_DB
+
+        if is_pinned_to_primary() or connections[PRIMARY_DB].in_atomic_block:
+            return PRIMARY_DB
+
+        return _next_replica() or PRIMARY_DB
+
+    def db_for_write(self, model, **hints):
+        pin_to_primary()
+        return PRIMARY_DB
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {PRIMARY_DB, *getattr(settings, 'DATABASE_REPLICAS', ())}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive schema changes from the primary
+        return db not in getattr(settings, 'DATABASE_REPLICAS', ())
+
+
+class ReplicaPinningMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with pinning_scope(pinned=request.method not in ('GET', 'HEAD', 'OPTIONS')):
+            return self.get_response(request)
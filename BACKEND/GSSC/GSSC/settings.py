@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import os
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -38,8 +40,11 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'rest_framework',
-    'rest_framework_simplejwt',
+    # 'rest_framework_simplejwt' only ships translations, as an app its
+    # settings module drags django.test and unittest into every cold start
     'corsheaders',
+    # Project-wide management commands: benchmarks of the GSSC/* layers
+    'GSSC',
     'APPS.AI_CHATBOT',
     'APPS.AUTHENTICATION',
     'APPS.CALCULATOR',
@@ -51,11 +56,14 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'GSSC.assets.StaticAssetMiddleware',
+    'GSSC.routers.ReplicaPinningMiddleware',
+    # Lean*: skipped on the JSON API lane (MIDDLEWARE_LANES), see GSSC/lanes.py
+    'GSSC.lanes.LeanSessionMiddleware',
     'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
+    'GSSC.lanes.LeanCsrfViewMiddleware',
+    'GSSC.lanes.LeanAuthenticationMiddleware',
+    'GSSC.lanes.LeanMessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
@@ -82,13 +90,123 @@ WSGI_APPLICATION = 'GSSC.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
-DATABASES = {
+# Environment driven:
+#   DB_ENGINE=sqlite (default) or postgres
+#   DB_NAME          SQLite file, unset = the development db.sqlite3 in the repo
+#   DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT  (postgres)
+#   DB_CONN_MAX_AGE  seconds a connection is reused, 0 = reconnect per request
+#   DB_POOL=1        use psycopg's connection pool instead (postgres only)
+
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite')
+DB_CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE', 60))
+
+# Applied on every new SQLite connection. WAL lets catalog readers keep
+# reading while a quotation save is writing, busy_timeout makes writers
+# wait for each other instead of failing with "database is locked".
+SQLITE_PRAGMAS = [
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA busy_timeout=5000',
+    'PRAGMA foreign_keys=ON',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA cache_size=-20000',
+    'PRAGMA mmap_size=134217728',
+]
+
+if DB_ENGINE == 'postgres':
+    DB_POOL = os.environ.get('DB_POOL', '0') == '1'
+
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'gssc'),
+            'USER': os.environ.get('DB_USER', 'gssc'),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', 'localhost'),
+            'PORT': os.environ.get('DB_PORT', '5432'),
+            # Persistent connections and the pool are mutually exclusive
+            'CONN_MAX_AGE': 0 if DB_POOL else DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'pool': {'min_size': 2, 'max_size': 10} if DB_POOL else False,
+            },
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'timeout': 5,
+                # Take the write lock at BEGIN so concurrent writers queue on
+                # busy_timeout instead of deadlocking on lock upgrade
+                'transaction_mode': 'IMMEDIATE',
+                # WAL rewrites the header of the tracked db.sqlite3 and leaves
+                # -wal/-shm files beside it, only a DB_NAME of its own gets it
+                'init_command': ';'.join(
+                    pragma for pragma in SQLITE_PRAGMAS
+                    if 'DB_NAME' in os.environ or not pragma.startswith('PRAGMA journal_mode')
+                ),
+            },
+            # A file rather than the shared in-memory database, so tests can
+            # write from several threads the way workers do
+            'TEST': {'NAME': os.path.join(tempfile.gettempdir(), 'gssc-test.sqlite3')},
+        }
+    }
+
+# Read replicas, see GSSC/routers.py
+#   DB_REPLICAS  comma separated SQLite files or PostgreSQL hosts, e.g.
+#                DB_REPLICAS=/srv/gssc/replica-1.sqlite3,/srv/gssc/replica-2.sqlite3
+# Keeping replicas up to date (streaming replication, litestream, ...) is
+# up to the deployment. Tests mirror them onto the default database.
+DATABASE_REPLICAS = []
+
+for number, replica in enumerate(filter(None, os.environ.get('DB_REPLICAS', '').split(',')), start=1):
+    alias = f'replica_{number}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        ('HOST' if DB_ENGINE == 'postgres' else 'NAME'): replica.strip(),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['GSSC.routers.PrimaryReplicaRouter']
+
+# Reads of these apps go to a replica unless the request already wrote
+REPLICA_APP_LABELS = ['PRICE_TRACKER']
+
+
+# Cache
+# https://docs.djangoproject.com/en/6.0/topics/cache/
+# The file cache is shared by every worker on the host. GSSC/cache.py puts
+# a per-process LRU in front of it, see GSSC_CACHE.
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('CACHE_DIR', os.path.join(tempfile.gettempdir(), 'gssc-cache')),
+        'TIMEOUT': 300,
+        'KEY_PREFIX': 'gssc',
+        'OPTIONS': {
+            'MAX_ENTRIES': 20000,
+        },
     }
 }
 
+# `manage.py test` gives the cache a temporary directory of its own
+TEST_RUNNER = 'GSSC.test_runner.TestRunner'
+
+GSSC_CACHE = {
+    'ALIAS': 'default',
+    'L1_MAX_ENTRIES': 1024,   # per-process LRU size
+    'L1_MAX_AGE': 5,          # seconds before a worker re-checks the shared cache
+    'JITTER': 0.1,            # TTLs are spread by +/- 10%
+    'LOCK_TIMEOUT': 10,       # seconds other workers wait for a value being computed
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -126,9 +244,24 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# `manage.py collectstatic` output, served by GSSC.assets.StaticAssetMiddleware
+STATIC_ROOT = Path(os.environ.get('STATIC_ROOT', BASE_DIR / 'staticfiles'))
+
+# Production build of the frontend (`npm run build` in FRONTEND/GSSC), collected with the admin's files
+FRONTEND_DIST = Path(os.environ.get('FRONTEND_DIST', BASE_DIR.parent.parent / 'FRONTEND' / 'GSSC' / 'dist'))
+STATICFILES_DIRS = [FRONTEND_DIST] if FRONTEND_DIST.is_dir() else []
+
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    # Content hashed names plus precompressed .gz / .br variants, see GSSC/assets.py
+    'staticfiles': {'BACKEND': 'GSSC.assets.CompressedManifestStaticFilesStorage'},
+}
+
 # --- AUTH & CORS CONFIG ---
 from datetime import timedelta
 
+from corsheaders.defaults import default_headers
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
@@ -136,6 +269,10 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    # Reverse proxies in front of Django. The client IP of a throttle bucket
+    # is X-Forwarded-For's entry this many hops back, 0 = REMOTE_ADDR only.
+    # Never trust the header without a proxy that overwrites it.
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', 0)),
 }
 
 SIMPLE_JWT = {
@@ -149,7 +286,136 @@ CORS_ALLOWED_ORIGINS = [
     "http://127.0.0.1:5173",
 ]
 
+CORS_ALLOW_HEADERS = (*default_headers, "idempotency-key")
+
 CSRF_TRUSTED_ORIGINS = [
     "http://localhost:5173",
     "http://127.0.0.1:5173",
-]
\ No newline at end of file
+]
+# --- PASSWORD HASHING ---
+# Password checks run in a bounded thread pool, see APPS/AUTHENTICATION/hashing.py
+AUTHENTICATION_BACKENDS = [
+    'APPS.AUTHENTICATION.backends.PooledModelBackend',
+]
+
+PASSWORD_HASHING_POOL = {
+    'MAX_WORKERS': 4,     # hashes running at the same time
+    'MAX_PENDING': 16,    # hashes allowed to wait, beyond this login returns 429
+    'TIMEOUT': 10,        # seconds a request waits for its hash
+    'RETRY_AFTER': 1,     # Retry-After header sent with 429
+}
+
+# --- LIVE PRICES ---
+# Server-Sent Events at /price-tracker/stream/ (ASGI only), see PRICE_TRACKER/live.py
+LIVE_PRICES = {
+    'POLL_INTERVAL': 1.0,        # seconds between two reads of the change feed, per process
+    'QUEUE_SIZE': 32,            # frames buffered per client before it is told to resync
+    'KEEPALIVE': 15,             # seconds between keepalive comments on an idle stream
+    'MAX_SUBSCRIBERS': 10_000,   # open streams per process, beyond this 503
+    'REPLAY_LIMIT': 500,         # missed changes replayed on reconnect, beyond this resync
+    'RETENTION': 24 * 60 * 60,   # seconds PriceChange rows are kept
+}
+
+# --- RATE LIMITS ---
+# Token buckets for the public calculator and price tracker, shared by every
+# worker on the host through a SQLite file, see GSSC/throttling.py
+RATE_LIMITS = {
+    'ENABLED': True,
+    'DATABASE': os.environ.get('RATE_LIMIT_DB', os.path.join(tempfile.gettempdir(), 'gssc-rate-limits.sqlite3')),
+    'BUSY_TIMEOUT': 0.1,                                  # seconds, a busier store lets the request through
+    'ANON': {'CAPACITY': 60, 'REFILL_PER_SECOND': 1.0},   # per IP
+    'USER': {'CAPACITY': 120, 'REFILL_PER_SECOND': 2.0},  # per authenticated user
+    'COSTS': {
+        'read': 1,          # product lists, comparisons
+        'calculation': 2,   # sizing formulas, string layouts
+        'simulation': 10,   # Monte Carlo yield, battery dispatch, catalog matrix
+        'export': 20,       # full catalog CSV / JSON lines dump
+    },
+}
+
+# --- AI CHATBOT ---
+AI_CHATBOT_GENERATOR = 'APPS.AI_CHATBOT.generators.LocalGenerator'
+AI_CHATBOT_CONTEXT_TOKENS = 1500   # summary + recent messages sent to the generator
+AI_CHATBOT_SUMMARY_TOKENS = 300    # cap for the rolling summary of older turns
+
+AI_CHATBOT_CACHE = {
+    'MAX_ENTRIES': 1000,   # least recently used answers dropped beyond this
+    'TTL': 60 * 60,        # seconds a cached answer stays valid
+}
+
+# --- PRICE ALERTS ---
+# Triggered alerts are queued, `manage.py send_price_alerts` emails them
+PRICE_ALERTS = {
+    'BATCH_SIZE': 100,    # notifications loaded per query
+    'MAX_ATTEMPTS': 5,    # failed sends before a notification is given up
+}
+
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
+DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'alerts@gssc.local')
+
+# --- PRICE SCRAPER ---
+# `manage.py scrape_prices` and POST /price-tracker/update/, see PRICE_TRACKER/scraper.py
+SCRAPER = {
+    'CONCURRENCY': 32,        # pages fetched at the same time
+    'PER_HOST': 4,            # of those on one host, also its keep-alive connections
+    'TIMEOUT': 15,            # seconds for a connect or a response
+    'BATCH_SIZE': 500,        # products fetched and written together
+    'REQUEST_LIMIT': 200,     # products checked by the staff "Update items" button
+    'PARSERS': {},            # {'shop.example': 'dotted.path.ParserClass'}
+}
+
+# --- IDEMPOTENCY KEYS ---
+# Idempotency-Key header on the quotation POSTs, see QUOTATION_GENERATOR/idempotency.py
+IDEMPOTENCY_KEYS = {
+    'TTL': 24 * 60 * 60,   # seconds a key and its stored response are kept
+    'LEASE': 5 * 60,       # seconds before an unfinished claim counts as abandoned
+    'RETRY_AFTER': 1,      # Retry-After sent while the first request still runs
+}
+
+# --- BULK QUOTATIONS ---
+# CSV of sites priced by POST /quotation/bulk/, see QUOTATION_GENERATOR/bulk.py
+BULK_QUOTATIONS = {
+    'CHUNK_SIZE': 25,     # sites priced and written together
+    'MAX_SITES': 2000,    # larger uploads are rejected
+}
+
+# --- CALCULATOR ---
+# Monte Carlo P50/P90 mode of /calculator/power/, see CALCULATOR/services.py
+CALCULATOR_MONTE_CARLO = {
+    'DRAWS': 20_000,              # default draws per simulation
+    'MAX_DRAWS': 200_000,         # cap with numpy installed
+    'MAX_DRAWS_PYTHON': 20_000,   # cap for the pure Python fallback, ~50 ms
+}
+
+# Calculation history moved out by `manage.py archive_calculations`, see CALCULATOR/archive.py
+CALCULATION_ARCHIVE = {
+    'DIRECTORY': os.environ.get('CALCULATION_ARCHIVE_DIR', BASE_DIR / 'archive'),
+    'RETENTION_DAYS': 90,   # rows older than this leave the database
+    'BATCH_SIZE': 1000,     # rows written and deleted per transaction
+    'PAUSE': 0.0,           # seconds between two batches
+}
+
+# --- STARTUP BUDGET ---
+# Cold start limits checked by `manage.py bench_startup --target wsgi|command`,
+# `manage.py profile_imports` shows where the time goes
+STARTUP_BUDGET = {
+    'wsgi': {'BOOT_SECONDS': 1.0, 'RSS_MB': 80},      # worker ready for its first request
+    'command': {'BOOT_SECONDS': 0.8, 'RSS_MB': 64},   # django.setup() of a manage.py call
+}
+
+# --- FRONTEND ASSETS ---
+# STATIC_ROOT and the SPA served by GSSC.assets.StaticAssetMiddleware
+FRONTEND_ASSETS = {
+    'MAX_AGE': 60,                       # seconds, files without a content hash
+    'INDEX': 'index.html',               # SPA entry point, sent to browser navigations
+    'INDEX_EXCLUDE': ('admin/',),        # pages that stay Django's own
+    'IMMUTABLE_PREFIXES': ('assets/',),  # already content hashed by Vite
+    'COMPRESS_MIN_SIZE': 512,            # bytes, smaller files are not precompressed
+}
+
+# --- MIDDLEWARE LANES ---
+# JWT authenticated JSON API, no session / CSRF / messages middleware,
+# see GSSC/lanes.py and `manage.py bench_middleware`
+MIDDLEWARE_LANES = {
+    'API_PREFIXES': ('/price-tracker/', '/calculator/', '/quotation/', '/auth/', '/ai-chatbot/'),
+}
@@ -0,0 +1,96 @@
+"""
+Cold start measurements for GSSC project.
+
+Each measurement runs in a fresh interpreter with the current settings,
+the only way to see a real cold start from inside a running process.
+
+Targets:
+    command  django.setup(), what every manage.py call pays
+    wsgi     GSSC.wsgi plus the URLconf, what a web worker pays before
+             its first request
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+
+TARGETS = {
+    'command': 'import django\ndjango.setup()\n',
+    'wsgi': (
+        'from GSSC.wsgi import application\n'
+        'from django.urls import get_resolver\n'
+        'get_resolver().url_patterns\n'
+    ),
+}
+
+MEASURE = '''
+import json, resource, time
+start = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - start
+
+memory = {{}}
+try:
+    with open('/proc/self/status') as status:
+        for line in status:
+            name, _, value = line.partition(':')
+            if name in ('VmRSS', 'RssAnon'):
+                memory[name] = int(value.split()[0]) * 1024
+except OSError:
+    memory['VmRSS'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+print(json.dumps({{'seconds': elapsed, 'rss': memory.get('VmRSS'), 'rss_anon': memory.get('RssAnon')}}))
+'''
+
+
+def child_env() -> dict:
+    env = dict(os.environ)
+    # None while override_settings() is active, the tests run under one
+    env['DJANGO_SETTINGS_MODULE'] = settings.SETTINGS_MODULE or os.environ['DJANGO_SETTINGS_MODULE']
+    env['PYTHONPATH'] = os.pathsep.join(path for path in sys.path if path)
+    env.pop('PYTHONPROFILEIMPORTTIME', None)
+    return env
+
+
+def run_target(target: str, importtime: bool = False) -> subprocess.CompletedProcess:
+    command = [sys.executable]
+    if importtime:
+        command += ['-X', 'importtime']
+    command += ['-c', MEASURE.format(code=TARGETS[target])]
+
+    result = subprocess.run(
+        command,
+        cwd=settings.BASE_DIR,
+        env=child_env(),
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode:
+        raise RuntimeError(f'{target} start failed:\n{result.stderr[-2000:]}')
+    return result
+
+
+def measure(target: str) -> dict:
+    """
+    {'seconds': ..., 'rss': bytes, 'rss_anon': bytes or None} of one cold start
+    """
+    return json.loads(run_target(target).stdout.strip().splitlines()[-1])
+
+
+def import_profile(target: str) -> list:
+    """
+    [(module, self_us, cumulative_us, depth), ...] in import order
+    """
+    rows = []
+    for line in run_target(target, importtime=True).stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+
+    return rows
@@ -0,0 +1,35 @@
+"""
+Test runner for GSSC project.
+
+Runs the tests against a cache directory of their own instead of the
+CACHE_DIR a development server or a previous test run left entries in,
+removed again when the run ends.
+"""
+
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+
+from .cache import reset_cache
+
+
+class TestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.cache_dir = tempfile.mkdtemp(prefix='gssc-test-cache-')
+        self.cache_override = override_settings(CACHES={
+            alias: {**config, 'LOCATION': os.path.join(self.cache_dir, alias)}
+            for alias, config in settings.CACHES.items()
+        })
+        self.cache_override.enable()
+        reset_cache()
+
+    def teardown_test_environment(self, **kwargs):
+        self.cache_override.disable()
+        reset_cache()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,86 @@
+import gzip
+import tempfile
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+
+FRONTEND_INDEX = '''<!doctype html>
+<html lang="en">
+  <head>
+    <link rel="icon" type="image/svg+xml" href="/static/vite.svg" />
+    <script type="module" crossorigin src="/static/assets/index-B1x2y3z4.js"></script>
+  </head>
+  <body><div id="root"></div></body>
+</html>
+'''
+
+
+class StaticAssetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # A Vite-like build collected into its own STATIC_ROOT
+        directory = Path(cls.enterClassContext(tempfile.TemporaryDirectory()))
+        dist = directory / 'dist'
+        cls.enterClassContext(override_settings(STATIC_ROOT=directory / 'staticfiles', STATICFILES_DIRS=[dist]))
+        (dist / 'assets').mkdir(parents=True)
+        (dist / 'index.html').write_text(FRONTEND_INDEX)
+        (dist / 'assets' / 'index-B1x2y3z4.js').write_text('console.log("gssc");\n' * 200)
+        (dist / 'vite.svg').write_text('<svg xmlns="http://www.w3.org/2000/svg"/>')
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+    def test_index_references_hashed_assets(self):
+        response = self.client.get('/calculator/solar', HTTP_ACCEPT='text/html,application/xhtml+xml')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+        html = response.content.decode()
+        self.assertRegex(html, r'src="/static/assets/index-B1x2y3z4\.[0-9a-f]{12}\.js"')
+        self.assertRegex(html, r'href="/static/vite\.[0-9a-f]{12}\.svg"')
+
+        revalidated = self.client.get('/', HTTP_ACCEPT='text/html', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_hashed_assets_are_precompressed_and_immutable(self):
+        html = self.client.get('/', HTTP_ACCEPT='text/html').content.decode()
+        url = html.split('<script type="module" crossorigin src="')[1].split('"')[0]
+
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip, deflate, br')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        self.assertTrue(response['Content-Type'].startswith('text/javascript'))
+        body = gzip.decompress(b''.join(response.streaming_content))
+        self.assertEqual(body.decode(), 'console.log("gssc");\n' * 200)
+        self.assertEqual(int(response['Content-Length']), len(gzip.compress(body, 9, mtime=0)))
+
+        plain = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip;q=0')
+        self.assertNotIn('Content-Encoding', plain)
+        self.assertEqual(b''.join(plain.streaming_content), body)
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_unhashed_files_get_a_short_max_age(self):
+        response = self.client.get('/static/vite.svg')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=60')
+        self.assertEqual(self.client.get('/static/missing.js').status_code, 404)
+
+    def test_api_and_admin_are_not_the_spa(self):
+        api = self.client.get('/price-tracker/', HTTP_ACCEPT='application/json')
+        self.assertEqual(api['Content-Type'], 'application/json')
+
+        browser = 'text/html,application/xhtml+xml,*/*;q=0.8'
+        for url in ('/price-tracker/export/?format=csv', '/price-tracker/?page=1', '/calculator/strings/matrix/'):
+            response = self.client.get(url, HTTP_ACCEPT=browser)
+            body = b''.join(response.streaming_content) if response.streaming else response.content
+            self.assertNotIn(b'<div id="root">', body, url)
+
+        # SPA routes under an API prefix still load on refresh
+        self.assertEqual(self.client.get('/calculator/solar', HTTP_ACCEPT=browser)['Cache-Control'], 'no-cache')
+
+        admin = self.client.get('/admin/', HTTP_ACCEPT='text/html')
+        self.assertEqual(admin.status_code, 302)
+        self.assertIn('/admin/login/', admin['Location'])
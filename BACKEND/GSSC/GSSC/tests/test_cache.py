@@ -0,0 +1,183 @@
+import multiprocessing
+import threading
+import time
+
+from django.core.cache import caches
+from django.test import SimpleTestCase
+
+from GSSC.cache import MISSING, LRUCache, TwoTierCache, cached, get_cache
+
+
+def take_lock(start, results):
+    cache = TwoTierCache()
+    start.wait()
+    results.put(cache._acquire_lock('race'))
+
+
+class LRUCacheTests(SimpleTestCase):
+    def test_evicts_least_recently_used_and_expired(self):
+        lru = LRUCache(max_entries=2)
+        lru.set('a', 1, time.time() + 60)
+        lru.set('b', 2, time.time() + 60)
+        lru.get('a')
+        lru.set('c', 3, time.time() + 60)
+
+        self.assertIs(lru.get('b'), MISSING)
+        self.assertEqual(lru.get('a'), 1)
+
+        lru.set('old', 4, time.time() - 1)
+        self.assertIs(lru.get('old'), MISSING)
+
+    def test_drop_tags(self):
+        lru = LRUCache(max_entries=10)
+        lru.set('panel', 1, time.time() + 60, ('catalog',))
+        lru.set('quote', 2, time.time() + 60, ('user:1',))
+        lru.drop_tags(['catalog'])
+
+        self.assertIs(lru.get('panel'), MISSING)
+        self.assertEqual(lru.get('quote'), 2)
+
+
+class TwoTierCacheTests(SimpleTestCase):
+    def setUp(self):
+        caches['default'].clear()
+        self.cache = TwoTierCache(LOCK_POLL=0.01)
+
+    def other_process(self) -> TwoTierCache:
+        # Same L2, L1 of its own
+        return TwoTierCache(LOCK_POLL=0.01)
+
+    def test_l2_serves_other_processes(self):
+        self.cache.set('key', {'a': 1}, ttl=60)
+        other = self.other_process()
+
+        self.assertEqual(other.get('key'), {'a': 1})
+        self.assertEqual(other.get('key'), {'a': 1})
+        self.assertEqual((other.stats()['l2_hits'], other.stats()['l1_hits']), (1, 1))
+
+        self.cache.delete('key')
+        self.assertIs(self.cache.get('key'), MISSING)
+
+    def test_invalidated_tags_make_entries_stale_everywhere(self):
+        self.cache.set('panels', [1, 2], ttl=60, tags=('catalog',))
+        other = self.other_process()
+        self.assertEqual(other.get('panels'), [1, 2])
+
+        version = self.cache.tag_version('catalog')
+        self.cache.invalidate_tags('catalog')
+        self.assertNotEqual(self.cache.tag_version('catalog'), version)
+
+        self.assertIs(self.cache.get('panels'), MISSING)
+        # L1 of another process keeps its copy for at most L1_MAX_AGE
+        other.l1.clear()
+        self.assertIs(other.get('panels'), MISSING)
+        self.assertEqual(other.stats()['stale'], 1)
+
+    def test_invalidation_during_compute_is_not_lost(self):
+        def compute():
+            # The catalog changes while the old rows are being read
+            self.cache.invalidate_tags('catalog')
+            return 'old'
+
+        self.assertEqual(self.cache.get_or_set('panels', compute, ttl=60, tags=('catalog',)), 'old')
+        self.assertIs(self.cache.get('panels'), MISSING)
+        self.assertEqual(self.cache.get_or_set('panels', lambda: 'new', ttl=60, tags=('catalog',)), 'new')
+        self.assertEqual(self.cache.get('panels'), 'new')
+
+    def test_single_flight_computes_once(self):
+        calls = []
+        start = threading.Barrier(8)
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.1)
+            return 'value'
+
+        results = []
+
+        def worker():
+            start.wait()
+            results.append(self.cache.get_or_set('slow', compute, ttl=60))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['value'] * 8)
+
+    def test_waits_for_a_value_computed_by_another_process(self):
+        self.assertTrue(self.other_process()._acquire_lock('shared'))
+        threading.Timer(0.05, lambda: self.other_process().set('shared', 'theirs', ttl=60)).start()
+
+        self.assertEqual(self.cache.get_or_set('shared', lambda: 'mine', ttl=60), 'theirs')
+        self.assertEqual(self.cache.stats()['waited'], 1)
+
+    def test_lock_timeout_computes_anyway(self):
+        cache = TwoTierCache(LOCK_TIMEOUT=0.05, LOCK_POLL=0.01)
+        self.assertTrue(self.other_process()._acquire_lock('stuck'))
+
+        self.assertEqual(cache.get_or_set('stuck', lambda: 'mine', ttl=60), 'mine')
+        self.assertEqual(cache.stats()['lock_timeouts'], 1)
+
+    def test_one_process_gets_the_lock(self):
+        context = multiprocessing.get_context('fork')
+        start = context.Barrier(6)
+        results = context.Queue()
+        workers = [context.Process(target=take_lock, args=(start, results)) for _ in range(6)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        self.assertEqual(sorted(results.get() for _ in workers), [False] * 5 + [True])
+
+        self.cache._release_lock('race')
+        self.assertTrue(self.cache._acquire_lock('race'))
+
+    def test_lock_of_a_dead_process_is_taken_over(self):
+        cache = TwoTierCache(LOCK_TIMEOUT=0.05)
+        self.assertTrue(self.other_process()._acquire_lock('crashed'))
+        self.assertFalse(cache._acquire_lock('crashed'))
+
+        time.sleep(0.1)
+        self.assertTrue(cache._acquire_lock('crashed'))
+
+    def test_ttls_are_jittered(self):
+        cache = TwoTierCache(JITTER=0.1)
+        for i in range(50):
+            cache.set(f'key:{i}', i, ttl=100)
+
+        now = time.time()
+        lifetimes = [cache.l2.get(f'value:key:{i}')[2] - now for i in range(50)]
+        self.assertTrue(all(89 < lifetime <= 110 for lifetime in lifetimes))
+        self.assertGreater(len({round(lifetime) for lifetime in lifetimes}), 5)
+
+
+class CachedDecoratorTests(SimpleTestCase):
+    def setUp(self):
+        caches['default'].clear()
+        get_cache().l1.clear()
+
+    def test_caches_per_key_and_tag(self):
+        calls = []
+
+        @cached(ttl=60, tags=lambda user_id: (f'user:{user_id}',), key=lambda user_id: str(user_id))
+        def quotations(user_id):
+            calls.append(user_id)
+            return [user_id]
+
+        self.assertEqual(quotations(1), [1])
+        self.assertEqual(quotations(1), [1])
+        self.assertEqual(quotations(2), [2])
+        self.assertEqual(calls, [1, 2])
+
+        get_cache().invalidate_tags('user:1')
+        quotations(1)
+        quotations(2)
+        self.assertEqual(calls, [1, 2, 1])
+
+        self.assertEqual(quotations.uncached(3), [3])
+        self.assertEqual(calls, [1, 2, 1, 3])
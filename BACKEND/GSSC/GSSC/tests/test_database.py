@@ -0,0 +1,91 @@
+import importlib.util
+import os
+import threading
+import time
+from decimal import Decimal
+from io import StringIO
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection, connections, transaction
+from django.test import SimpleTestCase, TransactionTestCase
+
+from APPS.PRICE_TRACKER.models import Product
+
+
+@skipUnless(connection.vendor == 'sqlite', 'SQLite pragmas')
+class SQLiteSettingsTests(TransactionTestCase):
+    def test_connections_apply_the_pragmas(self):
+        with connection.cursor() as cursor:
+            pragmas = {
+                name: cursor.execute(f'PRAGMA {name}').fetchone()[0]
+                for name in ('journal_mode', 'synchronous', 'busy_timeout', 'foreign_keys')
+            }
+
+        # synchronous 1 is NORMAL
+        self.assertEqual(pragmas, {
+            'journal_mode': self.journal_mode(), 'synchronous': 1, 'busy_timeout': 5000, 'foreign_keys': 1,
+        })
+
+    def journal_mode(self):
+        # The development db.sqlite3, and a test database made from its settings, keep the rollback journal
+        return 'wal' if 'DB_NAME' in os.environ else 'delete'
+
+    def test_development_database_keeps_the_rollback_journal(self):
+        with mock.patch.dict(os.environ):
+            os.environ.pop('DB_NAME', None)
+            default = self.database_settings()
+            os.environ['DB_NAME'] = '/srv/gssc/gssc.sqlite3'
+            deployed = self.database_settings()
+
+        self.assertEqual(default['NAME'], settings.BASE_DIR / 'db.sqlite3')
+        self.assertNotIn('journal_mode', default['OPTIONS']['init_command'])
+        self.assertIn('PRAGMA journal_mode=WAL', deployed['OPTIONS']['init_command'])
+
+    def database_settings(self):
+        # A fresh copy of the settings module reads the environment again
+        spec = importlib.util.find_spec('GSSC.settings')
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module.DATABASES['default']
+
+    def test_concurrent_writers_queue_instead_of_failing(self):
+        start = threading.Barrier(4)
+        errors = []
+
+        def writer(number):
+            try:
+                start.wait()
+                with transaction.atomic():
+                    price = Product.objects.filter(category='battery').count()
+                    # Still inside the transaction while the others try to begin theirs
+                    time.sleep(0.05)
+                    Product.objects.create(
+                        category='battery', company='PowerCell', model=f'PC-{number}', price=Decimal(price),
+                    )
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=writer, args=(number,)) for number in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        # Each one saw the rows of the writers before it
+        self.assertEqual(sorted(Product.objects.values_list('price', flat=True)), [0, 1, 2, 3])
+
+
+class DatabaseBenchmarkTests(SimpleTestCase):
+    def test_compares_both_journal_modes(self):
+        out = StringIO()
+        call_command('bench_db_concurrency', readers=1, writers=1, seconds=0.2, rows=100, stdout=out)
+
+        rows = out.getvalue().splitlines()
+        self.assertTrue(rows[2].startswith('rollback journal'))
+        self.assertTrue(rows[3].startswith('settings pragmas'))
+        self.assertGreater(float(rows[3].split()[2]), 0)
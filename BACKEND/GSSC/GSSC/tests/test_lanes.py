@@ -0,0 +1,53 @@
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+
+from GSSC.lanes import (
+    LeanAuthenticationMiddleware,
+    LeanCsrfViewMiddleware,
+    LeanMessageMiddleware,
+    LeanSessionMiddleware,
+    stock_middleware,
+)
+
+
+class MiddlewareLaneTests(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.seen = {}
+
+        def view(request):
+            self.seen = {
+                'session': hasattr(request, 'session'),
+                'messages': hasattr(request, '_messages'),
+                'authenticated': request.user.is_authenticated,
+            }
+            return HttpResponse()
+
+        self.chain = LeanSessionMiddleware(LeanAuthenticationMiddleware(LeanMessageMiddleware(view)))
+
+    def test_api_requests_skip_the_session_middleware(self):
+        self.chain(self.factory.get('/quotation/options/'))
+        self.assertEqual(self.seen, {'session': False, 'messages': False, 'authenticated': False})
+
+        self.chain(self.factory.get('/admin/'))
+        self.assertEqual(self.seen, {'session': True, 'messages': True, 'authenticated': False})
+
+    def test_csrf_is_only_checked_off_the_api_lane(self):
+        csrf = LeanCsrfViewMiddleware(lambda request: HttpResponse())
+        view = lambda request: HttpResponse()
+
+        self.assertIsNone(csrf.process_view(self.factory.post('/auth/login/'), view, (), {}))
+        self.assertEqual(csrf.process_view(self.factory.post('/admin/login/'), view, (), {}).status_code, 403)
+
+    def test_admin_keeps_sessions_and_csrf(self):
+        client = self.client_class(enforce_csrf_checks=True)
+        login_page = client.get('/admin/login/')
+        self.assertIn('csrftoken', login_page.cookies)
+        self.assertEqual(client.post('/admin/login/', {'username': 'x', 'password': 'y'}).status_code, 403)
+        self.assertEqual(client.get('/price-tracker/').status_code, 200)
+
+    def test_stock_stack_for_the_benchmark(self):
+        self.assertEqual(
+            stock_middleware(['GSSC.lanes.LeanSessionMiddleware', 'django.middleware.common.CommonMiddleware']),
+            ['django.contrib.sessions.middleware.SessionMiddleware', 'django.middleware.common.CommonMiddleware'],
+        )
@@ -0,0 +1,119 @@
+import sqlite3
+import tempfile
+from decimal import Decimal
+from pathlib import Path
+
+from django.db import connections
+from django.test import RequestFactory, TransactionTestCase, override_settings
+
+from APPS.PRICE_TRACKER.models import Product
+from APPS.QUOTATION_GENERATOR.models import Quotation
+from GSSC.routers import PrimaryReplicaRouter, ReplicaPinningMiddleware, pinning_scope
+from GSSC.throttling import reset_rate_limits
+
+
+@override_settings(DATABASE_REPLICAS=['replica_test'], REPLICA_APP_LABELS=['PRICE_TRACKER'])
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    The primary is the normal test database, the replica is a second SQLite
+    file that this harness copies the primary into with sync_replica().
+    """
+    @classmethod
+    def setUpClass(cls):
+        # Only registered while the class runs, after the runner set up its
+        # test databases. sync_replica() creates the file.
+        cls.replica_file = Path(cls.enterClassContext(tempfile.TemporaryDirectory())) / 'replica.sqlite3'
+        connections.settings['replica_test'] = {**connections.settings['default'], 'NAME': str(cls.replica_file)}
+        cls.databases = {'default', 'replica_test'}
+        cls.addClassCleanup(cls.remove_replica)
+        super().setUpClass()
+
+    @classmethod
+    def remove_replica(cls):
+        connections['replica_test'].close()
+        del connections['replica_test']
+        del connections.settings['replica_test']
+
+    def setUp(self):
+        reset_rate_limits()
+        self.sync_replica()
+
+    def sync_replica(self):
+        connections['replica_test'].close()
+
+        primary = connections['default']
+        primary.ensure_connection()
+        replica = sqlite3.connect(self.replica_file)
+        primary.connection.backup(replica)
+        replica.close()
+
+    def create_product(self, model, price):
+        return Product.objects.create(
+            category='solar_panel', company='SolarTech', model=model, price=Decimal(price)
+        )
+
+    def test_catalog_reads_use_the_replica(self):
+        self.create_product('ST-550W', '55000')
+        self.sync_replica()
+
+        # Not yet replicated, the list endpoint must not see it
+        self.create_product('ST-600W', '60000')
+
+        response = self.client.get('/price-tracker/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([p['model'] for p in response.json()['results']], ['ST-550W'])
+
+        self.sync_replica()
+        response = self.client.get('/price-tracker/')
+        self.assertEqual(response.json()['count'], 2)
+
+    def test_reads_after_a_write_stick_to_the_primary(self):
+        router = PrimaryReplicaRouter()
+        seen = {}
+
+        def view(request):
+            seen['before'] = router.db_for_read(Product)
+            self.create_product('ST-550W', '55000')
+            seen['after'] = router.db_for_read(Product)
+            seen['count'] = Product.objects.count()
+            return None
+
+        ReplicaPinningMiddleware(view)(RequestFactory().get('/price-tracker/'))
+
+        self.assertEqual(seen['before'], 'replica_test')
+        self.assertEqual(seen['after'], 'default')
+        self.assertEqual(seen['count'], 1)
+
+        # The next request starts unpinned again
+        next_request = ReplicaPinningMiddleware(lambda request: router.db_for_read(Product))
+        self.assertEqual(next_request(RequestFactory().get('/price-tracker/')), 'replica_test')
+
+    def test_other_apps_and_writes_use_the_primary(self):
+        router = PrimaryReplicaRouter()
+        self.assertEqual(router.db_for_read(Quotation), 'default')
+        self.assertTrue(router.allow_migrate('default', 'PRICE_TRACKER'))
+        self.assertFalse(router.allow_migrate('replica_test', 'PRICE_TRACKER'))
+
+        def view(request):
+            seen = router.db_for_read(Product)
+            self.assertEqual(router.db_for_write(Product), 'default')
+            return seen
+
+        # Unsafe methods are pinned to the primary from the start
+        post = RequestFactory().post('/quotation/save/')
+        self.assertEqual(ReplicaPinningMiddleware(view)(post), 'default')
+
+    def test_pin_ends_with_its_scope(self):
+        router = PrimaryReplicaRouter()
+
+        # Commands and threads run outside any scope, nothing tracks their writes
+        self.assertEqual(router.db_for_read(Product), 'default')
+
+        with pinning_scope():
+            self.assertEqual(router.db_for_read(Product), 'replica_test')
+            self.create_product('ST-550W', '55000')
+            self.assertEqual(router.db_for_read(Product), 'default')
+
+        # The write inside the block doesn't pin the next one
+        with pinning_scope():
+            self.assertEqual(router.db_for_read(Product), 'replica_test')
@@ -0,0 +1,49 @@
+from io import StringIO
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, override_settings
+
+from GSSC.lazy import is_available, lazy_import
+from GSSC.startup import import_profile
+
+
+class ColdStartTests(SimpleTestCase):
+    """
+    Fresh interpreters, what a manage.py call and a web worker import
+    """
+
+    def imported(self, target: str) -> set:
+        return {name for name, _, _, _ in import_profile(target)}
+
+    def test_commands_skip_the_chatbot_and_the_test_framework(self):
+        modules = self.imported('command')
+
+        self.assertIn('APPS.AI_CHATBOT.signals', modules)
+        for name in ('APPS.AI_CHATBOT.index', 'APPS.AI_CHATBOT.cache', 'django.test', 'unittest'):
+            self.assertNotIn(name, modules)
+
+    def test_workers_preload_the_views_but_not_the_chatbot_index(self):
+        modules = self.imported('wsgi')
+
+        self.assertIn('APPS.AI_CHATBOT.views', modules)
+        self.assertNotIn('APPS.AI_CHATBOT.index', modules)
+        self.assertNotIn('APPS.AI_CHATBOT.cache', modules)
+
+    @override_settings(STARTUP_BUDGET={'command': {'BOOT_SECONDS': 0.001}})
+    def test_bench_startup_fails_over_budget(self):
+        with self.assertRaisesMessage(CommandError, 'command is over its startup budget: boot'):
+            call_command('bench_startup', target='command', runs=1, stdout=StringIO())
+
+
+class LazyImportTests(SimpleTestCase):
+    def test_missing_module_fails_on_use(self):
+        self.assertTrue(is_available('json'))
+        self.assertFalse(is_available('gssc_missing_module'))
+
+        module = lazy_import('gssc_missing_module', feature='Testing')
+        with self.assertRaisesMessage(ImproperlyConfigured, "Testing needs the 'gssc_missing_module' package"):
+            module.anything
+
+    def test_module_is_imported_on_first_use(self):
+        self.assertEqual(lazy_import('json').dumps([1]), '[1]')
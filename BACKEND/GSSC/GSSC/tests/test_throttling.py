@@ -0,0 +1,113 @@
+import multiprocessing
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from rest_framework.test import APIClient
+
+from GSSC.throttling import BucketStore, reset_rate_limits
+
+
+def take_tokens(path, attempts, results):
+    store = BucketStore(path, busy_timeout=5)
+    results.put(sum(store.consume('ip:10.0.0.1', 1, 100, 1e-9)[0] for _ in range(attempts)))
+
+
+class RateLimitTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.database = str(Path(cls.enterClassContext(tempfile.TemporaryDirectory())) / 'rate-limits.sqlite3')
+        cls.enterClassContext(override_settings(RATE_LIMITS={
+            'DATABASE': cls.database,
+            'ANON': {'CAPACITY': 10, 'REFILL_PER_SECOND': 0.01},
+            'USER': {'CAPACITY': 20, 'REFILL_PER_SECOND': 0.01},
+            'COSTS': {'read': 1, 'calculation': 2, 'simulation': 10, 'export': 8},
+        }))
+        # Closes the store before its file goes
+        cls.addClassCleanup(reset_rate_limits)
+
+    def setUp(self):
+        reset_rate_limits()
+
+    def test_anonymous_clients_get_one_bucket_per_ip(self):
+        for _ in range(10):
+            self.assertEqual(self.client.get('/price-tracker/').status_code, 200)
+
+        response = self.client.get('/price-tracker/')
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response['Retry-After']), 90)
+
+        other = self.client.get('/price-tracker/', REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(other.status_code, 200)
+
+    def test_forwarded_for_header_does_not_pick_the_bucket(self):
+        for i in range(10):
+            self.client.get('/price-tracker/', HTTP_X_FORWARDED_FOR=f'203.0.113.{i}')
+        spoofed = self.client.get('/price-tracker/', HTTP_X_FORWARDED_FOR='198.51.100.7')
+        self.assertEqual(spoofed.status_code, 429)
+
+    @override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'NUM_PROXIES': 1})
+    def test_client_ip_behind_a_trusted_proxy(self):
+        for _ in range(10):
+            self.client.get('/price-tracker/', HTTP_X_FORWARDED_FOR='198.51.100.7, 203.0.113.1')
+        self.assertEqual(
+            self.client.get('/price-tracker/', HTTP_X_FORWARDED_FOR='198.51.100.8, 203.0.113.1').status_code, 429,
+        )
+        self.assertEqual(
+            self.client.get('/price-tracker/', HTTP_X_FORWARDED_FOR='198.51.100.7, 203.0.113.2').status_code, 200,
+        )
+
+    def test_expensive_endpoints_cost_more(self):
+        response = self.client.post(
+            '/calculator/power/',
+            {'solarpanel_quantity': 10, 'panelwatt': 550, 'mode': 'monte_carlo'},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 201)
+
+        # The simulation emptied the bucket, even a cheap read has to wait
+        self.assertEqual(self.client.get('/price-tracker/').status_code, 429)
+
+    def test_catalog_export_costs_more_than_a_page(self):
+        self.assertEqual(self.client.get('/price-tracker/export/?format=csv').status_code, 200)
+
+        # 8 of the 10 tokens went on the export, two pages are left
+        for _ in range(2):
+            self.assertEqual(self.client.get('/price-tracker/').status_code, 200)
+        self.assertEqual(self.client.get('/price-tracker/').status_code, 429)
+        self.assertEqual(self.client.get('/price-tracker/export/?format=csv').status_code, 429)
+
+    def test_authenticated_users_have_their_own_bucket(self):
+        user = get_user_model().objects.create_user(username='buyer', password=None)
+        client = APIClient()
+        client.force_authenticate(user)
+
+        for _ in range(10):
+            self.client.get('/price-tracker/')
+        self.assertEqual(self.client.get('/price-tracker/').status_code, 429)
+
+        for _ in range(20):
+            self.assertEqual(client.get('/price-tracker/').status_code, 200)
+        self.assertEqual(client.get('/price-tracker/').status_code, 429)
+
+    def test_limit_holds_across_processes(self):
+        BucketStore(self.database).connection()
+
+        context = multiprocessing.get_context('fork')
+        results = context.Queue()
+        workers = [
+            context.Process(target=take_tokens, args=(self.database, 50, results))
+            for _ in range(4)
+        ]
+        for worker in workers:
+            worker.start()
+        allowed = sum(results.get(timeout=30) for _ in workers)
+        for worker in workers:
+            worker.join()
+
+        # 200 attempts against a bucket of 100 that does not refill
+        self.assertEqual(allowed, 100)
@@ -0,0 +1,259 @@
+"""
+Token bucket rate limiting for GSSC project.
+
+The calculator and price tracker are AllowAny, so every client gets a
+bucket of tokens that refills at a steady rate:
+
+    anonymous      one bucket per IP      RATE_LIMITS['ANON']
+                   (REMOTE_ADDR, or X-Forwarded-For behind
+                   REST_FRAMEWORK['NUM_PROXIES'] trusted proxies)
+    authenticated  one bucket per user    RATE_LIMITS['USER']
+
+A request pays the token cost of its endpoint (RATE_LIMITS['COSTS'], a
+Monte Carlo run costs more than a page of products) and gets HTTP 429 with
+Retry-After when its bucket cannot pay.
+
+Buckets live in a small SQLite file shared by every worker on the host, so
+a limit holds whichever process serves the request:
+
+    - refill and deduction are one UPSERT ... RETURNING statement, atomic
+      without a read-modify-write round trip between processes
+    - the file runs in WAL mode without fsync, a consume costs tens of
+      microseconds and a crash loses at most some counters
+    - when the store stays locked longer than BUSY_TIMEOUT the request is
+      let through rather than queued behind the limiter
+    - a bucket found empty is remembered in-process until it refills, so a
+      client hammering the API is turned away without touching the store
+
+Usage:
+    class ProductListView(ListAPIView):
+        throttle_classes = [TokenBucketThrottle]          # cost 'read'
+
+    class SimulationThrottle(TokenBucketThrottle):
+        cost = 'simulation'
+
+`manage.py bench_rate_limiter` measures the limiter overhead per request.
+"""
+
+import itertools
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from rest_framework.throttling import BaseThrottle
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': True,
+    'DATABASE': os.path.join(tempfile.gettempdir(), 'gssc-rate-limits.sqlite3'),
+    'BUSY_TIMEOUT': 0.1,
+    'ANON': {'CAPACITY': 60, 'REFILL_PER_SECOND': 1.0},
+    'USER': {'CAPACITY': 120, 'REFILL_PER_SECOND': 2.0},
+    'COSTS': {'read': 1, 'calculation': 2, 'simulation': 10, 'export': 20},
+    'PRUNE_AFTER': 60 * 60,
+}
+
+# Consumes between two sweeps of idle buckets, per process
+PRUNE_EVERY = 1000
+
+# Empty buckets remembered in-process before the memo is dropped
+MAX_EMPTY = 10_000
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS buckets (
+    key TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated REAL NOT NULL
+) WITHOUT ROWID
+'''
+
+# Refill since the last update, capped at capacity, then pay the cost.
+# The WHERE clause makes the update a no-op (no row returned) when the
+# bucket cannot pay, so a denied request leaves the bucket untouched.
+CONSUME = '''
+INSERT INTO buckets (key, tokens, updated) VALUES (:key, :capacity - :cost, :now)
+ON CONFLICT (key) DO UPDATE SET
+    tokens = MIN(:capacity, tokens + MAX(:now - updated, 0) * :rate) - :cost,
+    updated = :now
+WHERE MIN(:capacity, tokens + MAX(:now - updated, 0) * :rate) >= :cost
+RETURNING tokens
+'''
+
+PEEK = '''
+SELECT MIN(:capacity, tokens + MAX(:now - updated, 0) * :rate) FROM buckets WHERE key = :key
+'''
+
+
+def rate_limit_settings() -> dict:
+    config = {**DEFAULTS, **getattr(settings, 'RATE_LIMITS', {})}
+    config['COSTS'] = {**DEFAULTS['COSTS'], **config['COSTS']}
+    return config
+
+
+class BucketStore:
+    """
+    Token buckets in a SQLite file, one connection per thread and process
+    """
+
+    def __init__(self, path: str, busy_timeout: float = 0.1):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._calls = itertools.count()
+
+    def connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+
+        # A forked worker must not reuse its parent's connection
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(
+                self.path,
+                timeout=self.busy_timeout,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=OFF')
+            connection.execute(SCHEMA)
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+
+        return connection
+
+    def consume(self, key: str, cost: float, capacity: float, rate: float, now: float = None):
+        """
+        (allowed, tokens left) after trying to take cost tokens from the bucket
+        """
+        now = time.time() if now is None else now
+        params = {'key': key, 'cost': cost, 'capacity': capacity, 'rate': rate, 'now': now}
+        connection = self.connection()
+
+        row = connection.execute(CONSUME, params).fetchone()
+        if row is not None:
+            allowed, tokens = True, row[0]
+        else:
+            row = connection.execute(PEEK, params).fetchone()
+            allowed, tokens = False, row[0] if row else capacity
+
+        if next(self._calls) % PRUNE_EVERY == PRUNE_EVERY - 1:
+            self.prune(now - rate_limit_settings()['PRUNE_AFTER'])
+
+        return allowed, tokens
+
+    def prune(self, before: float) -> int:
+        """
+        Drops buckets idle since before, they would be full again anyway
+        """
+        return self.connection().execute('DELETE FROM buckets WHERE updated < ?', (before,)).rowcount
+
+    def clear(self):
+        self.connection().execute('DELETE FROM buckets')
+
+
+#=============================================================
+# STORE (one per process, follows settings.RATE_LIMITS['DATABASE'])
+#=============================================================
+
+_store = None
+_store_lock = threading.Lock()
+
+# key -> (tokens, at) of buckets found empty, see take()
+_empty = {}
+
+
+def get_bucket_store() -> BucketStore:
+    global _store
+
+    config = rate_limit_settings()
+    if _store is None or _store.path != config['DATABASE']:
+        with _store_lock:
+            if _store is None or _store.path != config['DATABASE']:
+                _store = BucketStore(config['DATABASE'], config['BUSY_TIMEOUT'])
+
+    return _store
+
+
+def reset_rate_limits():
+    """
+    Refills every bucket and forgets the in-process state
+    """
+    global _store
+
+    get_bucket_store().clear()
+    _empty.clear()
+    with _store_lock:
+        _store = None
+
+
+def take(key: str, cost: float, capacity: float, rate: float) -> float:
+    """
+    Seconds until the bucket can pay cost, 0.0 when it just paid
+    """
+    now = time.time()
+
+    # Other workers only ever take tokens, so a local estimate that is still
+    # short is a safe denial without a trip to the store
+    empty = _empty.get(key)
+    if empty is not None:
+        tokens, at = empty
+        tokens = min(capacity, tokens + (now - at) * rate)
+        if tokens < cost:
+            return (cost - tokens) / rate
+
+    try:
+        allowed, tokens = get_bucket_store().consume(key, cost, capacity, rate, now)
+    except sqlite3.Error:
+        logger.warning('Rate limit store unavailable, letting %s through', key, exc_info=True)
+        return 0.0
+
+    if allowed:
+        _empty.pop(key, None)
+        return 0.0
+
+    if len(_empty) >= MAX_EMPTY:
+        _empty.clear()
+    _empty[key] = (tokens, now)
+    return (cost - tokens) / rate
+
+
+#=============================================================
+# DRF THROTTLE
+#=============================================================
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Per-user bucket for authenticated requests, per-IP bucket otherwise.
+    Subclasses set cost to one of RATE_LIMITS['COSTS'].
+    """
+    cost = 'read'
+
+    def get_cost(self, request, view) -> str:
+        return self.cost
+
+    def allow_request(self, request, view) -> bool:
+        config = rate_limit_settings()
+        self.wait_seconds = None
+        if not config['ENABLED']:
+            return True
+
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            key, bucket = f'user:{user.pk}', config['USER']
+        else:
+            key, bucket = f'ip:{self.get_ident(request)}', config['ANON']
+
+        # A request costing more than a full bucket could never pass
+        cost = min(config['COSTS'][self.get_cost(request, view)], bucket['CAPACITY'])
+        wait = take(key, cost, bucket['CAPACITY'], bucket['REFILL_PER_SECOND'])
+        if wait:
+            self.wait_seconds = wait
+            return False
+        return True
+
+    def wait(self):
+        return self.wait_seconds
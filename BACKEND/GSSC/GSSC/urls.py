@@ -17,6 +17,7 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from APPS.PRICE_TRACKER import views
+from . import views as gssc_views
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -25,5 +26,13 @@ urlpatterns = [
     path('calculator/', include('APPS.CALCULATOR.urls')),
     path('contacts/', include('APPS.CONTACTS.urls')),
     path('price-tracker/', views.PriceTrackerListView.as_view(), name="price_tracker"),
+    path('price-tracker/export/', views.PriceTrackerExportView.as_view(), name="price_tracker_export"),
+    path('price-tracker/compare/', views.ProductCompareView.as_view(), name="price_tracker_compare"),
+    path('price-tracker/<int:pk>/similar/', views.SimilarProductsView.as_view(), name="price_tracker_similar"),
+    path('price-tracker/stream/', views.price_stream_view, name="price_stream"),
+    path('price-tracker/update/', views.update_prices_view, name="price_tracker_update"),
+    path('price-tracker/alerts/', views.PriceAlertListView.as_view(), name="price_alerts"),
+    path('price-tracker/alerts/<int:pk>/', views.PriceAlertDetailView.as_view(), name="price_alert"),
     path('quotation/', include('APPS.QUOTATION_GENERATOR.urls')),
+    path('cache/stats/', gssc_views.cache_stats_view, name="cache_stats"),
 ]
@@ -1,3 +1,21 @@
 from django.contrib import admin
 
-# Register your models here.
+from GSSC.admin_tools import LargeTableAdmin
+
+from .models import Conversation, Message
+
+
+@admin.register(Conversation)
+class ConversationAdmin(LargeTableAdmin):
+    list_display = ("id", "user", "summarized_until", "updated_at")
+    list_select_related = ("user",)
+    search_fields = ("=id", "=user__username")
+    raw_id_fields = ("user",)
+
+
+@admin.register(Message)
+class MessageAdmin(LargeTableAdmin):
+    list_display = ("id", "conversation", "role", "token_count", "created_at")
+    list_filter = ("role",)
+    search_fields = ("=conversation__id",)
+    raw_id_fields = ("conversation",)
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class AiChatbotConfig(AppConfig):
     name = 'APPS.AI_CHATBOT'
+
+    def ready(self):
+        from . import signals  # noqa: F401
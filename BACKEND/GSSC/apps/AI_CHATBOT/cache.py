@@ -0,0 +1,149 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+from .index import tokenize
+
+
+'''
+Response cache for repeated questions.
+
+Questions are normalized before lookup so "How many panels for 5kW?" and
+"how many panels for 5 kw" share one entry. Entries expire after TTL seconds
+and the least recently used entry is dropped once MAX_ENTRIES is reached.
+Cached answers quote product names and prices, so each entry remembers
+the "catalog" cache tag version it was answered under and an entry of
+another version is a miss. The tag changes with any product save or import
+in any process (another worker, `manage.py scrape_prices`, the admin
+actions). Product signals also clear the cache of the process that saved.
+'''
+
+UNIT_RE = re.compile(r"(\d)\s+(kwh|kw|w|ah|v)\b")
+
+
+def normalize_question(question: str) -> str:
+    text = UNIT_RE.sub(r"\1\2", (question or "").lower())
+    return " ".join(tokenize(text))
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = 1000, ttl: float = 3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # key -> (expires_at, version, value)
+
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.stale = 0
+        self.evicted = 0
+
+    def get(self, question: str, version=None):
+        """
+        The cached answer, None when missing, expired or of another catalog version
+        """
+        key = normalize_question(question)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, entry_version, value = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.expired += 1
+                self.misses += 1
+                return None
+
+            if entry_version != version:
+                del self._entries[key]
+                self.stale += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, question: str, value, version=None):
+        key = normalize_question(question)
+        if not key:
+            return
+
+        now = time.monotonic()
+
+        with self._lock:
+            self._entries[key] = (now + self.ttl, version, value)
+            self._entries.move_to_end(key)
+
+            if len(self._entries) > self.max_entries:
+                # Drop expired entries first, then least recently used
+                self._purge_expired(now)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evicted += 1
+
+    def purge_expired(self):
+        with self._lock:
+            self._purge_expired(time.monotonic())
+
+    def _purge_expired(self, now: float):
+        stale = [key for key, (expires_at, _, _) in self._entries.items() if expires_at <= now]
+        for key in stale:
+            del self._entries[key]
+        self.expired += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "expired": self.expired,
+                "stale": self.stale,
+                "evicted": self.evicted,
+            }
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    global _response_cache
+
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                config = getattr(settings, "AI_CHATBOT_CACHE", {})
+                _response_cache = ResponseCache(
+                    max_entries=config.get("MAX_ENTRIES", 1000),
+                    ttl=config.get("TTL", 3600),
+                )
+
+    return _response_cache
+
+
+def reset_response_cache():
+    global _response_cache
+
+    with _response_cache_lock:
+        _response_cache = None
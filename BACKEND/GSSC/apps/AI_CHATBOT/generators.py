@@ -0,0 +1,149 @@
+import re
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from APPS.CALCULATOR.services import power_to_panel_morning_load
+
+
+'''
+Answer generators turn a question plus the retrieved products into text.
+
+A generator is any class with a stream(question, products, context) method
+that yields chunks of the answer, and a summarize(summary, messages) method
+used to fold old conversation turns into a short summary.
+
+The view forwards each chunk to the client as soon as it is produced,
+so a slow generator (a hosted LLM) still gets a low time-to-first-token.
+
+The active generator is picked with settings.AI_CHATBOT_GENERATOR.
+'''
+
+DEFAULT_GENERATOR = "APPS.AI_CHATBOT.generators.LocalGenerator"
+
+KW_RE = re.compile(r"(\d+(?:\.\d+)?)\s*kw\b", re.IGNORECASE)
+WATT_RE = re.compile(r"(\d+)\s*w\b", re.IGNORECASE)
+
+
+class BaseGenerator:
+    def stream(self, question: str, products: list, context: dict = None):
+        raise NotImplementedError
+
+    def summarize(self, summary: str, messages: list) -> str:
+        """
+        Extractive summary: one short line per folded message, oldest lines
+        dropped once the summary is over AI_CHATBOT_SUMMARY_TOKENS.
+        LLM-backed generators can override this with a real summary.
+        """
+        budget_chars = getattr(settings, "AI_CHATBOT_SUMMARY_TOKENS", 300) * 4
+
+        lines = [line for line in summary.split("\n") if line]
+        for message in messages:
+            label = "Asked" if message["role"] == "user" else "Answered"
+            words = message["content"].split()
+            text = " ".join(words[:20]) + (" ..." if len(words) > 20 else "")
+            lines.append(f"{label}: {text}")
+
+        while len(lines) > 1 and sum(len(line) + 1 for line in lines) > budget_chars:
+            lines.pop(0)
+
+        return "\n".join(lines)
+
+
+class LocalGenerator(BaseGenerator):
+    """
+    Deterministic template generator, no external calls.
+    Used by default and in tests: the same question and catalog
+    always produce the same answer.
+    """
+
+    def stream(self, question: str, products: list, context: dict = None):
+        for sentence in self.sentences(question, products):
+            for word in sentence.split(" "):
+                yield word + " "
+
+    def sentences(self, question: str, products: list) -> list:
+        sentences = []
+
+        sizing = self.panel_sizing(question, products)
+        if sizing:
+            sentences.append(sizing)
+
+        if not products:
+            sentences.append(
+                "I could not find a matching product in our catalog, "
+                "try asking about solar panels, inverters or batteries."
+            )
+            return sentences
+
+        sentences.append("Here is what matches your question in our catalog:")
+        for product in products:
+            sentences.append(self.describe(product))
+
+        return sentences
+
+    def describe(self, product: dict) -> str:
+        name = f"{product['company']} {product['model']}"
+        details = [
+            product.get(field)
+            for field in ("max_power", "efficiency", "type")
+            if product.get(field)
+        ]
+        if details:
+            name += f" ({', '.join(details)})"
+
+        price = product.get("price")
+        if price is not None:
+            return f"- {name}, priced at {price:,.2f}."
+        return f"- {name}, price on request."
+
+    def panel_sizing(self, question: str, products: list):
+        """
+        Answers "how many panels for 5 kW" with the calculator's morning load rule
+        """
+        kw_match = KW_RE.search(question)
+        if not kw_match:
+            return None
+
+        # "0W" in the question or a catalog panel without a rating
+        # falls back to the usual 550 W panel
+        panel_watt = 550
+        watt_match = WATT_RE.search(question)
+        if watt_match and int(watt_match.group(1)) > 0:
+            panel_watt = int(watt_match.group(1))
+        else:
+            for product in products:
+                panel_match = WATT_RE.search(product.get("max_power") or "")
+                if product.get("category") == "solar_panel" and panel_match and int(panel_match.group(1)) > 0:
+                    panel_watt = int(panel_match.group(1))
+                    break
+
+        load_kw = float(kw_match.group(1))
+        result = power_to_panel_morning_load(
+            panel_watt=panel_watt,
+            total_hourly_wh=load_kw * 1000,
+        )["system_requirements"]
+
+        return (
+            f"A {load_kw:g} kW load needs about {result['morning_solar_panel_quantity']} "
+            f"panels of {panel_watt}W, producing around {result['total_morning_kwh']} kWh "
+            f"over a sunny day."
+        )
+
+
+_generator = None
+
+
+def get_generator() -> BaseGenerator:
+    global _generator
+
+    if _generator is None:
+        path = getattr(settings, "AI_CHATBOT_GENERATOR", DEFAULT_GENERATOR)
+        _generator = import_string(path)()
+
+    return _generator
+
+
+def reset_generator():
+    global _generator
+    _generator = None
@@ -0,0 +1,252 @@
+import logging
+import math
+import re
+import threading
+from collections import defaultdict
+
+from django.db import connections
+
+from GSSC.cache import get_cache
+
+
+'''
+In-process BM25 index over the Product catalog.
+
+Every product becomes one document built from its descriptive fields.
+The index keeps postings as {term: {product_id: term_frequency}}.
+
+The catalog index follows the "catalog" cache tag, which changes version
+after any product save or import, in whichever process. A process that sees
+a newer version rebuilds the index in a background thread, one at a time,
+and requests keep searching the previous index until it is swapped in.
+Only the first question of a process builds it on the request path.
+
+score(q, d) = sum over terms t in q of
+    idf(t) * tf(t, d) * (k1 + 1) / (tf(t, d) + k1 * (1 - b + b * |d| / avgdl))
+'''
+
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+STOP_WORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "does",
+    "for", "from", "how", "i", "in", "is", "it", "me", "much", "my", "of",
+    "on", "or", "the", "to", "what", "which", "with", "you", "your",
+}
+
+DOCUMENT_FIELDS = (
+    "id",
+    "category",
+    "company",
+    "model",
+    "price",
+    "description",
+    "cell_type",
+    "max_power",
+    "max_system_voltage",
+    "efficiency",
+    "type",
+    "features",
+)
+
+# Fields that are indexed as text, in the order they are concatenated
+TEXT_FIELDS = (
+    "category",
+    "company",
+    "model",
+    "type",
+    "description",
+    "features",
+    "cell_type",
+    "max_power",
+    "max_system_voltage",
+    "efficiency",
+)
+
+
+def stem(token: str) -> str:
+    # Plural folding only, enough for "panels" to match "panel"
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> list:
+    return [
+        stem(token) for token in TOKEN_RE.findall((text or "").lower())
+        if token not in STOP_WORDS
+    ]
+
+
+def product_document(product: dict) -> list:
+    text = " ".join(
+        str(product.get(field) or "").replace("_", " ")
+        for field in TEXT_FIELDS
+    )
+    return tokenize(text)
+
+
+class BM25Index:
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+
+        self._lock = threading.RLock()
+        self._postings = defaultdict(dict)   # term -> {doc_id: tf}
+        self._doc_terms = {}                 # doc_id -> {term: tf}
+        self._doc_lengths = {}               # doc_id -> number of tokens
+        self._total_length = 0
+        self.documents = {}                  # doc_id -> stored fields
+        self.version = None                  # catalog version it was built from
+
+    def __len__(self):
+        return len(self._doc_lengths)
+
+    def add(self, doc_id, tokens: list, stored: dict = None):
+        with self._lock:
+            if doc_id in self._doc_lengths:
+                self.remove(doc_id)
+
+            term_counts = defaultdict(int)
+            for token in tokens:
+                term_counts[token] += 1
+
+            for term, tf in term_counts.items():
+                self._postings[term][doc_id] = tf
+
+            self._doc_terms[doc_id] = dict(term_counts)
+            self._doc_lengths[doc_id] = len(tokens)
+            self._total_length += len(tokens)
+            self.documents[doc_id] = stored or {}
+
+    def remove(self, doc_id):
+        with self._lock:
+            terms = self._doc_terms.pop(doc_id, None)
+            if terms is None:
+                return
+
+            for term in terms:
+                postings = self._postings[term]
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+
+            self._total_length -= self._doc_lengths.pop(doc_id)
+            self.documents.pop(doc_id, None)
+
+    def search(self, query: str, limit: int = 5) -> list:
+        """
+        Returns [(doc_id, score), ...] best first
+        """
+        with self._lock:
+            doc_count = len(self._doc_lengths)
+            if doc_count == 0:
+                return []
+
+            avg_length = self._total_length / doc_count
+            scores = defaultdict(float)
+
+            for term in set(tokenize(query)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+
+                df = len(postings)
+                idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+
+                for doc_id, tf in postings.items():
+                    length_norm = 1 - self.b + self.b * self._doc_lengths[doc_id] / avg_length
+                    scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + self.k1 * length_norm)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit]
+
+
+#=============================================================
+# CATALOG INDEX (one per process, follows the catalog version)
+#=============================================================
+
+_catalog_index = None
+_catalog_lock = threading.Lock()
+_build_lock = threading.Lock()
+_rebuilding = False
+
+
+def _stored_fields(product: dict) -> dict:
+    stored = dict(product)
+    if stored.get("price") is not None:
+        stored["price"] = float(stored["price"])
+    return stored
+
+
+def catalog_version():
+    return get_cache().tag_version("catalog")
+
+
+def build_catalog_index(version=None) -> BM25Index:
+    from APPS.PRICE_TRACKER.models import Product
+
+    index = BM25Index()
+    index.version = version
+    for product in Product.objects.values(*DOCUMENT_FIELDS).iterator(chunk_size=1000):
+        index.add(product["id"], product_document(product), _stored_fields(product))
+    return index
+
+
+def refresh_catalog_index() -> BM25Index:
+    """
+    Builds the index of the current catalog and serves it
+    """
+    global _catalog_index
+
+    # Read before building: a product saved meanwhile leaves it stale
+    index = build_catalog_index(catalog_version())
+
+    with _catalog_lock:
+        _catalog_index = index
+    return index
+
+
+def rebuild_in_background():
+    global _rebuilding
+
+    with _catalog_lock:
+        if _rebuilding:
+            return
+        _rebuilding = True
+
+    def rebuild():
+        global _rebuilding
+        try:
+            refresh_catalog_index()
+        except Exception:
+            logger.exception("Rebuilding the chatbot index failed")
+        finally:
+            _rebuilding = False
+            connections.close_all()
+
+    threading.Thread(target=rebuild, name="chatbot-index", daemon=True).start()
+
+
+def get_catalog_index() -> BM25Index:
+    index = _catalog_index
+    if index is not None and (_rebuilding or index.version == catalog_version()):
+        return index
+
+    if index is None:
+        # Nothing to search yet, one thread builds and the others wait for it
+        with _build_lock:
+            if _catalog_index is None:
+                refresh_catalog_index()
+        return _catalog_index
+
+    rebuild_in_background()
+    return index
+
+
+def reset_catalog_index():
+    global _catalog_index
+
+    with _catalog_lock:
+        _catalog_index = None
@@ -0,0 +1,69 @@
+from django.conf import settings
+
+from .models import Message
+
+
+'''
+Token-budgeted conversation memory.
+
+The generator only ever sees:
+    - the running summary of older turns
+    - the newest messages that fit in AI_CHATBOT_CONTEXT_TOKENS
+
+Messages that fall out of the window are folded into the summary once and
+marked with Conversation.summarized_until, so each turn only reads the
+unsummarized tail instead of replaying the whole history.
+'''
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token is close enough for budgeting
+    return max(1, len(text or "") // 4)
+
+
+def add_message(conversation, role: str, content: str) -> Message:
+    return Message.objects.create(
+        conversation=conversation,
+        role=role,
+        content=content,
+        token_count=estimate_tokens(content),
+    )
+
+
+def build_context(conversation, generator) -> dict:
+    """
+    Returns {"summary": str, "history": [{"role", "content"}, ...]} oldest first
+    """
+    budget = getattr(settings, "AI_CHATBOT_CONTEXT_TOKENS", 1500)
+    available = budget - estimate_tokens(conversation.summary)
+
+    window = []
+    overflow = []
+    used = 0
+
+    tail = (
+        conversation.messages
+        .filter(id__gt=conversation.summarized_until)
+        .order_by("-id")
+        .values("id", "role", "content", "token_count")
+    )
+
+    for message in tail:
+        if not overflow and used + message["token_count"] <= available:
+            window.append(message)
+            used += message["token_count"]
+        else:
+            overflow.append(message)
+
+    if overflow:
+        overflow.reverse()
+        conversation.summary = generator.summarize(conversation.summary, overflow)
+        conversation.summarized_until = overflow[-1]["id"]
+        conversation.save(update_fields=["summary", "summarized_until", "updated_at"])
+
+    window.reverse()
+
+    return {
+        "summary": conversation.summary,
+        "history": [{"role": m["role"], "content": m["content"]} for m in window],
+    }
@@ -0,0 +1,23 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from APPS.PRICE_TRACKER.models import Product
+
+
+# Drop cached answers, they quote product names and prices. Other
+# processes tell by the "catalog" tag version, as does the index.
+# The cache module is imported on the first product change, not at
+# startup, management commands rarely need it.
+
+@receiver(post_save, sender=Product)
+def product_saved(sender, instance, **kwargs):
+    from .cache import get_response_cache
+
+    get_response_cache().clear()
+
+
+@receiver(post_delete, sender=Product)
+def product_deleted(sender, instance, **kwargs):
+    from .cache import get_response_cache
+
+    get_response_cache().clear()
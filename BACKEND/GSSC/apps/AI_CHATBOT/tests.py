@@ -1,3 +1,286 @@
-from django.test import TestCase
+import json
+import threading
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from APPS.PRICE_TRACKER.models import Product
+from GSSC.cache import invalidate_tags
+
+from .cache import ResponseCache, get_response_cache, normalize_question, reset_response_cache
+from .generators import LocalGenerator, reset_generator
+from . import index as index_module
+from .index import (
+    BM25Index,
+    get_catalog_index,
+    rebuild_in_background,
+    refresh_catalog_index,
+    reset_catalog_index,
+    tokenize,
+)
+from .memory import add_message, build_context
+from .models import Conversation
+
+
+class BM25IndexTests(TestCase):
+    def test_ranks_matching_document_first(self):
+        index = BM25Index()
+        index.add(1, tokenize("lithium battery deep cycle"))
+        index.add(2, tokenize("monocrystalline solar panel"))
+        index.add(3, tokenize("hybrid inverter mppt"))
+
+        self.assertEqual(index.search("solar panel")[0][0], 2)
+        self.assertEqual(index.search("unknown words"), [])
+
+    def test_remove_and_replace(self):
+        index = BM25Index()
+        index.add(1, tokenize("lithium battery"))
+        index.add(1, tokenize("hybrid inverter"))
+        self.assertEqual(index.search("battery"), [])
+        self.assertEqual(index.search("inverter")[0][0], 1)
+
+        index.remove(1)
+        self.assertEqual(len(index), 0)
+        self.assertEqual(index.search("inverter"), [])
+
+
+@override_settings(AI_CHATBOT_GENERATOR="APPS.AI_CHATBOT.generators.LocalGenerator")
+class ChatbotViewTests(TestCase):
+    def setUp(self):
+        reset_catalog_index()
+        reset_generator()
+        reset_response_cache()
+        # Rebuilt in the test's own thread, a background one would not see its transaction
+        self.rebuild = self.enterContext(
+            mock.patch.object(index_module, "rebuild_in_background", side_effect=refresh_catalog_index)
+        )
+        self.panel = Product.objects.create(
+            category="solar_panel", company="SolarTech", model="ST-550W",
+            price=Decimal("55000"), max_power="550W",
+            description="High efficiency mono-crystalline solar panel",
+        )
+        self.battery = Product.objects.create(
+            category="battery", company="PowerCell", model="PC-100Ah",
+            price=Decimal("90000"), description="Deep cycle lithium battery",
+        )
+
+    def tearDown(self):
+        reset_catalog_index()
+
+    def test_index_follows_catalog_changes(self):
+        index = get_catalog_index()
+        self.assertEqual(len(index), 2)
+
+        # A save here, in another worker or a bulk import, all change the version
+        inverter = Product.objects.create(
+            category="inverter", company="VoltMax", model="VM-5KW",
+            description="Pure sine wave hybrid inverter",
+        )
+        Product.objects.filter(pk=self.panel.pk).update(model="ST-600W")
+        invalidate_tags("catalog")
+
+        # The question that notices it still gets the previous index
+        self.assertIs(get_catalog_index(), index)
+        self.assertEqual(self.rebuild.call_count, 1)
+
+        rebuilt = get_catalog_index()
+        self.assertIsNot(rebuilt, index)
+        self.assertEqual(rebuilt.search("hybrid inverter")[0][0], inverter.pk)
+        self.assertEqual(rebuilt.documents[self.panel.pk]["model"], "ST-600W")
+        self.assertIs(get_catalog_index(), rebuilt)
+        self.assertEqual(self.rebuild.call_count, 1)
+
+    def test_stale_index_is_served_during_a_rebuild(self):
+        index = get_catalog_index()
+        invalidate_tags("catalog")
+
+        with mock.patch.object(index_module, "_rebuilding", True):
+            self.assertIs(get_catalog_index(), index)
+        self.rebuild.assert_not_called()
+
+    def test_background_rebuild_swaps_the_index_in(self):
+        index = get_catalog_index()
+        rebuilt = BM25Index()
+
+        with mock.patch.object(index_module, "rebuild_in_background", rebuild_in_background), \
+                mock.patch.object(index_module, "build_catalog_index", return_value=rebuilt):
+            invalidate_tags("catalog")
+            self.assertIs(get_catalog_index(), index)
+            for thread in threading.enumerate():
+                if thread.name == "chatbot-index":
+                    thread.join(5)
+
+        self.assertIs(index_module._catalog_index, rebuilt)
+        self.assertFalse(index_module._rebuilding)
+
+    def test_json_answer_is_deterministic(self):
+        first = self.client.post("/ai-chatbot/", {"query": "how many panels for 5 kW"})
+        second = self.client.post("/ai-chatbot/", {"query": "how many panels for 5 kW"})
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.json()["airesponse"], second.json()["airesponse"])
+        self.assertIn("12 panels of 550W", first.json()["airesponse"])
+        self.assertEqual(first.json()["products"][0], self.panel.pk)
+
+    def test_streams_server_sent_events(self):
+        response = self.client.post(
+            "/ai-chatbot/", {"query": "lithium battery"},
+            HTTP_ACCEPT="text/event-stream",
+        )
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+
+        events = [
+            chunk.decode().split("\n")
+            for chunk in response.streaming_content
+        ]
+        self.assertEqual(events[0][0], "event: sources")
+        self.assertEqual(json.loads(events[0][1][6:])["products"][0], self.battery.pk)
+        self.assertEqual(events[-1][0], "event: done")
+
+        tokens = "".join(
+            json.loads(lines[1][6:])["text"] for lines in events if lines[0] == "event: token"
+        )
+        expected = "".join(LocalGenerator().stream("lithium battery", [get_catalog_index().documents[self.battery.pk]]))
+        self.assertEqual(tokens, expected)
+
+    def test_query_is_required(self):
+        response = self.client.post("/ai-chatbot/", {})
+        self.assertEqual(response.status_code, 400)
+
+        for body in (["query"], "how many panels", 5):
+            response = self.client.post("/ai-chatbot/", json.dumps(body), content_type="application/json")
+            self.assertEqual(response.status_code, 400, body)
+
+    def test_zero_watt_panels_fall_back_to_550w(self):
+        answer = self.client.post("/ai-chatbot/", {"query": "how many 0w panels for 5 kW"}).json()["airesponse"]
+        self.assertIn("12 panels of 550W", answer)
+
+        unrated = {"category": "solar_panel", "max_power": "0W"}
+        self.assertIn("12 panels of 550W", LocalGenerator().panel_sizing("panels for 5 kW", [unrated]))
+
+    def test_repeated_question_is_served_from_cache(self):
+        first = self.client.post("/ai-chatbot/", {"query": "How many panels for 5kW?"}).json()
+        second = self.client.post("/ai-chatbot/", {"query": "how many panels for 5 kw"}).json()
+
+        self.assertFalse(first["cached"])
+        self.assertTrue(second["cached"])
+        self.assertEqual(first["airesponse"], second["airesponse"])
+        self.assertEqual(get_response_cache().stats()["hits"], 1)
+
+        # Catalog changes invalidate cached answers
+        self.panel.price = Decimal("50000")
+        self.panel.save()
+        third = self.client.post("/ai-chatbot/", {"query": "how many panels for 5 kw"}).json()
+        self.assertFalse(third["cached"])
+
+    def test_changes_made_by_other_processes_expire_cached_answers(self):
+        self.client.post("/ai-chatbot/", {"query": "lithium battery"})
+        self.assertTrue(self.client.post("/ai-chatbot/", {"query": "lithium battery"}).json()["cached"])
+
+        # No signal in this process, as for a scraper run or another worker
+        Product.objects.filter(pk=self.battery.pk).update(price=Decimal("80000"))
+        invalidate_tags("catalog")
+
+        self.assertFalse(self.client.post("/ai-chatbot/", {"query": "lithium battery"}).json()["cached"])
+        self.assertEqual(get_response_cache().stats()["stale"], 1)
+        self.assertTrue(self.client.post("/ai-chatbot/", {"query": "lithium battery"}).json()["cached"])
+
+    def test_follow_up_continues_conversation(self):
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create_user(username="buyer"))
+
+        first = client.post("/ai-chatbot/", {"query": "lithium battery"}).json()
+        client.post(
+            "/ai-chatbot/",
+            {"query": "solar panel", "conversation_id": first["conversation_id"]},
+        )
+
+        conversation = Conversation.objects.get(id=first["conversation_id"])
+        self.assertEqual(conversation.messages.count(), 4)
+
+        for missing_id in (999999, "abc"):
+            missing = client.post("/ai-chatbot/", {"query": "hi", "conversation_id": missing_id})
+            self.assertEqual(missing.status_code, 404)
+
+        # Someone else's thread does not exist for this user
+        other = APIClient()
+        other.force_authenticate(get_user_model().objects.create_user(username="other"))
+        stolen = other.post("/ai-chatbot/", {"query": "hi", "conversation_id": first["conversation_id"]})
+        self.assertEqual(stolen.status_code, 404)
+
+    def test_anonymous_questions_are_one_shot(self):
+        answer = self.client.post("/ai-chatbot/", {"query": "lithium battery"})
+        self.assertEqual(answer.status_code, 200)
+        self.assertIsNone(answer.json()["conversation_id"])
+        self.assertFalse(Conversation.objects.exists())
+
+        user = get_user_model().objects.create_user(username="buyer")
+        conversation = Conversation.objects.create(user=user)
+        guessed = self.client.post("/ai-chatbot/", {"query": "hi", "conversation_id": conversation.id})
+        self.assertEqual(guessed.status_code, 401)
+        self.assertEqual(conversation.messages.count(), 0)
+
+    def test_follow_ups_are_not_served_from_cache(self):
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create_user(username="buyer"))
+
+        # Caches the context-free answer
+        self.client.post("/ai-chatbot/", {"query": "solar panel"})
+
+        first = client.post("/ai-chatbot/", {"query": "lithium battery"}).json()
+        follow_up = client.post(
+            "/ai-chatbot/", {"query": "solar panel", "conversation_id": first["conversation_id"]},
+        ).json()
+        self.assertFalse(follow_up["cached"])
+
+        fresh = client.post("/ai-chatbot/", {"query": "solar panel"}).json()
+        self.assertTrue(fresh["cached"])
+
+
+class ResponseCacheTests(TestCase):
+    def test_normalization(self):
+        self.assertEqual(
+            normalize_question("How many panels for 5 kW?"),
+            normalize_question("how many PANEL for 5kw"),
+        )
+
+    def test_evicts_by_size_and_age(self):
+        cache = ResponseCache(max_entries=2, ttl=60)
+        cache.set("inverter", 1)
+        cache.set("battery", 2)
+        cache.get("inverter")
+        cache.set("panel", 3)
+
+        self.assertIsNone(cache.get("battery"))
+        self.assertEqual(cache.get("inverter"), 1)
+        self.assertEqual(cache.stats()["evicted"], 1)
+
+        cache.ttl = 0
+        cache.set("mppt", 4)
+        self.assertIsNone(cache.get("mppt"))
+        self.assertGreaterEqual(cache.stats()["expired"], 1)
+
+
+@override_settings(AI_CHATBOT_CONTEXT_TOKENS=30, AI_CHATBOT_SUMMARY_TOKENS=40)
+class ConversationMemoryTests(TestCase):
+    def test_old_turns_are_folded_into_summary(self):
+        conversation = Conversation.objects.create()
+        for turn in range(10):
+            add_message(conversation, "user", f"question number {turn} about solar panels")
+            add_message(conversation, "assistant", f"answer number {turn} about solar panels")
+
+        context = build_context(conversation, LocalGenerator())
+        conversation.refresh_from_db()
+
+        self.assertLessEqual(sum(len(m["content"]) // 4 for m in context["history"]), 30)
+        self.assertEqual(context["history"][-1]["content"], "answer number 9 about solar panels")
+        self.assertTrue(conversation.summary)
+        self.assertLessEqual(len(conversation.summary), 40 * 4)
+        self.assertGreater(conversation.summarized_until, 0)
+
+        # Already summarized messages are not read again
+        tail = conversation.messages.filter(id__gt=conversation.summarized_until).count()
+        self.assertEqual(tail, len(context["history"]))
@@ -4,4 +4,5 @@ from . import views
 
 urlpatterns = [
     path('', views.ai_chatbot_view, name="ai_chatbot"),
+    path('stats/', views.ai_chatbot_stats_view, name="ai_chatbot_stats"),
 ]
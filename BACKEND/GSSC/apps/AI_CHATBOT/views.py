@@ -1,5 +1,159 @@
-from django.shortcuts import render
+from collections.abc import Mapping
 
-# Create your views here.
+from django.http import StreamingHttpResponse
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.permissions import AllowAny, IsAdminUser
+from rest_framework.renderers import JSONRenderer
+
+from .generators import get_generator
+from .memory import add_message, build_context
+from .models import Conversation
+from .renderers import EventStreamRenderer, sse_event
+
+
+# The index and the response cache are imported on the first question, not
+# with the URLconf that GSSC/wsgi.py preloads: a worker that never answers
+# one doesn't carry them, the same as in signals.py.
+
+def retrieve_products(question: str, limit: int = 3) -> list:
+    from .index import get_catalog_index
+
+    index = get_catalog_index()
+    products = [index.documents.get(doc_id) for doc_id, _ in index.search(question, limit=limit)]
+    return [product for product in products if product]
+
+
+def answer_events(question: str, conversation=None):
+    """
+    Yields (event, data) pairs for one turn and stores both messages when
+    there is a conversation (anonymous questions are one-shot, nothing is
+    stored). Questions without earlier turns are served from the response
+    cache without touching the index or the generator.
+    """
+    from .cache import get_response_cache
+    from .index import catalog_version
+
+    cache = get_response_cache()
+    # Read before answering: a product saved meanwhile leaves the answer stale
+    version = catalog_version()
+    generator = get_generator()
+    context = build_context(conversation, generator) if conversation else {"summary": "", "history": []}
+
+    # Cached answers were given without context, a follow-up needs its own
+    follow_up = bool(context["history"] or context["summary"])
+    cached = None if follow_up else cache.get(question, version)
+
+    if conversation:
+        add_message(conversation, "user", question)
+
+    if cached is not None:
+        # Sources go out first so the client has something to render immediately
+        yield "sources", {"products": cached["products"], "cached": True}
+        chunks = [cached["airesponse"]]
+    else:
+        products = retrieve_products(question)
+        product_ids = [p["id"] for p in products]
+        yield "sources", {"products": product_ids, "cached": False}
+        chunks = generator.stream(question, products, context)
+
+    answer = []
+    for chunk in chunks:
+        answer.append(chunk)
+        yield "token", {"text": chunk}
+
+    answer = "".join(answer).strip()
+    if conversation:
+        add_message(conversation, "assistant", answer)
+
+    # Only answers that did not depend on earlier turns are reusable
+    if cached is None and not follow_up:
+        cache.set(question, {"airesponse": answer, "products": product_ids}, version)
+
+    yield "done", {"airesponse": answer, "conversation_id": conversation.id if conversation else None}
+
+
+def stream_answer(question: str, conversation):
+    for event, data in answer_events(question, conversation):
+        yield sse_event(event, data)
+
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+@renderer_classes([JSONRenderer, EventStreamRenderer])
 def ai_chatbot_view(request):
-    pass
\ No newline at end of file
+    """
+    POST {"query": "...", "conversation_id": optional}
+    Streams the answer as Server-Sent Events when the client sends
+    Accept: text/event-stream, otherwise returns the whole answer as JSON
+    """
+    if not isinstance(request.data, Mapping):
+        return Response(
+            {"error": "Expected a JSON object"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    question = str(request.data.get('query') or request.data.get('message') or '').strip()
+
+    if not question:
+        return Response(
+            {"error": "query is required"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    # Conversations belong to a logged in user. Anonymous questions are
+    # answered one at a time and not stored, so there is no thread id to
+    # guess and no table growing with every visitor.
+    conversation_id = request.data.get('conversation_id')
+
+    if not request.user.is_authenticated:
+        if conversation_id:
+            return Response(
+                {"error": "Log in to continue a conversation"},
+                status=status.HTTP_401_UNAUTHORIZED
+            )
+        conversation = None
+    elif conversation_id:
+        conversation = Conversation.objects.filter(
+            id=conversation_id if str(conversation_id).isdigit() else 0, user=request.user
+        ).first()
+        if conversation is None:
+            return Response(
+                {"error": "Conversation not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+    else:
+        conversation = Conversation.objects.create(user=request.user)
+
+    if isinstance(request.accepted_renderer, EventStreamRenderer):
+        response = StreamingHttpResponse(
+            stream_answer(question, conversation),
+            content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    events = {
+        event: data for event, data in answer_events(question, conversation)
+        if event != "token"
+    }
+
+    return Response({
+        "airesponse": events["done"]["airesponse"],
+        "products": events["sources"]["products"],
+        "cached": events["sources"]["cached"],
+        "conversation_id": events["done"]["conversation_id"],
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def ai_chatbot_stats_view(request):
+    """
+    Response cache hit rate and eviction counters for tuning
+    """
+    from .cache import get_response_cache
+
+    return Response(get_response_cache().stats())
@@ -1,3 +1,21 @@
 from django.contrib import admin
+from django.contrib.admin.forms import AdminAuthenticationForm
+from django.core.exceptions import ValidationError
 
-# Register your models here.
+from .hashing import HashingPoolBusy
+
+
+class PooledAdminAuthenticationForm(AdminAuthenticationForm):
+    """
+    Admin login that shows a saturated hashing pool as a form error,
+    outside DRF nothing turns HashingPoolBusy into a 429
+    """
+
+    def clean(self):
+        try:
+            return super().clean()
+        except HashingPoolBusy as exc:
+            raise ValidationError(str(exc.detail), code=exc.default_code)
+
+
+admin.site.login_form = PooledAdminAuthenticationForm
@@ -0,0 +1,38 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+from . import hashing
+
+UserModel = get_user_model()
+
+
+class PooledModelBackend(ModelBackend):
+    """
+    ModelBackend that verifies passwords in the bounded hashing pool.
+    The user lookup and any hash upgrade save stay on the request thread,
+    only the CPU-heavy hashing is offloaded.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return
+
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            # Hash once anyway so a missing user takes as long as a wrong password
+            hashing.make_password(password)
+            return
+
+        if not hashing.check_password(password, user.password):
+            return
+
+        # Upgrade the stored hash when the hasher or iteration count changed
+        if hashing.must_update(user.password):
+            user.password = hashing.make_password(password)
+            user.save(update_fields=["password"])
+
+        if self.user_can_authenticate(user):
+            return user
@@ -0,0 +1,119 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from rest_framework.exceptions import Throttled
+
+
+'''
+Password hashing is pure CPU work (PBKDF2 by default). hashlib releases the
+GIL while it runs, so a small thread pool lets a burst of logins share a fixed
+number of cores instead of pinning every request worker.
+
+Admission control:
+    - at most MAX_WORKERS hashes run at the same time
+    - at most MAX_PENDING more wait in the queue
+    - anything beyond that is rejected straight away with HTTP 429
+    - a hash still queued or running after TIMEOUT seconds is also a 429,
+      its slot is freed once it finishes
+'''
+
+
+class HashingPoolBusy(Throttled):
+    default_detail = "Too many login attempts in progress, please retry shortly."
+    default_code = "hashing_pool_busy"
+
+
+_lock = threading.Lock()
+_executor = None
+_slots = None
+
+
+def _pool_settings() -> dict:
+    config = {
+        "MAX_WORKERS": 4,
+        "MAX_PENDING": 16,
+        "TIMEOUT": 10,
+        "RETRY_AFTER": 1,
+    }
+    config.update(getattr(settings, "PASSWORD_HASHING_POOL", {}))
+    return config
+
+
+def _get_pool():
+    global _executor, _slots
+
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                config = _pool_settings()
+                _slots = threading.BoundedSemaphore(
+                    config["MAX_WORKERS"] + config["MAX_PENDING"]
+                )
+                _executor = ThreadPoolExecutor(
+                    max_workers=config["MAX_WORKERS"],
+                    thread_name_prefix="password-hashing",
+                )
+
+    return _executor, _slots
+
+
+def reset_pool():
+    """
+    Shuts the pool down so the next call rebuilds it from settings
+    """
+    global _executor, _slots
+
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+        _executor = None
+        _slots = None
+
+
+def run_in_pool(func, *args, **kwargs):
+    """
+    Runs func in the hashing pool and waits for the result.
+    Raises HashingPoolBusy instead of queueing when the pool is full.
+    """
+    executor, slots = _get_pool()
+    config = _pool_settings()
+
+    if not slots.acquire(blocking=False):
+        raise HashingPoolBusy(wait=config["RETRY_AFTER"])
+
+    try:
+        future = executor.submit(func, *args, **kwargs)
+    except BaseException:
+        slots.release()
+        raise
+
+    future.add_done_callback(lambda _: slots.release())
+
+    try:
+        return future.result(timeout=config["TIMEOUT"])
+    except FutureTimeout:
+        # Not started yet: drop it, the done callback frees the slot
+        future.cancel()
+        raise HashingPoolBusy(wait=config["RETRY_AFTER"])
+
+
+def check_password(password: str, encoded: str) -> bool:
+    return run_in_pool(hashers.check_password, password, encoded)
+
+
+def make_password(password: str) -> str:
+    return run_in_pool(hashers.make_password, password)
+
+
+def must_update(encoded: str) -> bool:
+    try:
+        hasher = hashers.identify_hasher(encoded)
+    except ValueError:
+        return False
+    # Same rule as django.contrib.auth.hashers.check_password
+    if hasher.algorithm != hashers.get_hasher("default").algorithm:
+        return True
+    return hasher.must_update(encoded)
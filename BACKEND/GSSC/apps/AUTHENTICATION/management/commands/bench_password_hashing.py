@@ -0,0 +1,59 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.core.management.base import BaseCommand
+
+from APPS.AUTHENTICATION import hashing
+
+
+class Command(BaseCommand):
+    help = "Benchmark logins/sec through the hashing pool for different PBKDF2 iteration counts"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--iterations",
+            nargs="+",
+            type=int,
+            default=[100_000, 300_000, 600_000, PBKDF2PasswordHasher.iterations],
+        )
+        parser.add_argument("--logins", type=int, default=64)
+        parser.add_argument("--clients", type=int, default=32)
+
+    def handle(self, *args, **options):
+        logins = options["logins"]
+        clients = options["clients"]
+        config = hashing._pool_settings()
+
+        self.stdout.write(
+            f"{logins} logins from {clients} clients, "
+            f"pool MAX_WORKERS={config['MAX_WORKERS']} MAX_PENDING={config['MAX_PENDING']}"
+        )
+        self.stdout.write(f"{'iterations':>12} {'ms/hash':>9} {'logins/s':>10} {'rejected':>9}")
+
+        for iterations in sorted(set(options["iterations"])):
+            hasher = PBKDF2PasswordHasher()
+            hasher.iterations = iterations
+            encoded = hasher.encode("correct horse battery", hasher.salt())
+
+            start = time.perf_counter()
+            hasher.verify("correct horse battery", encoded)
+            single_ms = (time.perf_counter() - start) * 1000
+
+            def login(_):
+                try:
+                    hashing.run_in_pool(hasher.verify, "correct horse battery", encoded)
+                    return True
+                except hashing.HashingPoolBusy:
+                    return False
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=clients) as request_workers:
+                results = list(request_workers.map(login, range(logins)))
+            elapsed = time.perf_counter() - start
+
+            accepted = sum(results)
+            self.stdout.write(
+                f"{iterations:>12} {single_ms:>9.1f} {accepted / elapsed:>10.1f} "
+                f"{logins - accepted:>9}"
+            )
@@ -1,3 +1,144 @@
-from django.test import TestCase
+import threading
+from contextlib import contextmanager
 
-# Create your tests here.
+from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, make_password
+from django.test import TestCase, override_settings
+
+from GSSC.throttling import reset_rate_limits
+
+from . import hashing
+
+
+class FastPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    # Keeps the tests quick, the pool doesn't care how long a hash takes
+    iterations = 1000
+
+
+FAST_HASHERS = [
+    "APPS.AUTHENTICATION.tests.FastPBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.MD5PasswordHasher",
+]
+
+
+@contextmanager
+def busy_pool():
+    """
+    Keeps every worker of the hashing pool on a hash that doesn't finish
+    until the block ends
+    """
+    hashing.reset_pool()
+    config = hashing._pool_settings()
+    started = threading.Barrier(config["MAX_WORKERS"] + 1)
+    release = threading.Event()
+
+    def block():
+        started.wait()
+        release.wait()
+
+    def occupy():
+        # With a short TIMEOUT the caller gives up, the worker stays busy
+        try:
+            hashing.run_in_pool(block)
+        except hashing.HashingPoolBusy:
+            pass
+
+    threads = [
+        threading.Thread(target=occupy)
+        for _ in range(config["MAX_WORKERS"])
+    ]
+    for thread in threads:
+        thread.start()
+    started.wait()
+    try:
+        yield
+    finally:
+        release.set()
+        for thread in threads:
+            thread.join()
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class HashingPoolTests(TestCase):
+    def setUp(self):
+        reset_rate_limits()
+        hashing.reset_pool()
+        self.addCleanup(hashing.reset_pool)
+        self.user = get_user_model().objects.create_user(username="ada", password="correct horse")
+
+    def login(self, password="correct horse"):
+        return self.client.post(
+            "/auth/login/",
+            {"username": "ada", "password": password},
+            content_type="application/json",
+        )
+
+    def test_login_returns_tokens(self):
+        response = self.login()
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("access", response.json())
+
+        self.assertEqual(self.login("wrong").status_code, 401)
+
+    @override_settings(PASSWORD_HASHING_POOL={"MAX_WORKERS": 1, "MAX_PENDING": 0, "RETRY_AFTER": 3})
+    def test_full_pool_is_a_429_with_retry_after(self):
+        with busy_pool():
+            response = self.login()
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "3")
+        self.assertEqual(self.login().status_code, 200)
+
+    @override_settings(PASSWORD_HASHING_POOL={"MAX_WORKERS": 1, "MAX_PENDING": 1, "TIMEOUT": 0.05})
+    def test_hash_waiting_past_the_timeout_is_a_429(self):
+        with busy_pool():
+            response = self.login()
+
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("Retry-After", response)
+        # The queued hash gave its slot back
+        self.assertEqual(self.login().status_code, 200)
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class PooledModelBackendTests(TestCase):
+    def setUp(self):
+        hashing.reset_pool()
+        self.addCleanup(hashing.reset_pool)
+        self.user = get_user_model().objects.create_user(
+            username="ada", password="correct horse", is_staff=True, is_superuser=True,
+        )
+
+    def test_authenticate(self):
+        self.assertEqual(authenticate(None, username="ada", password="correct horse"), self.user)
+        self.assertIsNone(authenticate(None, username="ada", password="wrong"))
+        self.assertIsNone(authenticate(None, username="nobody", password="correct horse"))
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(authenticate(None, username="ada", password="correct horse"))
+
+    def test_upgrades_hashes_of_an_older_hasher(self):
+        self.user.password = make_password("correct horse", hasher="md5")
+        self.user.save()
+
+        self.assertEqual(authenticate(None, username="ada", password="correct horse"), self.user)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("pbkdf2_sha256$1000$"))
+
+    @override_settings(PASSWORD_HASHING_POOL={"MAX_WORKERS": 1, "MAX_PENDING": 0})
+    def test_admin_login_with_a_full_pool_is_a_form_error(self):
+        with busy_pool():
+            response = self.client.post(
+                "/admin/login/",
+                {"username": "ada", "password": "correct horse", "next": "/admin/"},
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Too many login attempts in progress")
+
+        response = self.client.post(
+            "/admin/login/",
+            {"username": "ada", "password": "correct horse", "next": "/admin/"},
+        )
+        self.assertRedirects(response, "/admin/", fetch_redirect_response=False)
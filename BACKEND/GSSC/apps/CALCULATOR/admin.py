@@ -1,3 +1,21 @@
 from django.contrib import admin
 
-# Register your models here.
+from GSSC.admin_tools import LargeTableAdmin
+
+from .models import PowerCalculation, SolarPanelCalculation
+
+
+@admin.register(SolarPanelCalculation)
+class SolarPanelCalculationAdmin(LargeTableAdmin):
+    list_display = ("id", "panel_watt", "backup_hours", "solar_panel_quantity",
+                    "total_daily_power_kwh", "created_at")
+    list_filter = (("created_at", admin.DateFieldListFilter),)
+    search_fields = ("=id",)
+
+
+@admin.register(PowerCalculation)
+class PowerCalculationAdmin(LargeTableAdmin):
+    list_display = ("id", "solarpanel_quantity", "panelwatt", "backup_hours",
+                    "total_daily_power_kwh", "battery_capacity_kwh", "created_at")
+    list_filter = (("created_at", admin.DateFieldListFilter),)
+    search_fields = ("=id",)
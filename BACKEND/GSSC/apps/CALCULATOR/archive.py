@@ -0,0 +1,175 @@
+import gzip
+import json
+import os
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import PowerCalculation, SolarPanelCalculation
+
+
+'''
+Retention for the calculation history tables.
+
+Every call of the calculator endpoints adds a SolarPanelCalculation or
+PowerCalculation row. `manage.py archive_calculations` moves rows older
+than RETENTION_DAYS out of the database into one gzipped JSON Lines file
+per table and day:
+
+    <DIRECTORY>/powercalculation/2026/03/2026-03-14.jsonl.gz
+
+A batch of BATCH_SIZE rows, oldest first, is appended to its day files
+(a new gzip member per append) and fsynced before the same rows are
+deleted in one short transaction, so locks never outlive a batch and a
+crash can only leave a row in both places, never in neither. Readers drop
+such duplicates by id.
+
+calculation_history() reads a time range across both: archived days from
+the files, the rest from the table, oldest first.
+'''
+
+MODELS = {model._meta.model_name: model for model in (SolarPanelCalculation, PowerCalculation)}
+
+
+def archive_settings() -> dict:
+    config = {
+        "DIRECTORY": Path(settings.BASE_DIR) / "archive",
+        "RETENTION_DAYS": 90,
+        "BATCH_SIZE": 1000,
+        "PAUSE": 0.0,
+    }
+    config.update(getattr(settings, "CALCULATION_ARCHIVE", {}))
+    return config
+
+
+def partition_path(model, day) -> Path:
+    return (
+        Path(archive_settings()["DIRECTORY"]) / model._meta.model_name
+        / f"{day:%Y}" / f"{day:%m}" / f"{day.isoformat()}.jsonl.gz"
+    )
+
+
+#=============================================================
+# ARCHIVING
+#=============================================================
+
+class ArchiveEncoder(DjangoJSONEncoder):
+    def default(self, o):
+        # DjangoJSONEncoder drops the microseconds
+        if isinstance(o, datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def write_partition(path: Path, rows: list):
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(path, "ab") as raw:
+        # Each append is a complete gzip member, gzip readers concatenate them
+        with gzip.GzipFile(fileobj=raw, mode="wb") as archive:
+            for row in rows:
+                archive.write(json.dumps(row, cls=ArchiveEncoder, separators=(",", ":")).encode() + b"\n")
+        raw.flush()
+        os.fsync(raw.fileno())
+
+
+def archive_batch(model, before, batch_size: int) -> int:
+    """
+    Archives and deletes up to batch_size rows created before `before`
+    """
+    rows = list(model.objects.filter(created_at__lt=before).order_by("id").values()[:batch_size])
+    if not rows:
+        return 0
+
+    days = {}
+    for row in rows:
+        days.setdefault(timezone.localdate(row["created_at"], dt_timezone.utc), []).append(row)
+
+    for day, day_rows in days.items():
+        write_partition(partition_path(model, day), day_rows)
+
+    with transaction.atomic():
+        model.objects.filter(id__in=[row["id"] for row in rows]).delete()
+
+    return len(rows)
+
+
+def archive_calculations(model, before=None, batch_size: int = None, pause: float = None) -> int:
+    """
+    Moves every row older than the retention age, returns how many
+    """
+    config = archive_settings()
+    before = before or timezone.now() - timedelta(days=config["RETENTION_DAYS"])
+    batch_size = batch_size or config["BATCH_SIZE"]
+    pause = config["PAUSE"] if pause is None else pause
+
+    archived = 0
+    while moved := archive_batch(model, before, batch_size):
+        archived += moved
+        if moved < batch_size:
+            break
+        if pause:
+            # Lets other writers at the table between two batches
+            time.sleep(pause)
+
+    return archived
+
+
+#=============================================================
+# READING
+#=============================================================
+
+def read_partition(path: Path):
+    seen = set()
+    with gzip.open(path, "rt") as archive:
+        for line in archive:
+            row = json.loads(line)
+            if row["id"] in seen:
+                continue
+            seen.add(row["id"])
+            row["created_at"] = parse_datetime(row["created_at"])
+            yield row
+
+
+def archived_rows(model, start=None, end=None):
+    """
+    Archived rows with start <= created_at < end, oldest first
+    """
+    root = Path(archive_settings()["DIRECTORY"]) / model._meta.model_name
+
+    # Zero padded names sort by date
+    for path in sorted(root.glob("*/*/*.jsonl.gz")):
+        day = parse_date(path.name.split(".")[0])
+        if start is not None and day < timezone.localdate(start, dt_timezone.utc):
+            continue
+        if end is not None and day > timezone.localdate(end, dt_timezone.utc):
+            break
+
+        for row in read_partition(path):
+            if (start is None or row["created_at"] >= start) and (end is None or row["created_at"] < end):
+                yield row
+
+
+def calculation_history(model, start=None, end=None):
+    """
+    Rows with start <= created_at < end from the archive and the table, as
+    dicts of the model's fields, oldest first
+    """
+    last_archived = 0
+    for row in archived_rows(model, start, end):
+        last_archived = max(last_archived, row["id"])
+        yield row
+
+    rows = model.objects.filter(id__gt=last_archived)
+    if start is not None:
+        rows = rows.filter(created_at__gte=start)
+    if end is not None:
+        rows = rows.filter(created_at__lt=end)
+
+    yield from rows.order_by("created_at", "id").values().iterator(chunk_size=2000)
@@ -0,0 +1,271 @@
+import math
+import random
+import re
+
+from GSSC.cache import get_cache, make_key
+from APPS.PRICE_TRACKER.similarity import parse_unit
+
+from .services import LOSS_FACTOR, SOILING, SUN_HOURS
+
+
+'''
+Battery sizing by hourly dispatch.
+
+power_to_panel_night_load sizes backup as load x backup hours, with no
+depth of discharge, charging losses or bad weather. Here a year of days is
+simulated hour by hour instead:
+
+    pv[d, h]  = pv_kw x effective sun hours of day d x SOLAR_SHAPE[h]
+    net[d, h] = pv[d, h] - load[h]
+
+    surplus  charges the battery (x round-trip efficiency) up to its usable capacity
+    deficit  is served from the battery, what it cannot cover is lost load
+
+Each day's effective sun hours are drawn from the same weather, loss factor
+and soiling distributions as the Monte Carlo yield estimate, from a fixed
+seed, so one profile always gives the same answer.
+
+Serving the deficit whenever possible is the optimal dispatch when the only
+goal is to minimise lost load, and lost load never grows with capacity, so
+the smallest bank of one battery product meeting the loss-of-load target is
+found by doubling the unit count and then bisecting.
+
+Results are cached per (profile hash, battery product) so the quotation
+screen can rank every battery in the catalog.
+'''
+
+# Share of the daily solar energy produced in each hour, a half sine from 06:00 to 18:00
+SOLAR_SHAPE = [0.0] * 24
+for _hour in range(6, 18):
+    SOLAR_SHAPE[_hour] = math.sin(math.pi * (_hour + 0.5 - 6) / 12)
+SOLAR_SHAPE = [share / sum(SOLAR_SHAPE) for share in SOLAR_SHAPE]
+
+# chemistry -> depth of discharge, round-trip efficiency, rated cycles at that depth, calendar life
+CHEMISTRY = {
+    "lithium": {"dod": 0.90, "efficiency": 0.95, "cycle_life": 6000, "calendar_years": 15},
+    "lead_acid": {"dod": 0.50, "efficiency": 0.80, "cycle_life": 1200, "calendar_years": 5},
+}
+
+# Nominal voltage of one unit when the product does not state it
+DEFAULT_VOLTAGE = {"lithium": 12.8, "lead_acid": 12.0}
+
+MAX_UNITS = 64
+DEFAULT_LOSS_OF_LOAD = 0.01
+# Far above any site, low enough that a simulated year stays finite
+MAX_LOAD_WH = 1e9     # per hour, as the bulk quotation appliance values
+MAX_PV_KW = 1e6
+SIZING_TTL = 24 * 60 * 60
+
+KWH_RE = re.compile(r"(\d+(?:\.\d+)?)\s*kwh", re.IGNORECASE)
+
+
+def battery_spec(product: dict):
+    """
+    Usable energy and ageing of one battery unit, None when its capacity is unknown
+    """
+    text = " ".join(str(product.get(field) or "") for field in ("model", "type", "description", "features"))
+    chemistry = "lithium" if re.search(r"lithium|li-ion|lifepo4", text, re.IGNORECASE) else "lead_acid"
+
+    kwh_match = KWH_RE.search(text)
+    if kwh_match:
+        kwh = float(kwh_match.group(1))
+    else:
+        ah = parse_unit(text, "ah")
+        if not ah:
+            return None
+        voltage = parse_unit(text, "v") or DEFAULT_VOLTAGE[chemistry]
+        kwh = ah * voltage / 1000
+
+    price = product.get("price")
+    return {
+        "id": product.get("id"),
+        "chemistry": chemistry,
+        "kwh": round(kwh, 3),
+        "price": float(price) if price is not None else None,
+        **CHEMISTRY[chemistry],
+    }
+
+
+#=============================================================
+# PROFILE
+#=============================================================
+
+def build_profile(hourly_load_wh: list, pv_kw: float = 0.0, days: int = 365, seed: int = 0,
+                  loss_of_load: float = DEFAULT_LOSS_OF_LOAD) -> dict:
+    """
+    Everything the dispatch depends on, plus its hash for caching
+    """
+    if len(hourly_load_wh) != 24:
+        raise ValueError("hourly_load_wh needs 24 values, one per hour of the day")
+
+    load = [float(value) for value in hourly_load_wh]
+    pv_kw, loss_of_load = float(pv_kw), float(loss_of_load)
+    # NaN fails every comparison, so it is rejected along with inf and negatives
+    if not all(0 <= value <= MAX_LOAD_WH for value in load):
+        raise ValueError(f"hourly_load_wh values must be between 0 and {MAX_LOAD_WH:g}")
+    if not 0 <= pv_kw <= MAX_PV_KW:
+        raise ValueError(f"pv_kw must be between 0 and {MAX_PV_KW:g}")
+    if not 0 <= loss_of_load <= 1:
+        raise ValueError("loss_of_load must be between 0 and 1")
+
+    profile = {
+        "load": [round(value, 1) for value in load],
+        "pv_kw": round(pv_kw, 3),
+        "days": int(days),
+        "seed": int(seed),
+        "loss_of_load": loss_of_load,
+    }
+    profile["hash"] = make_key(profile)
+    return profile
+
+
+def load_profile(total_hourly_wh: float, backup_hours: float, sun_hours: int = 8) -> list:
+    """
+    The calculator's load model as 24 hours: the load runs through the
+    sun hours (centred on noon) and for backup_hours after them
+    """
+    if not 0 <= backup_hours < math.inf:
+        raise ValueError("backup_hours must be finite and not negative")
+
+    start = 12 - sun_hours // 2
+    end = min(24, start + sun_hours + math.ceil(backup_hours))
+    return [total_hourly_wh if start <= hour < end else 0.0 for hour in range(24)]
+
+
+def net_energy(profile: dict) -> list:
+    """
+    pv - load for every simulated hour, in Wh
+    """
+    rng = random.Random(profile["seed"])
+    mean, spread = SUN_HOURS
+    loss_low, loss_mode, loss_high = LOSS_FACTOR
+    soiling_low, soiling_mode, soiling_high = SOILING
+    load = profile["load"]
+    pv_wh = profile["pv_kw"] * 1000
+
+    net = []
+    for _ in range(profile["days"]):
+        sun_hours = (
+            max(rng.gauss(mean, mean * spread), 0)
+            * rng.triangular(loss_low, loss_high, loss_mode)
+            * (1 - rng.triangular(soiling_low, soiling_high, soiling_mode))
+        )
+        daily_wh = pv_wh * sun_hours
+        net.extend(daily_wh * share - load[hour] for hour, share in enumerate(SOLAR_SHAPE))
+
+    return net
+
+
+#=============================================================
+# DISPATCH
+#=============================================================
+
+def dispatch(net: list, usable_wh: float, efficiency: float) -> dict:
+    """
+    Greedy hourly dispatch from a full battery
+    """
+    charge = usable_wh
+    lost = throughput = 0.0
+
+    for energy in net:
+        if energy >= 0:
+            charge = min(usable_wh, charge + energy * efficiency)
+        else:
+            served = min(charge, -energy)
+            charge -= served
+            throughput += served
+            lost += -energy - served
+
+    return {"lost_wh": lost, "throughput_wh": throughput}
+
+
+def size_battery(profile: dict, battery: dict, net: list = None) -> dict:
+    """
+    Smallest number of units of one battery meeting the loss-of-load target
+    """
+    net = net if net is not None else net_energy(profile)
+    demand = sum(profile["load"]) * profile["days"]
+    unit_wh = battery["kwh"] * 1000 * battery["dod"]
+
+    def loss(units):
+        result = dispatch(net, units * unit_wh, battery["efficiency"])
+        return result["lost_wh"] / demand if demand else 0.0, result
+
+    target = profile["loss_of_load"]
+
+    # Doubling finds a bank that is big enough, bisection the smallest one
+    high = 1
+    while loss(high)[0] > target:
+        if high >= MAX_UNITS:
+            return {"battery": battery["id"], "meets_target": False,
+                    "reason": f"over {MAX_UNITS} units needed"}
+        high = min(high * 2, MAX_UNITS)
+
+    low = high // 2
+    while high - low > 1:
+        middle = (low + high) // 2
+        if loss(middle)[0] <= target:
+            high = middle
+        else:
+            low = middle
+
+    loss_of_load, result = loss(high)
+    usable_kwh = high * unit_wh / 1000
+    cycles_per_year = (result["throughput_wh"] / 1000 / usable_kwh) * 365 / profile["days"] if usable_kwh else 0
+    life_years = min(
+        battery["calendar_years"],
+        battery["cycle_life"] / cycles_per_year if cycles_per_year else math.inf,
+    )
+
+    return {
+        "battery": battery["id"],
+        "meets_target": True,
+        "units": high,
+        "nominal_kwh": round(high * battery["kwh"], 2),
+        "usable_kwh": round(usable_kwh, 2),
+        "loss_of_load": round(loss_of_load, 4),
+        "cycles_per_year": round(cycles_per_year, 1),
+        "expected_life_years": round(life_years, 1),
+        "total_price": round(high * battery["price"], 2) if battery["price"] is not None else None,
+    }
+
+
+def rank_batteries(profile: dict) -> list:
+    """
+    Sizing of every catalog battery, cheapest bank meeting the target first
+    """
+    from APPS.PRICE_TRACKER.models import Product
+
+    batteries = [
+        spec for spec in (
+            battery_spec(product) for product in
+            Product.objects.filter(category="battery").values("id", "model", "type", "description", "features", "price")
+        )
+        if spec
+    ]
+
+    # The simulated year is only built if some battery is not cached yet
+    simulated = {}
+
+    def compute(battery):
+        if "net" not in simulated:
+            simulated["net"] = net_energy(profile)
+        return size_battery(profile, battery, simulated["net"])
+
+    cache = get_cache()
+    results = [
+        cache.get_or_set(
+            f"battery-sizing:{profile['hash']}:{battery['id']}:{make_key(battery)}",
+            lambda battery=battery: compute(battery),
+            ttl=SIZING_TTL,
+            tags=("catalog",),
+        )
+        for battery in batteries
+    ]
+
+    return sorted(results, key=lambda result: (
+        not result["meets_target"],
+        result.get("total_price") is None,
+        result.get("total_price") or 0,
+        result.get("usable_kwh") or 0,
+    ))
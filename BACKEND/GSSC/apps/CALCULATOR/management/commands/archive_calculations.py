@@ -0,0 +1,33 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from APPS.CALCULATOR.archive import MODELS, archive_calculations, archive_settings
+
+
+class Command(BaseCommand):
+    help = (
+        "Move calculation history older than the retention age into gzipped "
+        "JSON Lines files, one per table and day (run from cron, e.g. nightly)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=None, help="retention age, default RETENTION_DAYS")
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument("--pause", type=float, default=None, help="seconds between two batches")
+        parser.add_argument("--model", choices=sorted(MODELS), action="append",
+                            help="table to archive, default all")
+
+    def handle(self, *args, **options):
+        config = archive_settings()
+        days = config["RETENTION_DAYS"] if options["days"] is None else options["days"]
+        before = timezone.now() - timedelta(days=days)
+
+        for name in options["model"] or sorted(MODELS):
+            archived = archive_calculations(
+                MODELS[name], before, batch_size=options["batch_size"], pause=options["pause"]
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f"{name}: archived {archived} rows older than {before:%Y-%m-%d %H:%M} to {config['DIRECTORY']}"
+            ))
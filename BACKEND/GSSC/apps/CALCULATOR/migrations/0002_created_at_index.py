@@ -0,0 +1,23 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('CALCULATOR', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='powercalculation',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='solarpanelcalculation',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+    ]
@@ -12,7 +12,7 @@ class SolarPanelCalculation(models.Model):
     solar_panel_quantity = models.IntegerField()
 
 
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
 
     def __str__(self):
@@ -33,7 +33,7 @@ class PowerCalculation(models.Model):
     battery_capacity_kwh = models.FloatField()
 
 
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
 
     def __str__(self):
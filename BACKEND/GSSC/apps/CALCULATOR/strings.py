@@ -0,0 +1,298 @@
+import math
+import re
+
+from GSSC.cache import cached
+from APPS.PRICE_TRACKER.similarity import parse_unit
+
+
+'''
+String / MPPT layout solver for a panel + inverter pair.
+
+Each MPPT input of the inverter gets `parallel` strings of `series` panels
+(or nothing). A layout is valid when, for every used MPPT:
+
+    series x Voc at the coldest morning  <= min(inverter max DC V, panel max system V)
+    series x Vmp on the hottest cell     >= MPPT minimum voltage
+    series x Vmp at STC                  <= MPPT maximum voltage
+    parallel x Isc                       <= inverter max current per MPPT
+
+and the total DC power stays under MAX_DC_AC_RATIO x inverter AC power.
+
+Search:
+    1. the voltage and current limits give the valid (series, parallel) pairs
+       of one MPPT directly, no enumeration of impossible string lengths
+    2. MPPTs are interchangeable, so layouts are enumerated as non-decreasing
+       sequences of those options (each combination once, not once per order)
+    3. layouts are searched for one exact panel count at a time, a branch
+       stops as soon as it has too many panels or can no longer reach the
+       count with the MPPTs left
+    4. without a requested count, counts are tried outwards from the target
+       DC/AC ratio and the search ends once further counts cannot win
+
+Electrical specs come from the product text when it lists them (Voc, Isc,
+MPPT window, ...), otherwise from typical datasheet values for the
+panel's wattage class and the inverter's size.
+'''
+
+MIN_AMBIENT_C = -5       # coldest morning, highest open circuit voltage
+MAX_CELL_C = 70          # hottest cell temperature, lowest MPP voltage
+VOC_TEMP_COEFF = -0.0028   # per degree C
+VMP_TEMP_COEFF = -0.0036
+
+MAX_DC_AC_RATIO = 1.3
+TARGET_DC_AC_RATIO = 1.15
+
+# Layouts collected per panel count before the search stops
+MAX_CANDIDATES = 200
+
+# Wattage class -> typical current at maximum power (A)
+PANEL_IMP_CLASSES = [(500, 13.2), (400, 10.9), (0, 9.5)]
+
+# Inverter AC kW class -> typical DC input
+INVERTER_CLASSES = [
+    (6, {"max_dc_voltage": 500, "mppt_min": 120, "mppt_max": 450, "mppts": 2, "max_current": 16}),
+    (15, {"max_dc_voltage": 1000, "mppt_min": 200, "mppt_max": 850, "mppts": 2, "max_current": 16}),
+    # Commercial inverters get about one MPPT per 10 kW
+    (math.inf, {"max_dc_voltage": 1100, "mppt_min": 200, "mppt_max": 1000, "mppts": None, "max_current": 32}),
+]
+
+SPEC_RE = {
+    "voc": re.compile(r"voc\D{0,5}(\d+(?:\.\d+)?)", re.IGNORECASE),
+    "vmp": re.compile(r"vmp\D{0,5}(\d+(?:\.\d+)?)", re.IGNORECASE),
+    "isc": re.compile(r"isc\D{0,5}(\d+(?:\.\d+)?)", re.IGNORECASE),
+    "imp": re.compile(r"imp\D{0,5}(\d+(?:\.\d+)?)", re.IGNORECASE),
+    "mppts": re.compile(r"(\d+)\s*mppts?\b", re.IGNORECASE),
+    "mppt_window": re.compile(r"mppt\D{0,15}(\d+)\s*-\s*(\d+)\s*v", re.IGNORECASE),
+    "max_dc_voltage": re.compile(r"max(?:imum)?\.?\s*dc\D{0,10}(\d+)\s*v", re.IGNORECASE),
+    "max_current": re.compile(r"(\d+(?:\.\d+)?)\s*a\s*(?:per|/)\s*mppt", re.IGNORECASE),
+}
+
+
+def spec_text(product: dict) -> str:
+    return " ".join(str(product.get(field) or "") for field in ("model", "description", "features", "type"))
+
+
+def find_number(name: str, text: str):
+    match = SPEC_RE[name].search(text)
+    return float(match.group(1)) if match else None
+
+
+def panel_spec(product: dict):
+    """
+    Electrical spec of a panel, None when its wattage is unknown
+    """
+    watts = parse_unit(product.get("max_power"), "w") or parse_unit(product.get("model"), "w")
+    if not watts:
+        return None
+
+    text = spec_text(product)
+    imp = find_number("imp", text) or next(imp for floor, imp in PANEL_IMP_CLASSES if watts >= floor)
+    vmp = find_number("vmp", text) or watts / imp
+    voc = find_number("voc", text) or vmp * 1.19
+    isc = find_number("isc", text) or imp * 1.06
+
+    return {
+        "id": product.get("id"),
+        "watts": watts,
+        "voc": voc,
+        "vmp": vmp,
+        "isc": isc,
+        "max_system_voltage": parse_unit(product.get("max_system_voltage"), "v") or 1000,
+    }
+
+
+def inverter_spec(product: dict):
+    """
+    DC input spec of an inverter, None when its AC power is unknown
+    """
+    watts = parse_unit(product.get("max_power"), "w") or parse_unit(product.get("model"), "w")
+    if not watts:
+        return None
+
+    ac_kw = watts / 1000
+    spec = dict(next(defaults for limit, defaults in INVERTER_CLASSES if ac_kw <= limit))
+
+    text = spec_text(product)
+    window = SPEC_RE["mppt_window"].search(text)
+    if window:
+        spec["mppt_min"], spec["mppt_max"] = float(window.group(1)), float(window.group(2))
+    for name in ("mppts", "max_dc_voltage", "max_current"):
+        value = find_number(name, text)
+        if value:
+            spec[name] = value
+    spec["mppts"] = int(spec["mppts"] or max(2, math.ceil(ac_kw / 10)))
+
+    return {"id": product.get("id"), "ac_kw": ac_kw, **spec}
+
+
+#=============================================================
+# SOLVER
+#=============================================================
+
+def mppt_options(panel: dict, inverter: dict) -> list:
+    """
+    Valid (series, parallel) pairs for one MPPT, fewest panels first
+    """
+    voc_cold = panel["voc"] * (1 + VOC_TEMP_COEFF * (MIN_AMBIENT_C - 25))
+    vmp_hot = panel["vmp"] * (1 + VMP_TEMP_COEFF * (MAX_CELL_C - 25))
+    voltage_limit = min(inverter["max_dc_voltage"], panel["max_system_voltage"])
+
+    series_min = max(1, math.ceil(inverter["mppt_min"] / vmp_hot))
+    series_max = min(
+        math.floor(voltage_limit / voc_cold),
+        math.floor(inverter["mppt_max"] / panel["vmp"]),
+    )
+    parallel_max = math.floor(inverter["max_current"] / panel["isc"])
+
+    options = [
+        (series, parallel)
+        for series in range(series_min, series_max + 1)
+        for parallel in range(1, parallel_max + 1)
+    ]
+    return sorted(options, key=lambda option: (option[0] * option[1], option))
+
+
+def describe_layout(mppts: tuple, panel: dict, inverter: dict) -> dict:
+    modules = sum(series * parallel for series, parallel in mppts)
+    dc_kw = modules * panel["watts"] / 1000
+
+    return {
+        "mppts": [{"series": series, "parallel": parallel} for series, parallel in mppts],
+        "unused_mppts": inverter["mppts"] - len(mppts),
+        "panels": modules,
+        "strings": sum(parallel for _, parallel in mppts),
+        "dc_kw": round(dc_kw, 2),
+        "dc_ac_ratio": round(dc_kw / inverter["ac_kw"], 2),
+        "max_string_voc": round(
+            max(series for series, _ in mppts) * panel["voc"] * (1 + VOC_TEMP_COEFF * (MIN_AMBIENT_C - 25)), 1
+        ),
+    }
+
+
+def exact_layouts(options: list, mppts: int, panels: int, cap: int = MAX_CANDIDATES) -> list:
+    """
+    Layouts using exactly `panels` panels on at most `mppts` MPPTs.
+    Largest strings are tried first, so the first layouts found are the
+    ones with the fewest strings.
+    """
+    options = options[::-1]
+    found = []
+
+    def search(start: int, chosen: list, used: int):
+        if used == panels:
+            found.append(tuple(chosen))
+            return
+
+        mppts_left = mppts - len(chosen)
+        if mppts_left == 0 or len(found) >= cap:
+            return
+
+        for index in range(start, len(options)):
+            series, parallel = options[index]
+            size = series * parallel
+            if used + mppts_left * size < panels:
+                break       # this option and every smaller one fall short
+            if used + size > panels:
+                continue
+            chosen.append(options[index])
+            search(index, chosen, used + size)
+            chosen.pop()
+
+    search(0, [], 0)
+    return found
+
+
+def solve_layouts(panel: dict, inverter: dict, panel_count: int = None, limit: int = 3) -> dict:
+    """
+    Best layouts for a panel / inverter pair.
+    With panel_count only layouts using exactly that many panels qualify,
+    otherwise panel counts are tried outwards from TARGET_DC_AC_RATIO.
+    """
+    options = mppt_options(panel, inverter)
+    if not options:
+        return {"layouts": [], "reason": "no string length fits the inverter voltage and current window"}
+
+    max_panels = math.floor(MAX_DC_AC_RATIO * inverter["ac_kw"] * 1000 / panel["watts"])
+
+    if panel_count is not None:
+        if panel_count < 1:
+            return {"layouts": [], "reason": "panel_count must be at least 1"}
+        if panel_count > max_panels:
+            return {"layouts": [], "reason": f"{panel_count} panels exceed the inverter's {max_panels} panel limit"}
+        target, counts = panel_count, [panel_count]
+    else:
+        target = round(TARGET_DC_AC_RATIO * inverter["ac_kw"] * 1000 / panel["watts"])
+        counts = sorted(range(1, max_panels + 1), key=lambda count: (abs(count - target), -count))
+
+    found = []
+    for count in counts:
+        # Counts come closest first, stop once further ones can only score worse
+        if len(found) >= limit and abs(count - target) > abs(found_at - target):
+            break
+        layouts = exact_layouts(options, inverter["mppts"], count)
+        if layouts:
+            found += layouts
+            found_at = count
+
+    if not found:
+        wanted = panel_count if panel_count is not None else f"1 to {max_panels}"
+        return {"layouts": [], "reason": f"no combination of strings adds up to {wanted} panels"}
+
+    def score(mppts):
+        panels = sum(series * parallel for series, parallel in mppts)
+        lengths = [series for series, _ in mppts]
+        return (
+            abs(panels - target),
+            sum(parallel for _, parallel in mppts),     # fewer strings, less cabling
+            max(lengths) - min(lengths),                # balanced MPPTs
+            -panels,
+        )
+
+    best = sorted(found, key=score)[:limit]
+    return {"layouts": [describe_layout(mppts, panel, inverter) for mppts in best], "reason": None}
+
+
+#=============================================================
+# CATALOG
+#=============================================================
+
+SPEC_FIELDS = ("id", "category", "company", "model", "max_power", "max_system_voltage",
+               "description", "features", "type")
+
+
+def catalog_specs():
+    from APPS.PRICE_TRACKER.models import Product
+
+    panels, inverters = [], []
+    for product in Product.objects.filter(category__in=("solar_panel", "inverter")).values(*SPEC_FIELDS):
+        if product["category"] == "solar_panel":
+            spec = panel_spec(product)
+            if spec:
+                panels.append(spec)
+        else:
+            spec = inverter_spec(product)
+            if spec:
+                inverters.append(spec)
+
+    return panels, inverters
+
+
+@cached(ttl=60 * 60, tags=("catalog",))
+def compatibility_matrix(panel_count: int = None) -> list:
+    """
+    Best layout of every panel x inverter pair in the catalog
+    """
+    panels, inverters = catalog_specs()
+
+    pairs = []
+    for panel in panels:
+        for inverter in inverters:
+            result = solve_layouts(panel, inverter, panel_count, limit=1)
+            pairs.append({
+                "panel": panel["id"],
+                "inverter": inverter["id"],
+                "layout": result["layouts"][0] if result["layouts"] else None,
+                "reason": result["reason"],
+            })
+
+    return pairs
@@ -1,3 +1,382 @@
-from django.test import TestCase
+import gzip
+import tempfile
+import time
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import skipUnless
 
-# Create your tests here.
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from GSSC.cache import get_cache
+from GSSC.lazy import is_available
+from GSSC.throttling import reset_rate_limits
+from APPS.PRICE_TRACKER.models import Product
+
+from .archive import archive_batch, calculation_history, partition_path, write_partition
+from .battery import battery_spec, build_profile, dispatch, load_profile, net_energy, size_battery
+from .models import PowerCalculation
+from .services import clamp_draws, effective_sun_hours, panel_to_power_estimates, power_to_panel_calculator
+from .strings import (
+    MIN_AMBIENT_C,
+    VOC_TEMP_COEFF,
+    inverter_spec,
+    mppt_options,
+    panel_spec,
+    solve_layouts,
+)
+
+
+class PowerToPanelTests(TestCase):
+    def test_adds_the_morning_and_night_loads(self):
+        # sum(a, b) raised TypeError: 'int' object is not iterable
+        appliances = {"fan": {"power_watts": 100, "quantity": 5}}
+        result = power_to_panel_calculator.uncached(appliances, 550, 4)["system_requirements"]
+
+        # 500 Wh/h: 2 panels and 4 kWh by day, 1 panel and 2.6 kWh for the backup
+        self.assertEqual(result, {
+            "max_inverter_capacity_kw": 0.5,
+            "total_daily_power_kwh": 6.6,
+            "solar_panel_quantity": 3,
+        })
+
+
+class MonteCarloTests(TestCase):
+    def setUp(self):
+        reset_rate_limits()
+
+    def test_bands_are_ordered_and_reproducible(self):
+        first = panel_to_power_estimates(20, 550, draws=5000, seed=7)["estimates"]
+        again = panel_to_power_estimates(20, 550, draws=5000, seed=7)["estimates"]
+        self.assertEqual(first, again)
+
+        daily = first["daily_kwh"]
+        self.assertLess(daily["p90"], daily["p50"])
+        self.assertLess(daily["p50"], daily["p10"])
+
+        # 20 x 550W x 8h x 0.70 = 61.6 kWh, soiling pulls the median a little lower
+        self.assertAlmostEqual(daily["p50"], 61.6 * 0.97, delta=1.5)
+
+    def test_simulation_stays_within_the_latency_budget(self):
+        start = time.perf_counter()
+        result = effective_sun_hours.uncached(20_000, 1)
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(result["draws"], 20_000)
+        self.assertLess(elapsed, 0.1)
+
+    def test_power_view_returns_percentile_bands(self):
+        response = self.client.post(
+            '/calculator/power/',
+            {"solarpanel_quantity": 10, "panelwatt": 550, "backup_hours": 2, "mode": "monte_carlo"},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 201)
+
+        data = response.json()
+        self.assertEqual(data["total_daily_power_kwh"], 30.8)
+        self.assertEqual(set(data["estimates"]["daily_kwh"]), {"mean", "p10", "p50", "p90"})
+        self.assertEqual(PowerCalculation.objects.count(), 1)
+
+        plain = self.client.post(
+            '/calculator/power/', {"solarpanel_quantity": 10}, content_type='application/json'
+        )
+        self.assertNotIn("estimates", plain.json())
+
+        invalid = self.client.post(
+            '/calculator/power/', {"solarpanel_quantity": "many"}, content_type='application/json'
+        )
+        self.assertEqual(invalid.status_code, 400)
+
+        invalid = self.client.post(
+            '/calculator/power/', {"solarpanel_quantity": 10, "backup_hours": "nan"},
+            content_type='application/json'
+        )
+        self.assertEqual(invalid.status_code, 400)
+
+    def test_power_view_rejects_out_of_range_inputs(self):
+        for body in (
+            {"solarpanel_quantity": 10**400},
+            {"solarpanel_quantity": 100_001},
+            {"solarpanel_quantity": 10, "panelwatt": 10_001},
+            {"solarpanel_quantity": 10, "backup_hours": 1e308},
+            {"solarpanel_quantity": 10, "backup_hours": 169},
+            {"solarpanel_quantity": 10, "mode": "monte_carlo", "seed": -1},
+            {"solarpanel_quantity": 10, "mode": "monte_carlo", "draws": "inf"},
+        ):
+            with self.subTest(body=body):
+                reset_rate_limits()
+                response = self.client.post('/calculator/power/', body, content_type='application/json')
+                self.assertEqual(response.status_code, 400)
+
+        self.assertEqual(PowerCalculation.objects.count(), 0)
+
+        response = self.client.post(
+            '/calculator/power/',
+            {"solarpanel_quantity": 100_000, "panelwatt": 10_000, "backup_hours": 168, "mode": "monte_carlo"},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 201)
+
+    @skipUnless(is_available("numpy"), "numpy is not installed")
+    def test_numpy_engine_gives_the_same_distribution(self):
+        estimates = panel_to_power_estimates(20, 550, draws=20_000, seed=7)["estimates"]
+        self.assertEqual(estimates["engine"], "numpy")
+        self.assertEqual(estimates["draws"], 20_000)
+
+        # Different random streams, the same distribution
+        daily = estimates["daily_kwh"]
+        self.assertLess(daily["p90"], daily["p50"])
+        self.assertLess(daily["p50"], daily["p10"])
+        self.assertAlmostEqual(daily["p50"], 61.6 * 0.97, delta=1.5)
+
+        again = panel_to_power_estimates(20, 550, draws=20_000, seed=7)["estimates"]
+        self.assertEqual(estimates, again)
+
+    @override_settings(CALCULATOR_MONTE_CARLO={"DRAWS": 2000, "MAX_DRAWS": 5000, "MAX_DRAWS_PYTHON": 5000})
+    def test_draws_are_clamped_before_the_cache(self):
+        self.assertEqual([clamp_draws(draws) for draws in (None, 0, -5, 1, 10**9)], [2000, 2000, 1, 1, 5000])
+
+        def draws(value):
+            reset_rate_limits()
+            response = self.client.post(
+                '/calculator/power/',
+                {"solarpanel_quantity": 10, "mode": "monte_carlo", "draws": value, "seed": 3},
+                content_type='application/json',
+            )
+            self.assertEqual(response.status_code, 201)
+            return response.json()["estimates"]["draws"]
+
+        self.assertEqual(draws(-5), 1)
+        self.assertEqual(draws(10**9), 5000)
+
+        misses = get_cache().stats()["misses"]
+        self.assertEqual(draws(10**8), 5000)
+        self.assertEqual(get_cache().stats()["misses"], misses)
+
+
+class StringSolverTests(TestCase):
+    def setUp(self):
+        reset_rate_limits()
+        self.panel = panel_spec({"id": 1, "max_power": "550W", "max_system_voltage": "1500V"})
+        self.inverter = inverter_spec({"id": 2, "model": "VM-5KW"})
+
+    def test_specs_prefer_values_from_the_product_text(self):
+        inverter = inverter_spec({
+            "model": "VM-8KW",
+            "features": "3 MPPT, MPPT range 150-550V, Max DC input 600V, 20A per MPPT",
+        })
+        self.assertEqual(inverter["mppts"], 3)
+        self.assertEqual((inverter["mppt_min"], inverter["mppt_max"]), (150, 550))
+        self.assertEqual(inverter["max_dc_voltage"], 600)
+        self.assertEqual(inverter["max_current"], 20)
+
+        panel = panel_spec({"max_power": "550W", "description": "Voc 49.9V, Isc 14.0A"})
+        self.assertEqual((panel["voc"], panel["isc"]), (49.9, 14.0))
+
+    def test_layouts_respect_the_inverter_window(self):
+        voc_cold = self.panel["voc"] * (1 + VOC_TEMP_COEFF * (MIN_AMBIENT_C - 25))
+
+        for series, parallel in mppt_options(self.panel, self.inverter):
+            self.assertLessEqual(series * voc_cold, self.inverter["max_dc_voltage"])
+            self.assertLessEqual(parallel * self.panel["isc"], self.inverter["max_current"])
+
+        result = solve_layouts(self.panel, self.inverter, panel_count=10)
+        best = result["layouts"][0]
+        self.assertEqual(best["panels"], 10)
+        self.assertEqual(best["mppts"], [{"series": 5, "parallel": 1}] * 2)
+
+    def test_impossible_counts_explain_why(self):
+        too_many = solve_layouts(self.panel, self.inverter, panel_count=40)
+        self.assertEqual(too_many["layouts"], [])
+        self.assertIn("panel limit", too_many["reason"])
+
+        # Three panels never reach the 120V MPPT minimum on a hot day
+        too_few = solve_layouts(self.panel, self.inverter, panel_count=3)
+        self.assertEqual(too_few["layouts"], [])
+        self.assertIn("adds up to 3 panels", too_few["reason"])
+
+        self.assertEqual(solve_layouts(self.panel, self.inverter, panel_count=0)["layouts"], [])
+
+        tiny = inverter_spec({"id": 3, "model": "VM-1KW"})
+        any_count = solve_layouts(self.panel, tiny)
+        self.assertEqual(any_count["layouts"], [])
+        self.assertNotIn("None", any_count["reason"])
+
+    def test_matrix_covers_every_catalog_pair(self):
+        get_cache().invalidate_tags("catalog")
+
+        panels = [
+            Product.objects.create(category="solar_panel", company="SolarTech", model=f"ST-{watts}W",
+                                   max_power=f"{watts}W", max_system_voltage="1500V", price=Decimal("50000"))
+            for watts in (450, 550)
+        ]
+        inverters = [
+            Product.objects.create(category="inverter", company="VoltMax", model=f"VM-{kw}KW",
+                                   price=Decimal("150000"))
+            for kw in (3, 10)
+        ]
+
+        response = self.client.get("/calculator/strings/matrix/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["pairs"]), 4)
+        self.assertTrue(all(pair["layout"] for pair in response.json()["pairs"]))
+
+        response = self.client.post(
+            "/calculator/strings/",
+            {"panel": panels[1].id, "inverter": inverters[1].id, "panel_count": 20},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["layouts"][0]["panels"], 20)
+
+        for panel_count in (0, -2):
+            reset_rate_limits()
+            response = self.client.post(
+                "/calculator/strings/",
+                {"panel": panels[1].id, "inverter": inverters[1].id, "panel_count": panel_count},
+                content_type="application/json",
+            )
+            self.assertEqual(response.status_code, 400)
+
+        reset_rate_limits()
+        self.assertEqual(self.client.get("/calculator/strings/matrix/?panel_count=-2").status_code, 400)
+
+
+class BatterySizingTests(TestCase):
+    def setUp(self):
+        reset_rate_limits()
+        self.profile = build_profile(load_profile(1000, backup_hours=4), pv_kw=5.5)
+        self.lithium = battery_spec({"id": 1, "model": "PC-100Ah", "type": "Lithium-ion", "price": 80000})
+
+    def test_spec_from_product_text(self):
+        self.assertEqual(self.lithium["kwh"], 1.28)
+        self.assertEqual(self.lithium["chemistry"], "lithium")
+
+        lead = battery_spec({"model": "T-200Ah 12V", "type": "Tubular", "price": 50000})
+        self.assertEqual((lead["chemistry"], lead["kwh"], lead["dod"]), ("lead_acid", 2.4, 0.5))
+        self.assertEqual(battery_spec({"model": "5kWh wall", "type": "LiFePO4"})["kwh"], 5)
+        self.assertIsNone(battery_spec({"model": "Mystery"}))
+
+    def test_dispatch_charges_from_surplus_and_counts_lost_load(self):
+        # Full 1 kWh battery: 500 Wh served, 300 Wh surplus stored at 90%, then 1 kWh short of 1270 Wh
+        result = dispatch([-500, 300, -1270], usable_wh=1000, efficiency=0.9)
+        self.assertAlmostEqual(result["throughput_wh"], 500 + 770)
+        self.assertAlmostEqual(result["lost_wh"], 500)
+
+    def test_smallest_bank_meets_the_target(self):
+        result = size_battery(self.profile, self.lithium)
+        self.assertTrue(result["meets_target"])
+        self.assertLessEqual(result["loss_of_load"], 0.01)
+
+        # One unit fewer would miss the target
+        if result["units"] > 1:
+            net = net_energy(self.profile)
+            usable_wh = (result["units"] - 1) * self.lithium["kwh"] * 1000 * self.lithium["dod"]
+            lost = dispatch(net, usable_wh, self.lithium["efficiency"])["lost_wh"]
+            self.assertGreater(lost / (sum(self.profile["load"]) * 365), 0.01)
+
+        no_sun = build_profile(self.profile["load"], pv_kw=0)
+        self.assertFalse(size_battery(no_sun, self.lithium)["meets_target"])
+
+    def test_view_ranks_catalog_batteries(self):
+        get_cache().invalidate_tags("catalog")
+        Product.objects.create(category="battery", company="PowerCell", model="PC-100Ah",
+                               type="Lithium-ion", price=Decimal("80000"))
+        Product.objects.create(category="battery", company="PowerCell", model="PC-200Ah",
+                               type="Lithium-ion", price=Decimal("150000"))
+
+        response = self.client.post(
+            "/calculator/battery/",
+            {"hourly_load_wh": self.profile["load"], "pv_kw": 5.5},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+
+        batteries = response.json()["batteries"]
+        self.assertEqual(len(batteries), 2)
+        prices = [battery["total_price"] for battery in batteries]
+        self.assertEqual(prices, sorted(prices))
+
+        invalid = self.client.post("/calculator/battery/", {"hourly_load_wh": [1, 2]},
+                                   content_type="application/json")
+        self.assertEqual(invalid.status_code, 400)
+
+    def test_view_rejects_values_that_are_not_finite_negative_or_too_large(self):
+        load = self.profile["load"]
+        for body in (
+            {"hourly_load_wh": ["nan"] + load[1:], "pv_kw": 5.5},
+            {"hourly_load_wh": [-100] + load[1:], "pv_kw": 5.5},
+            {"hourly_load_wh": ["inf"] + load[1:], "pv_kw": 5.5},
+            {"hourly_load_wh": load, "pv_kw": "nan"},
+            {"hourly_load_wh": load, "pv_kw": -1},
+            {"hourly_load_wh": load, "pv_kw": 5.5, "loss_of_load": "nan"},
+            {"hourly_load_wh": load, "pv_kw": 5.5, "loss_of_load": -0.5},
+            {"appliances": {}, "backup_hours": "inf", "pv_kw": 5.5},
+            {"hourly_load_wh": [1e308] * 24, "pv_kw": 5.5},
+            {"hourly_load_wh": "1" * 24, "pv_kw": 5.5},
+            {"hourly_load_wh": load + [100], "pv_kw": 5.5},
+            {"hourly_load_wh": load, "pv_kw": 1e308},
+            {"hourly_load_wh": load, "pv_kw": "inf"},
+            {"hourly_load_wh": load, "pv_kw": 5.5, "loss_of_load": 1.5},
+            {"hourly_load_wh": load, "solar_panel_quantity": 10 ** 400},
+            {"appliances": {"fan": {"power_watts": 1e308, "quantity": 10}}, "pv_kw": 5.5},
+        ):
+            with self.subTest(body=body):
+                # Each attempt is charged as a simulation
+                reset_rate_limits()
+                response = self.client.post("/calculator/battery/", body, content_type="application/json")
+                self.assertEqual(response.status_code, 400)
+
+
+class CalculationArchiveTests(TestCase):
+    def setUp(self):
+        self.directory = self.enterContext(tempfile.TemporaryDirectory())
+        archive = override_settings(CALCULATION_ARCHIVE={'DIRECTORY': self.directory, 'BATCH_SIZE': 2})
+        archive.enable()
+        self.addCleanup(archive.disable)
+
+        self.now = timezone.now()
+        self.days = [self.now - timedelta(days=age) for age in (200, 200, 120, 91, 10, 0)]
+        for number, created_at in enumerate(self.days):
+            calculation = PowerCalculation.objects.create(
+                solarpanel_quantity=number + 1, panelwatt=550, backup_hours=2, usable_power_kwh=1,
+                total_daily_power_kwh=1, inverter_capacity_kwh=1, battery_capacity_kwh=1,
+            )
+            PowerCalculation.objects.filter(pk=calculation.pk).update(created_at=created_at)
+
+    def test_old_rows_move_to_daily_partitions(self):
+        out = StringIO()
+        call_command('archive_calculations', '--model', 'powercalculation', '--days', '90', stdout=out)
+
+        self.assertIn('archived 4 rows', out.getvalue())
+        self.assertEqual(
+            sorted(PowerCalculation.objects.values_list('solarpanel_quantity', flat=True)), [5, 6]
+        )
+
+        day = self.days[0].date()
+        oldest = partition_path(PowerCalculation, day)
+        self.assertTrue(str(oldest).endswith(f'powercalculation/{day:%Y/%m}/{day.isoformat()}.jsonl.gz'))
+        with gzip.open(oldest, 'rt') as archive:
+            self.assertEqual(len(archive.readlines()), 2)
+
+    def test_history_reads_archive_and_table_as_one(self):
+        archive_batch(PowerCalculation, self.now - timedelta(days=90), batch_size=10)
+
+        history = list(calculation_history(PowerCalculation))
+        self.assertEqual([row['solarpanel_quantity'] for row in history], [1, 2, 3, 4, 5, 6])
+        self.assertEqual(history[0]['created_at'], self.days[0])
+
+        recent = calculation_history(PowerCalculation, start=self.now - timedelta(days=150), end=self.now)
+        self.assertEqual([row['solarpanel_quantity'] for row in recent], [3, 4, 5])
+
+    def test_a_batch_written_twice_is_read_once(self):
+        rows = list(PowerCalculation.objects.filter(solarpanel_quantity__lte=2).values())
+        # A crash between the write and the delete, then the batch archived again
+        write_partition(partition_path(PowerCalculation, self.days[0].date()), rows)
+        self.assertEqual(archive_batch(PowerCalculation, self.now - timedelta(days=100), batch_size=10), 3)
+
+        history = list(calculation_history(PowerCalculation))
+        self.assertEqual([row['solarpanel_quantity'] for row in history], [1, 2, 3, 4, 5, 6])
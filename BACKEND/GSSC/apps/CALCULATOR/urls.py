@@ -5,4 +5,7 @@ from . import views
 urlpatterns = [
     path('power/', views.power_calculator_view, name="power_calculator"),
     path('panel/', views.panel_calculator_view, name="panel_calculator"),
+    path('strings/', views.string_layout_view, name="string_layout"),
+    path('strings/matrix/', views.string_matrix_view, name="string_matrix"),
+    path('battery/', views.battery_sizing_view, name="battery_sizing"),
 ]
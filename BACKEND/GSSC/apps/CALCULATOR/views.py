@@ -86,21 +86,55 @@
 #             status=status.HTTP_500_INTERNAL_SERVER_ERROR
 #         )
 
-from rest_framework.decorators import api_view, permission_classes
+import math
+
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import AllowAny
 
-# We keep these imports so the file doesn't crash, 
-# even though we aren't using them for the dummy response.
-try:
-    from .models import SolarPanelCalculation, PowerCalculation
-    from .serializers import SolarPanelCalculationSerializer, PowerCalculationSerializer
-except ImportError:
-    pass 
+from GSSC.throttling import TokenBucketThrottle
+from APPS.PRICE_TRACKER.models import Product
+
+from .battery import DEFAULT_LOSS_OF_LOAD, build_profile, load_profile, rank_batteries
+from .models import PowerCalculation
+from .serializers import PowerCalculationSerializer
+from .services import (
+    clamp_draws,
+    hourly_power_consumption,
+    panel_to_power_calculator,
+    panel_to_power_estimates,
+)
+from .strings import SPEC_FIELDS as STRING_SPEC_FIELDS
+from .strings import compatibility_matrix, inverter_spec, panel_spec, solve_layouts
+
+
+class CalculationThrottle(TokenBucketThrottle):
+    """
+    Sizing formulas, a Monte Carlo request is charged as a simulation
+    """
+    cost = 'calculation'
+
+    def get_cost(self, request, view):
+        data = request.data
+        if hasattr(data, 'get') and data.get('mode') == 'monte_carlo':
+            return 'simulation'
+        return self.cost
+
+
+class SimulationThrottle(TokenBucketThrottle):
+    cost = 'simulation'
+
+
+# Far above any real site, small enough for the IntegerField columns
+MAX_PANELS = 100_000
+MAX_PANEL_WATT = 10_000
+MAX_BACKUP_HOURS = 168          # a week without sun
+
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([CalculationThrottle])
 def panel_calculator_view(request):
     """
     Returns a dummy response for the Panel Calculator
@@ -129,28 +163,188 @@ def panel_calculator_view(request):
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([CalculationThrottle])
 def power_calculator_view(request):
     """
-    Returns a dummy response for the Power Calculator
+    Daily generation of a given number of panels
+    POST {"solarpanel_quantity": 20, "panelwatt": 550, "backup_hours": 4}
+    Add "mode": "monte_carlo" (optional "draws", "seed") for P50/P90 bands
     """
     try:
-        # Just printing to your terminal
-        print("Data received in Power View:", request.data)
+        solarpanel_quantity = int(request.data.get('solarpanel_quantity'))
+        panelwatt = int(request.data.get('panelwatt', 550))
+        backup_hours = float(request.data.get('backup_hours') or 0)
+        draws = clamp_draws(request.data.get('draws'))
+        seed = int(request.data.get('seed') or 0)
+    except (TypeError, ValueError, OverflowError):
+        return Response(
+            {"error": "solarpanel_quantity and panelwatt must be numbers"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
 
-        # Hardcoded dummy response
-        dummy_data = {
-            "id": 888,
-            "solarpanel_quantity": request.data.get('solarpanel_quantity', 1),
-            "panelwatt": request.data.get('panelwatt', 550),
-            "backup_hours": request.data.get('backup_hours', 0),
-            "usable_power_kwh": 3.2,
-            "total_daily_power_kwh": 25.0,
-            "inverter_capacity_kwh": 5.0,
-            "battery_capacity_kwh": 10.0,
-            "message": "This is a dummy response for testing frontend connection"
-        }
+    # NaN fails every comparison, so it is rejected along with inf
+    if not (0 < solarpanel_quantity <= MAX_PANELS and 0 < panelwatt <= MAX_PANEL_WATT
+            and 0 <= backup_hours <= MAX_BACKUP_HOURS and seed >= 0):
+        return Response(
+            {"error": f"solarpanel_quantity must be 1 to {MAX_PANELS}, panelwatt 1 to {MAX_PANEL_WATT}, "
+                      f"backup_hours 0 to {MAX_BACKUP_HOURS} and seed not negative"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
 
-        return Response(dummy_data, status=status.HTTP_201_CREATED)
+    result = panel_to_power_calculator(
+        solar_panel_quantity=solarpanel_quantity,
+        panel_watt=panelwatt,
+        backup_hours=backup_hours,
+    )["system_requirements"]
 
-    except Exception as e:
-        return Response({"error": f"Backend Error: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+    estimates = {}
+    if request.data.get('mode') == 'monte_carlo':
+        estimates = panel_to_power_estimates(
+            solar_panel_quantity=solarpanel_quantity,
+            panel_watt=panelwatt,
+            draws=draws,
+            seed=seed,
+        )
+
+    values = [*result.values(), *estimates.get("estimates", {}).get("annual_kwh", {}).values()]
+    if not all(math.isfinite(value) for value in values):
+        return Response(
+            {"error": "These inputs give a result out of range"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    calculation = PowerCalculation.objects.create(
+        solarpanel_quantity=solarpanel_quantity,
+        panelwatt=panelwatt,
+        backup_hours=backup_hours,
+        usable_power_kwh=result['usable_power_kwh'],
+        total_daily_power_kwh=result['total_daily_power_kwh'],
+        inverter_capacity_kwh=result['inverter_capacity_kw'],
+        battery_capacity_kwh=result['battery_capacity_kwh'],
+    )
+
+    data = PowerCalculationSerializer(calculation).data
+    data.update(estimates)
+
+    return Response(data, status=status.HTTP_201_CREATED)
+
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+@throttle_classes([CalculationThrottle])
+def string_layout_view(request):
+    """
+    Series / parallel layouts of a panel on an inverter
+    POST {"panel": 12, "inverter": 31, "panel_count": 10}   (panel_count optional)
+    """
+    try:
+        panel_id = int(request.data.get('panel'))
+        inverter_id = int(request.data.get('inverter'))
+        panel_count = request.data.get('panel_count')
+        panel_count = int(panel_count) if panel_count not in (None, '') else None
+    except (TypeError, ValueError):
+        return Response(
+            {"error": "panel and inverter product ids are required"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    if panel_count is not None and panel_count < 1:
+        return Response(
+            {"error": "panel_count must be at least 1"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    products = {
+        product['id']: product
+        for product in Product.objects.filter(id__in=[panel_id, inverter_id]).values(*STRING_SPEC_FIELDS)
+    }
+    panel = panel_spec(products[panel_id]) if panel_id in products else None
+    inverter = inverter_spec(products[inverter_id]) if inverter_id in products else None
+
+    if panel is None or inverter is None:
+        return Response(
+            {"error": "Panel or inverter not found, or its power rating is unknown"},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    return Response({
+        "panel": panel,
+        "inverter": inverter,
+        **solve_layouts(panel, inverter, panel_count),
+    })
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@throttle_classes([SimulationThrottle])
+def string_matrix_view(request):
+    """
+    Best layout for every panel x inverter pair of the catalog
+    GET /calculator/strings/matrix/?panel_count=10
+    """
+    try:
+        panel_count = int(request.query_params.get('panel_count') or 0) or None
+    except ValueError:
+        panel_count = None
+
+    if panel_count is not None and panel_count < 1:
+        return Response(
+            {"error": "panel_count must be at least 1"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    return Response({"pairs": compatibility_matrix(panel_count)})
+
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+@throttle_classes([SimulationThrottle])
+def battery_sizing_view(request):
+    """
+    Smallest bank of every catalog battery that meets a loss-of-load target
+    POST {"hourly_load_wh": [24 values], "pv_kw": 5.5, "loss_of_load": 0.01}
+      or {"appliances": {...}, "backup_hours": 4, "solar_panel_quantity": 10, "panel_watt": 550}
+    """
+    data = request.data
+
+    try:
+        if data.get('hourly_load_wh') is not None:
+            if not isinstance(data['hourly_load_wh'], list):
+                raise ValueError("hourly_load_wh must be a list of 24 values")
+            hourly_load_wh = [float(value) for value in data['hourly_load_wh']]
+        else:
+            hourly_load_wh = load_profile(
+                hourly_power_consumption(data.get('appliances') or {}),
+                float(data.get('backup_hours') or 0),
+            )
+
+        if data.get('pv_kw') is not None:
+            pv_kw = float(data['pv_kw'])
+        else:
+            pv_kw = int(data.get('solar_panel_quantity') or 0) * int(data.get('panel_watt') or 550) / 1000
+
+        profile = build_profile(
+            hourly_load_wh,
+            pv_kw=pv_kw,
+            loss_of_load=float(data.get('loss_of_load', DEFAULT_LOSS_OF_LOAD)),
+        )
+    except (TypeError, ValueError, KeyError, AttributeError, OverflowError) as e:
+        return Response(
+            {"error": f"Invalid load profile: {e}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    results = rank_batteries(profile)
+    names = {
+        product['id']: product
+        for product in Product.objects.filter(id__in=[r['battery'] for r in results]).values('id', 'company', 'model')
+    }
+
+    return Response({
+        "profile": profile['hash'],
+        "batteries": [
+            {**result, "company": names.get(result['battery'], {}).get('company'),
+             "model": names.get(result['battery'], {}).get('model')}
+            for result in results
+        ],
+    })
@@ -1,3 +1,23 @@
 from django.contrib import admin
 
-# Register your models here.
+from GSSC.admin_tools import LargeTableAdmin
+
+from .models import SolarProfile, SolarRecommendation
+
+
+@admin.register(SolarProfile)
+class SolarProfileAdmin(LargeTableAdmin):
+    list_display = ("id", "user", "address", "monthly_kwh_usage", "avg_monthly_bill", "is_shaded", "created_at")
+    list_select_related = ("user",)
+    list_filter = ("is_shaded",)
+    search_fields = ("=id", "=user__username")
+    raw_id_fields = ("user",)
+
+
+@admin.register(SolarRecommendation)
+class SolarRecommendationAdmin(LargeTableAdmin):
+    list_display = ("id", "profile", "recommended_system_size_kw", "estimated_cost",
+                    "payback_period_years", "generated_at")
+    list_select_related = ("profile__user",)
+    search_fields = ("=profile__id",)
+    raw_id_fields = ("profile",)
@@ -0,0 +1,45 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SolarProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('address', models.CharField(max_length=255)),
+                ('latitude', models.FloatField()),
+                ('longitude', models.FloatField()),
+                ('avg_monthly_bill', models.FloatField(help_text='Average monthly bill in local currency')),
+                ('monthly_kwh_usage', models.FloatField(help_text='Average monthly consumption in kWh')),
+                ('roof_area_sqm', models.FloatField(default=0.0)),
+                ('is_shaded', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SolarRecommendation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recommended_system_size_kw', models.FloatField()),
+                ('estimated_annual_generation_kwh', models.FloatField()),
+                ('estimated_cost', models.FloatField()),
+                ('payback_period_years', models.FloatField()),
+                ('carbon_offset_tonnes', models.FloatField()),
+                ('generated_at', models.DateTimeField(auto_now_add=True)),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recommendations', to='CONTACTS.solarprofile')),
+            ],
+        ),
+    ]
@@ -1,4 +1,215 @@
-from django.contrib import admin
-from .models import Product
+from decimal import Decimal, InvalidOperation
 
-admin.site.register(Product)
\ No newline at end of file
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+
+from GSSC.admin_tools import LargeTableAdmin
+
+from .bulk import update_prices
+from .models import (
+    CategorySummary,
+    Distributor,
+    DistributorCustomer,
+    PriceAlert,
+    PriceAlertNotification,
+    PriceChange,
+    PriceList,
+    PriceListItem,
+    Product,
+    ScrapedPage,
+)
+
+
+class PriceRangeFilter(admin.SimpleListFilter):
+    """
+    Fixed price bands, no DISTINCT query over the table to build the choices
+    """
+    title = "price"
+    parameter_name = "price_range"
+
+    BANDS = {
+        "none": ("No price", None, None),
+        "under_10k": ("Under 10,000", None, 10_000),
+        "10k_50k": ("10,000 - 50,000", 10_000, 50_000),
+        "50k_100k": ("50,000 - 100,000", 50_000, 100_000),
+        "100k_500k": ("100,000 - 500,000", 100_000, 500_000),
+        "over_500k": ("500,000 and more", 500_000, None),
+    }
+
+    def lookups(self, request, model_admin):
+        return [(key, label) for key, (label, _, _) in self.BANDS.items()]
+
+    def queryset(self, request, queryset):
+        if self.value() not in self.BANDS:
+            return queryset
+        if self.value() == "none":
+            return queryset.filter(price__isnull=True)
+
+        _, low, high = self.BANDS[self.value()]
+        if low is not None:
+            queryset = queryset.filter(price__gte=low)
+        if high is not None:
+            queryset = queryset.filter(price__lt=high)
+        return queryset
+
+
+class PriceActionForm(ActionForm):
+    value = forms.CharField(
+        required=False,
+        label="Value",
+        help_text="percent for 'change by %', amount for 'set price'",
+    )
+
+
+# Rows read per page by the price actions
+ACTION_PAGE_SIZE = 2000
+
+
+def keyset_rows(queryset, *fields):
+    """
+    values_list rows of the queryset, one page by primary key at a time.
+
+    Each page is read completely before the caller writes, and the next
+    page starts after the last id. A streamed cursor would keep revisiting
+    rows the action has just moved within a price-filtered index scan.
+    """
+    last = 0
+    while page := list(queryset.filter(pk__gt=last).order_by("pk").values_list("pk", *fields)[:ACTION_PAGE_SIZE]):
+        yield from page
+        last = page[-1][0]
+
+
+def action_value(modeladmin, request):
+    try:
+        return Decimal(request.POST.get("value", "").strip())
+    except InvalidOperation:
+        modeladmin.message_user(request, "Enter a number in the Value box.", messages.ERROR)
+        return None
+
+
+@admin.register(Product)
+class ProductAdmin(LargeTableAdmin):
+    list_display = ("id", "category", "company", "model", "max_power", "price", "updated_at")
+    list_display_links = ("id", "model")
+    list_filter = ("category", PriceRangeFilter)
+    # Prefix and exact lookups only, served by the company / model / primary key indexes
+    search_fields = ("=id", "^company", "^model")
+    action_form = PriceActionForm
+    actions = ["change_price_by_percent", "set_price"]
+    readonly_fields = ("created_at", "updated_at", "last_scraped")
+
+    @admin.action(description="Change price of selected products by Value %%")
+    def change_price_by_percent(self, request, queryset):
+        percent = action_value(self, request)
+        if percent is None:
+            return
+        if not Decimal("-90") <= percent <= Decimal("500"):
+            self.message_user(request, "The change must be between -90% and 500%.", messages.ERROR)
+            return
+
+        factor = 1 + percent / 100
+        changed = update_prices(
+            (product_id, price * factor)
+            for product_id, price in keyset_rows(queryset.exclude(price=None), "price")
+        )
+        self.message_user(request, f"Changed {changed} prices by {percent}%.", messages.SUCCESS)
+
+    @admin.action(description="Set price of selected products to Value")
+    def set_price(self, request, queryset):
+        price = action_value(self, request)
+        if price is None:
+            return
+        if price < 0:
+            self.message_user(request, "A price cannot be negative.", messages.ERROR)
+            return
+
+        changed = update_prices(
+            (product_id, price)
+            for product_id, in keyset_rows(queryset)
+        )
+        self.message_user(request, f"Set {changed} prices to {price}.", messages.SUCCESS)
+
+
+@admin.register(CategorySummary)
+class CategorySummaryAdmin(admin.ModelAdmin):
+    list_display = ("category", "products", "priced_products", "average_price", "updated_at")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(PriceAlert)
+class PriceAlertAdmin(LargeTableAdmin):
+    list_display = ("id", "user", "product", "target_price", "is_active", "triggered_at")
+    list_select_related = ("user", "product")
+    list_filter = ("is_active",)
+    search_fields = ("=user__username", "=product__id")
+    raw_id_fields = ("user", "product")
+
+
+@admin.register(PriceAlertNotification)
+class PriceAlertNotificationAdmin(LargeTableAdmin):
+    list_display = ("id", "alert", "price", "status", "attempts", "created_at", "sent_at")
+    list_select_related = ("alert__user",)
+    list_filter = ("status",)
+    raw_id_fields = ("alert",)
+
+
+@admin.register(PriceChange)
+class PriceChangeAdmin(LargeTableAdmin):
+    list_display = ("id", "product", "category", "old_price", "price", "created_at")
+    list_select_related = ("product",)
+    list_filter = ("category",)
+    search_fields = ("=product__id",)
+    raw_id_fields = ("product",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ScrapedPage)
+class ScrapedPageAdmin(LargeTableAdmin):
+    list_display = ("product", "url", "status", "error", "checked_at")
+    list_select_related = ("product",)
+    search_fields = ("=product__id",)
+    raw_id_fields = ("product",)
+
+
+@admin.register(Distributor)
+class DistributorAdmin(admin.ModelAdmin):
+    list_display = ("name", "region", "created_at")
+    search_fields = ("^name",)
+
+
+@admin.register(DistributorCustomer)
+class DistributorCustomerAdmin(LargeTableAdmin):
+    list_display = ("user", "distributor")
+    list_select_related = ("user", "distributor")
+    list_filter = ("distributor",)
+    search_fields = ("=user__username",)
+    raw_id_fields = ("user",)
+
+
+@admin.register(PriceList)
+class PriceListAdmin(admin.ModelAdmin):
+    list_display = ("name", "distributor", "user", "priority", "is_active", "updated_at")
+    list_select_related = ("distributor", "user")
+    list_filter = ("is_active", "distributor")
+    search_fields = ("^name", "=user__username")
+    raw_id_fields = ("user",)
+
+
+@admin.register(PriceListItem)
+class PriceListItemAdmin(LargeTableAdmin):
+    list_display = ("price_list", "product", "price")
+    list_select_related = ("price_list", "product")
+    list_filter = ("price_list",)
+    search_fields = ("=product__id",)
+    raw_id_fields = ("product",)
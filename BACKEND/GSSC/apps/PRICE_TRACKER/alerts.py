@@ -0,0 +1,158 @@
+import threading
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import PriceAlert, PriceAlertNotification
+
+
+'''
+Price-drop alerts.
+
+An active PriceAlert fires when its product's price falls to target_price
+or below. The (product, is_active, target_price) index keeps the thresholds
+of every product sorted, so a price change old -> new only reads the
+alerts inside [new, old):
+
+    60 000 -> 52 000   fires the targets 52 000 <= t < 60 000
+    52 000 -> 58 000   price went up, nothing is read
+
+Targets at or above the old price already fired when the price first went
+below them, or were queued when the alert was created (fire_if_below).
+
+A whole batch of changes is evaluated with one query. Triggered alerts are
+deactivated and a PriceAlertNotification is queued in the same transaction;
+`manage.py send_price_alerts` delivers them.
+
+Single Product.save() calls are evaluated on commit by the Product signals.
+Code changing many prices wraps the writes in price_change_batch(), or calls
+price_changes_committed() itself after queryset.update() / bulk_update().
+'''
+
+_local = threading.local()
+
+
+def triggered_alerts(changes: dict):
+    """
+    Active alerts fired by changes = {product_id: (old_price, new_price)}
+    """
+    ranges = Q()
+
+    for product_id, (old_price, new_price) in changes.items():
+        if new_price is None:
+            continue
+        if old_price is not None and new_price >= old_price:
+            continue
+
+        condition = Q(product_id=product_id, target_price__gte=new_price)
+        if old_price is not None:
+            condition &= Q(target_price__lt=old_price)
+        ranges |= condition
+
+    if not ranges:
+        return PriceAlert.objects.none()
+
+    return PriceAlert.objects.filter(ranges, is_active=True)
+
+
+def queue_notifications(alerts: list):
+    """
+    alerts = [(alert_id, price), ...]: deactivates the alerts and queues one
+    notification each
+    """
+    if not alerts:
+        return 0
+
+    PriceAlert.objects.filter(id__in=[alert_id for alert_id, _ in alerts]).update(
+        is_active=False,
+        triggered_at=timezone.now(),
+    )
+    PriceAlertNotification.objects.bulk_create(
+        PriceAlertNotification(alert_id=alert_id, price=price)
+        for alert_id, price in alerts
+    )
+    return len(alerts)
+
+
+def evaluate_price_changes(changes: dict) -> int:
+    """
+    Fires the alerts for a batch of price changes, returns how many fired
+    """
+    with transaction.atomic():
+        alerts = (
+            triggered_alerts(changes)
+            .select_for_update()
+            .values_list("id", "product_id")
+        )
+        return queue_notifications([
+            (alert_id, changes[product_id][1])
+            for alert_id, product_id in alerts
+        ])
+
+
+def fire_if_below(alert) -> bool:
+    """
+    Fires a newly saved alert straight away if the price is already low enough
+    """
+    price = alert.product.price
+    if not alert.is_active or price is None or price > alert.target_price:
+        return False
+
+    with transaction.atomic():
+        queue_notifications([(alert.id, price)])
+    return True
+
+
+#=============================================================
+# COLLECTING CHANGES
+#=============================================================
+
+def price_changes_committed(changes: dict):
+    """
+    Everything that follows committed price changes: the live price feed
+    and the alerts. Bulk writers call this after queryset.update() / bulk_update().
+    """
+    from .live import record_price_changes
+
+    record_price_changes(changes)
+    evaluate_price_changes(changes)
+
+
+@contextmanager
+def price_change_batch():
+    """
+    Price changes saved inside the block are evaluated together, once,
+    after the surrounding transaction commits
+    """
+    if getattr(_local, "changes", None) is not None:
+        # Nested, the outer block evaluates
+        yield
+        return
+
+    _local.changes = {}
+    try:
+        yield
+        changes = _local.changes
+    finally:
+        _local.changes = None
+
+    if changes:
+        transaction.on_commit(lambda: price_changes_committed(changes))
+
+
+def record_price_change(product_id, old_price, new_price):
+    if old_price == new_price:
+        return
+
+    changes = getattr(_local, "changes", None)
+    if changes is None:
+        transaction.on_commit(
+            lambda: price_changes_committed({product_id: (old_price, new_price)})
+        )
+        return
+
+    # Keep the first old price seen in the batch
+    first_old_price = changes.get(product_id, (old_price, None))[0]
+    changes[product_id] = (first_old_price, new_price)
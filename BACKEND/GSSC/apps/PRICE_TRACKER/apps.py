@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class PriceTrackerConfig(AppConfig):
     name = 'APPS.PRICE_TRACKER'
+
+    def ready(self):
+        from . import signals  # noqa: F401
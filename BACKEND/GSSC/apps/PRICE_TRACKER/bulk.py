@@ -0,0 +1,79 @@
+import itertools
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from GSSC.cache import invalidate_tags
+
+from .alerts import price_changes_committed
+from .models import CategorySummary, Product
+from .summaries import increment
+
+
+'''
+Bulk price writes.
+
+Product.save() costs a SELECT and three signal handlers per row. update_prices()
+writes a batch with one SELECT ... FOR UPDATE and one bulk_update, and does
+what the signals would have done once per batch:
+
+    - category summaries adjusted with one UPDATE per category
+    - the live price feed and alerts on commit (price_changes_committed)
+    - the "catalog" cache tag invalidated once at the end
+
+Each batch is its own transaction, so memory and lock time stay bounded
+however many prices change. Unchanged prices are not written.
+'''
+
+BATCH_SIZE = 1000
+
+CENT = Decimal("0.01")
+
+
+def update_prices(prices, batch_size: int = BATCH_SIZE) -> int:
+    """
+    Writes {product_id: price} or an iterable of (product_id, price) pairs,
+    returns how many prices changed
+    """
+    pairs = iter(prices.items() if isinstance(prices, dict) else prices)
+
+    changed = 0
+    while batch := dict(itertools.islice(pairs, batch_size)):
+        changed += update_price_batch(batch)
+
+    if changed:
+        invalidate_tags("catalog")
+    return changed
+
+
+def update_price_batch(prices: dict) -> int:
+    now = timezone.now()
+    changes, products, deltas = {}, [], {}
+
+    with transaction.atomic():
+        current = Product.objects.select_for_update().filter(id__in=prices).values_list("id", "category", "price")
+
+        for product_id, category, old in current:
+            new = prices[product_id]
+            new = None if new is None else Decimal(str(new)).quantize(CENT)
+            if new == old:
+                continue
+
+            changes[product_id] = (old, new)
+            products.append(Product(id=product_id, price=new, updated_at=now))
+
+            delta = deltas.setdefault(category, {"priced_products": 0, "price_sum": Decimal("0")})
+            delta["priced_products"] += (new is not None) - (old is not None)
+            delta["price_sum"] += (new or 0) - (old or 0)
+
+        if not changes:
+            return 0
+
+        Product.objects.bulk_update(products, ["price", "updated_at"])
+        for category, delta in deltas.items():
+            increment(CategorySummary, {"category": category}, **delta)
+
+        transaction.on_commit(lambda: price_changes_committed(changes))
+
+    return len(changes)
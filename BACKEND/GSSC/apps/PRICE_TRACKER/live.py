@@ -0,0 +1,256 @@
+import asyncio
+import itertools
+import json
+import logging
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import PriceChange, Product
+
+
+'''
+Live price push: Server-Sent Events instead of polling /price-tracker/.
+
+    GET /price-tracker/stream/?category=solar_panel,inverter
+
+    event: prices
+    id: 1842
+    data: {"category": "solar_panel", "changes": [[12, "52000.00"], [15, null]]}
+
+Committed price changes are written to PriceChange (record_price_changes,
+called on commit next to the alert evaluation), so changes made by any
+worker, command or scraper reach every process.
+
+Each ASGI process runs one PriceHub on its event loop:
+
+    - one pump task polls PriceChange every POLL_INTERVAL seconds while
+      anyone is subscribed, a single indexed query however many clients
+      are connected, and no work at all between changes
+    - a tick's changes are grouped per category and encoded once, every
+      subscriber gets the same bytes
+    - each subscriber has a bounded queue. A client too slow to keep up is
+      not buffered without limit: its queue is dropped and replaced by one
+      "resync" event, telling it to reload the page it shows
+    - an idle subscriber is a parked coroutine and a small queue, plus a
+      keepalive comment every KEEPALIVE seconds for proxies
+
+Reconnecting clients send Last-Event-ID and get the changes they missed
+from PriceChange, or a resync when they missed more than REPLAY_LIMIT.
+
+The stream needs the ASGI app (GSSC/asgi.py, e.g. `uvicorn GSSC.asgi:application`),
+under WSGI every open stream would hold a worker thread.
+'''
+
+logger = logging.getLogger(__name__)
+
+RESYNC = b"event: resync\ndata: {}\n\n"
+
+_recorded = itertools.count()
+
+# Commits between two prunes of old PriceChange rows, per process
+PRUNE_EVERY = 100
+
+
+def live_settings() -> dict:
+    config = {
+        "POLL_INTERVAL": 1.0,
+        "QUEUE_SIZE": 32,
+        "KEEPALIVE": 15,
+        "MAX_SUBSCRIBERS": 10_000,
+        "REPLAY_LIMIT": 500,
+        "RETENTION": 24 * 60 * 60,
+    }
+    config.update(getattr(settings, "LIVE_PRICES", {}))
+    return config
+
+
+#=============================================================
+# CHANGE FEED
+#=============================================================
+
+def record_price_changes(changes: dict):
+    """
+    Appends committed changes = {product_id: (old_price, new_price)} to the feed
+    """
+    if not changes:
+        return
+
+    # Atomic, so the category lookup reads the primary like the write
+    with transaction.atomic():
+        categories = dict(Product.objects.filter(id__in=changes).values_list("id", "category"))
+        PriceChange.objects.bulk_create(
+            PriceChange(product_id=product_id, category=categories[product_id], old_price=old, price=new)
+            for product_id, (old, new) in changes.items()
+            if product_id in categories
+        )
+
+        if next(_recorded) % PRUNE_EVERY == 0:
+            cutoff = timezone.now() - timedelta(seconds=live_settings()["RETENTION"])
+            PriceChange.objects.filter(created_at__lt=cutoff).delete()
+
+
+def latest_change_id() -> int:
+    return PriceChange.objects.order_by("-id").values_list("id", flat=True).first() or 0
+
+
+def changes_since(last_id: int, limit: int, until: int = None, categories=None) -> list:
+    """
+    [(id, category, product_id, price), ...] after last_id, oldest first,
+    only of the given categories when there are any
+    """
+    changes = PriceChange.objects.filter(id__gt=last_id)
+    if until is not None:
+        changes = changes.filter(id__lte=until)
+    if categories is not None:
+        changes = changes.filter(category__in=categories)
+    return list(changes.order_by("id").values_list("id", "category", "product_id", "price")[:limit])
+
+
+def encode(changes: list) -> dict:
+    """
+    {category: SSE frame} for one tick, the last change id goes on every frame
+    """
+    by_category = {}
+    for _, category, product_id, price in changes:
+        by_category.setdefault(category, {})[product_id] = None if price is None else str(price)
+
+    last_id = changes[-1][0]
+    return {
+        category: (
+            f"event: prices\nid: {last_id}\n"
+            f"data: {json.dumps({'category': category, 'changes': list(prices.items())}, separators=(',', ':'))}\n\n"
+        ).encode()
+        for category, prices in by_category.items()
+    }
+
+
+#=============================================================
+# HUB (one per process and event loop)
+#=============================================================
+
+class Subscriber:
+    def __init__(self, categories=None, queue_size: int = 32):
+        self.categories = categories
+        self.queue = asyncio.Queue(maxsize=queue_size)
+
+    def wants(self, category: str) -> bool:
+        return self.categories is None or category in self.categories
+
+    def offer(self, frame: bytes):
+        try:
+            self.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            # Too slow to keep up, tell it to reload instead of buffering more
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+
+
+class PriceHub:
+    def __init__(self, loop=None):
+        self.loop = loop
+        self.subscribers = set()
+        self.last_id = None
+        self.pump_task = None
+
+    def full(self) -> bool:
+        return len(self.subscribers) >= live_settings()["MAX_SUBSCRIBERS"]
+
+    async def subscribe(self, categories=None) -> Subscriber:
+        if self.last_id is None:
+            self.last_id = await sync_to_async(latest_change_id)()
+
+        subscriber = Subscriber(categories, live_settings()["QUEUE_SIZE"])
+        self.subscribers.add(subscriber)
+
+        if self.pump_task is None or self.pump_task.done():
+            self.pump_task = asyncio.get_running_loop().create_task(self.pump())
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        self.subscribers.discard(subscriber)
+
+    def broadcast(self, changes: list):
+        """
+        Hands one tick of changes to every interested subscriber
+        """
+        if not changes:
+            return
+        self.last_id = changes[-1][0]
+
+        frames = encode(changes)
+        for subscriber in list(self.subscribers):
+            for category, frame in frames.items():
+                if subscriber.wants(category):
+                    subscriber.offer(frame)
+
+    async def poll(self):
+        limit = live_settings()["REPLAY_LIMIT"]
+        while True:
+            changes = await sync_to_async(changes_since)(self.last_id, limit)
+            self.broadcast(changes)
+            if len(changes) < limit:
+                return
+
+    async def pump(self):
+        # Stops with the last subscriber, the next one starts it again
+        while self.subscribers:
+            await asyncio.sleep(live_settings()["POLL_INTERVAL"])
+            try:
+                await self.poll()
+            except Exception:
+                # A database hiccup must not end the stream of every client
+                logger.warning("Price stream poll failed", exc_info=True)
+
+        # The next subscriber starts from the latest change, not from here
+        self.last_id = None
+
+    async def stream(self, categories=None, last_event_id: int = None):
+        """
+        SSE frames for one client until it disconnects
+        """
+        config = live_settings()
+        subscriber = await self.subscribe(categories)
+        # Changes after this id reach the queue through the pump
+        subscribed_at = self.last_id
+        try:
+            yield b"retry: 3000\n\n"
+
+            if last_event_id is not None and last_event_id < subscribed_at:
+                # Filtered in SQL, the limit has to count this client's changes only
+                missed = await sync_to_async(changes_since)(
+                    last_event_id, config["REPLAY_LIMIT"] + 1, until=subscribed_at,
+                    categories=subscriber.categories,
+                )
+                if len(missed) > config["REPLAY_LIMIT"]:
+                    yield RESYNC
+                elif missed:
+                    for frame in encode(missed).values():
+                        yield frame
+
+            while True:
+                try:
+                    yield await asyncio.wait_for(subscriber.queue.get(), config["KEEPALIVE"])
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+        finally:
+            self.unsubscribe(subscriber)
+
+
+_hub = None
+
+
+def get_price_hub() -> PriceHub:
+    """
+    The hub of the running event loop, all access happens on that loop
+    """
+    global _hub
+
+    loop = asyncio.get_running_loop()
+    if _hub is None or _hub.loop is not loop:
+        _hub = PriceHub(loop)
+    return _hub
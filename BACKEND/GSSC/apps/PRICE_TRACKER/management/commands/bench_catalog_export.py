@@ -0,0 +1,94 @@
+import resource
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import RequestFactory
+
+from APPS.PRICE_TRACKER.models import Product
+from APPS.PRICE_TRACKER.views import PriceTrackerExportView
+
+
+def current_rss_mb() -> float:
+    """
+    Anonymous RSS: heap growth only, SQLite's mmap of the database file
+    is file-backed and would otherwise show up as growth
+    """
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('RssAnon:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # Peak RSS, kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark /price-tracker/export/ on the test database (DATABASES TEST NAME, "
+        "created and destroyed around the run): rows/sec and RSS while streaming"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000_000)
+        parser.add_argument("--format", choices=["csv", "jsonl"], default="csv")
+
+    def handle(self, *args, **options):
+        rows = options["rows"]
+
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            self.seed(rows)
+            self.export(rows, options["format"])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def seed(self, rows):
+        start = time.perf_counter()
+        batch_size = 10_000
+
+        for offset in range(0, rows, batch_size):
+            with transaction.atomic():
+                Product.objects.bulk_create(
+                    Product(
+                        category=("solar_panel", "inverter", "battery")[i % 3],
+                        company=f"Company {i % 500}",
+                        model=f"MODEL-{i}",
+                        price=Decimal(1000 + i % 90000),
+                        description="Benchmark product",
+                        max_power=f"{500 + i % 100}W",
+                        features="Anti-PID, High durability",
+                    )
+                    for i in range(offset, min(offset + batch_size, rows))
+                )
+
+        self.stdout.write(f"seeded {rows} rows in {time.perf_counter() - start:.1f}s")
+
+    def export(self, rows, export_format):
+        request = RequestFactory().get("/price-tracker/export/", {"format": export_format})
+        response = PriceTrackerExportView.as_view()(request, format=export_format)
+
+        rss_start = current_rss_mb()
+        rss_peak = rss_start
+        exported_bytes = 0
+        start = time.perf_counter()
+
+        for number, chunk in enumerate(response.streaming_content):
+            exported_bytes += len(chunk)
+            if number % 200 == 0:
+                rss_peak = max(rss_peak, current_rss_mb())
+
+        elapsed = time.perf_counter() - start
+        rss_peak = max(rss_peak, current_rss_mb())
+
+        self.stdout.write(
+            f"exported {rows} rows as {export_format}: {exported_bytes / 1024 / 1024:.1f} MB "
+            f"in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s)"
+        )
+        self.stdout.write(
+            f"RSS at start {rss_start:.1f} MB, peak while streaming {rss_peak:.1f} MB "
+            f"(+{rss_peak - rss_start:.1f} MB)"
+        )
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from APPS.PRICE_TRACKER.similarity import refresh_similarity_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Build the \"products like this one\" index and store it in the shared cache, "
+        "run after deploys and catalog imports so no request has to build it"
+    )
+
+    def handle(self, *args, **options):
+        index = refresh_similarity_index()
+        products = sum(len(category.vectors) for category in index.categories.values())
+        self.stdout.write(self.style.SUCCESS(
+            f"Similarity index of {products} products in {len(index.categories)} categories"
+        ))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from APPS.PRICE_TRACKER.models import Product
+from APPS.PRICE_TRACKER.scraper import scrape_prices
+
+
+class Command(BaseCommand):
+    help = "Refresh product prices from their websites (run from cron, e.g. hourly)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--category", choices=[c for c, _ in Product.CATEGORY_CHOICES], action="append")
+        parser.add_argument("--product", type=int, action="append", help="product id, repeatable")
+
+    def handle(self, *args, **options):
+        products = Product.objects.all()
+        if options["category"]:
+            products = products.filter(category__in=options["category"])
+        if options["product"]:
+            products = products.filter(id__in=options["product"])
+
+        report = scrape_prices(products)
+
+        self.stdout.write(
+            f"{report['pages']} pages in {report['seconds']}s ({report['pages_per_second']} pages/s) "
+            f"over {report['connections']} connections"
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"{report['changed']} prices changed, {report['not_modified']} pages not modified, "
+            f"{report['failed']} failed"
+        ))
@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
 from APPS.PRICE_TRACKER.models import Product
+from GSSC.cache import invalidate_tags
 from decimal import Decimal
 import random
 
@@ -63,4 +64,7 @@ class Command(BaseCommand):
 
         Product.objects.bulk_create(solar_panels + batteries + inverters)
 
+        # bulk_create skips post_save, drop cached catalog data ourselves
+        invalidate_tags("catalog")
+
         self.stdout.write(self.style.SUCCESS("✅ Successfully seeded 30 products"))
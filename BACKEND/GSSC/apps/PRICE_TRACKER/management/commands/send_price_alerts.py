@@ -0,0 +1,69 @@
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand
+from django.db.models import F
+from django.utils import timezone
+
+from APPS.PRICE_TRACKER.models import PriceAlertNotification
+
+
+class Command(BaseCommand):
+    help = "Deliver queued price-drop alert emails (run from one cron job, e.g. every minute)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None)
+
+    def handle(self, *args, **options):
+        config = {"BATCH_SIZE": 100, "MAX_ATTEMPTS": 5}
+        config.update(getattr(settings, "PRICE_ALERTS", {}))
+        batch_size = options["batch_size"] or config["BATCH_SIZE"]
+
+        sent = failed = 0
+        connection = get_connection()
+
+        while True:
+            batch = list(
+                PriceAlertNotification.objects.filter(status="pending")
+                .select_related("alert__user", "alert__product")
+                .order_by("created_at")[:batch_size]
+            )
+            if not batch:
+                break
+
+            for notification in batch:
+                try:
+                    self.message(notification, connection).send()
+                except Exception as error:
+                    attempts = notification.attempts + 1
+                    PriceAlertNotification.objects.filter(pk=notification.pk).update(
+                        attempts=F("attempts") + 1,
+                        status="failed" if attempts >= config["MAX_ATTEMPTS"] else "pending",
+                    )
+                    failed += 1
+                    self.stderr.write(f"Alert notification {notification.pk}: {error}")
+                else:
+                    PriceAlertNotification.objects.filter(pk=notification.pk).update(
+                        status="sent",
+                        sent_at=timezone.now(),
+                    )
+                    sent += 1
+
+            if failed:
+                # Retried on the next run, not in a tight loop
+                break
+
+        self.stdout.write(self.style.SUCCESS(f"Sent {sent} price alerts, {failed} failed"))
+
+    def message(self, notification, connection):
+        alert = notification.alert
+        product = alert.product
+
+        return EmailMessage(
+            subject=f"Price drop: {product.company} {product.model}",
+            body=(
+                f"{product.company} {product.model} is now {notification.price:,.2f}, "
+                f"at or below your target of {alert.target_price:,.2f}."
+            ),
+            to=[alert.user.email],
+            connection=connection,
+        )
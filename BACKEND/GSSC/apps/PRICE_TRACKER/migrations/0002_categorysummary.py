@@ -0,0 +1,24 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('PRICE_TRACKER', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategorySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(choices=[('solar_panel', 'Solar Panel'), ('inverter', 'Inverter'), ('battery', 'Battery')], max_length=20, unique=True)),
+                ('products', models.IntegerField(default=0)),
+                ('priced_products', models.IntegerField(default=0)),
+                ('price_sum', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
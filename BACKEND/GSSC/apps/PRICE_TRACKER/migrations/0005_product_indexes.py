@@ -0,0 +1,29 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('PRICE_TRACKER', '0004_pricechange'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['category', 'price'], name='PRICE_TRACK_categor_11e26f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['price'], name='PRICE_TRACK_price_b2c6e3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['company'], name='PRICE_TRACK_company_9f96b1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['model'], name='PRICE_TRACK_model_60b5de_idx'),
+        ),
+    ]
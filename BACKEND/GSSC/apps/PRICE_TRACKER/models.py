@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.db import models
 from django.core.validators import MinValueValidator
 
@@ -41,6 +42,234 @@ class Product(models.Model):
         # This solves the UnorderedObjectListWarning
         # Using '-created_at' shows newest items first
         ordering = ['-created_at']
+        # Admin filters and prefix searches (^company, ^model)
+        indexes = [
+            models.Index(fields=["category", "price"]),
+            models.Index(fields=["price"]),
+            models.Index(fields=["company"]),
+            models.Index(fields=["model"]),
+        ]
         
     def __str__(self):
         return f"{self.company} - {self.model} ({self.category})"
+
+
+class CategorySummary(models.Model):
+    """
+    Running totals per product category, kept up to date by the Product
+    signals and rebuilt by `manage.py rebuild_summaries`
+    """
+    category = models.CharField(max_length=20, choices=Product.CATEGORY_CHOICES, unique=True)
+    products = models.IntegerField(default=0)
+    priced_products = models.IntegerField(default=0)
+    price_sum = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def average_price(self):
+        if not self.priced_products:
+            return None
+        return self.price_sum / self.priced_products
+
+    def __str__(self):
+        return f"{self.category}: {self.products} products"
+
+
+class PriceAlert(models.Model):
+    """
+    Notify the user once the product's price falls to target_price or below.
+    Fires once, the user re-arms it by saving it again.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="price_alerts"
+    )
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name="price_alerts"
+    )
+    target_price = models.DecimalField(max_digits=12, decimal_places=2,
+                                       validators=[MinValueValidator(0)])
+    is_active = models.BooleanField(default=True)
+    triggered_at = models.DateTimeField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "product"], name="unique_price_alert_per_product"),
+        ]
+        indexes = [
+            # Active thresholds of one product in sorted order, see alerts.py
+            models.Index(fields=["product", "is_active", "target_price"]),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.product_id} <= {self.target_price}"
+
+
+class PriceAlertNotification(models.Model):
+    """
+    Outbox of triggered alerts, delivered by `manage.py send_price_alerts`
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    alert = models.ForeignKey(
+        PriceAlert,
+        on_delete=models.CASCADE,
+        related_name="notifications"
+    )
+    price = models.DecimalField(max_digits=12, decimal_places=2)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.IntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "created_at"]),
+        ]
+
+    def __str__(self):
+        return f"Alert {self.alert_id} at {self.price} ({self.status})"
+
+
+class PriceChange(models.Model):
+    """
+    Committed price changes, the feed behind /price-tracker/stream/.
+    Rows older than LIVE_PRICES['RETENTION'] are pruned as new ones arrive.
+    """
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name="price_changes"
+    )
+    category = models.CharField(max_length=20, choices=Product.CATEGORY_CHOICES)
+    old_price = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    price = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"Product {self.product_id}: {self.old_price} -> {self.price}"
+
+
+class ScrapedPage(models.Model):
+    """
+    Last fetch of a product's website by the scraper, with the validators
+    sent back as If-None-Match / If-Modified-Since on the next one
+    """
+    product = models.OneToOneField(
+        Product,
+        on_delete=models.CASCADE,
+        related_name="scraped_page"
+    )
+    url = models.URLField()                                   # validators only apply to this url
+    etag = models.CharField(max_length=255, blank=True)
+    last_modified = models.CharField(max_length=64, blank=True)
+    status = models.IntegerField(null=True, blank=True)      # HTTP status, null when the fetch failed
+    error = models.CharField(max_length=255, blank=True)
+
+    checked_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"Product {self.product_id}: {self.status or self.error}"
+
+
+class Distributor(models.Model):
+    """
+    Supplier an installer buys through, with its own price lists
+    """
+    name = models.CharField(max_length=200, unique=True)
+    region = models.CharField(max_length=100, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.region})" if self.region else self.name
+
+
+class DistributorCustomer(models.Model):
+    """
+    The distributor whose price lists apply to a user
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="distributor_account"
+    )
+    distributor = models.ForeignKey(
+        Distributor,
+        on_delete=models.CASCADE,
+        related_name="customers"
+    )
+
+    def __str__(self):
+        return f"{self.user} @ {self.distributor}"
+
+
+class PriceList(models.Model):
+    """
+    Price overrides for one layer: global (no distributor, no user), one
+    distributor's customers, or one customer. Resolved by pricelists.py,
+    customer over distributor over global over Product.price.
+    """
+    name = models.CharField(max_length=200)
+    distributor = models.ForeignKey(
+        Distributor,
+        on_delete=models.CASCADE,
+        null=True, blank=True,
+        related_name="price_lists"
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True, blank=True,
+        related_name="price_lists"
+    )
+    priority = models.IntegerField(default=0)    # within a layer the higher list wins
+    is_active = models.BooleanField(default=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(distributor__isnull=True) | models.Q(user__isnull=True),
+                name="price_list_single_layer",
+            ),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class PriceListItem(models.Model):
+    price_list = models.ForeignKey(
+        PriceList,
+        on_delete=models.CASCADE,
+        related_name="items"
+    )
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name="price_list_items"
+    )
+    price = models.DecimalField(max_digits=12, decimal_places=2,
+                                validators=[MinValueValidator(0)])
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["price_list", "product"], name="unique_price_list_product"),
+        ]
+
+    def __str__(self):
+        return f"{self.price_list}: {self.product_id} = {self.price}"
@@ -0,0 +1,62 @@
+from django.db.models import Case, IntegerField, Q, Value, When
+
+from GSSC.cache import cached
+
+from .models import PriceListItem
+
+
+'''
+Layered prices: what one user pays for a product.
+
+    customer lists      PriceList.user = the user
+    distributor lists   PriceList.distributor = the user's DistributorCustomer.distributor
+    global lists        neither
+    Product.price       when no list has the product
+
+price_map(user) flattens the active lists that apply to the user into
+{product_id: price}, one query ordered from the lowest layer to the
+highest so later rows simply overwrite earlier ones. The map only holds
+overrides, everything else is Product.price, so it stays small whatever
+the size of the catalog.
+
+Maps are cached per user under the "pricelists" tag, which the
+PriceList / PriceListItem / DistributorCustomer signals invalidate.
+queryset.update() and bulk_create skip those, call
+invalidate_tags("pricelists") after bulk imports.
+'''
+
+GLOBAL, DISTRIBUTOR, CUSTOMER = 0, 1, 2
+
+
+def resolve_prices(user_id=None) -> dict:
+    """
+    {product_id: price} of the price lists that apply to the user, uncached
+    """
+    layers = Q(price_list__distributor=None, price_list__user=None)
+    if user_id is not None:
+        layers |= Q(price_list__user_id=user_id) | Q(price_list__distributor__customers__user_id=user_id)
+
+    rows = (
+        PriceListItem.objects.filter(layers, price_list__is_active=True)
+        .annotate(layer=Case(
+            When(price_list__user__isnull=False, then=Value(CUSTOMER)),
+            When(price_list__distributor__isnull=False, then=Value(DISTRIBUTOR)),
+            default=Value(GLOBAL),
+            output_field=IntegerField(),
+        ))
+        .order_by("layer", "price_list__priority", "price_list_id")
+        .values_list("product_id", "price")
+    )
+    return dict(rows)
+
+
+@cached(ttl=600, tags=("pricelists",), key=lambda user_id: str(user_id))
+def cached_prices(user_id) -> dict:
+    return resolve_prices(user_id)
+
+
+def price_map(user) -> dict:
+    """
+    Cached {product_id: price} overrides for a user, anonymous users get the global lists
+    """
+    return cached_prices(user.pk if user is not None and user.is_authenticated else None)
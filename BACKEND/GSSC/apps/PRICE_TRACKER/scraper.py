@@ -0,0 +1,488 @@
+import asyncio
+import json
+import re
+import ssl
+import time
+import zlib
+from decimal import Decimal, InvalidOperation
+from urllib.parse import urljoin, urlsplit
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .bulk import update_prices
+from .models import Product, ScrapedPage
+
+
+'''
+Price scraper: refreshes Product.price from each product's website.
+
+    manage.py scrape_prices            (cron, the whole catalog)
+    POST /price-tracker/update/        (staff, the "Update items" button,
+                                        the REQUEST_LIMIT products checked longest ago)
+
+Pages are fetched on one asyncio event loop with a small HTTP/1.1 client:
+
+    - one keep-alive connection pool per scheme/host/port, at most PER_HOST
+      requests in flight per host and CONCURRENCY overall, so a big catalog
+      on one shop neither opens a connection per product nor hammers it
+    - the ETag / Last-Modified of the last fetch go out as If-None-Match /
+      If-Modified-Since, an unchanged page answers 304 without a body and
+      is not parsed again
+    - gzip / deflate bodies, chunked transfer, redirects, MAX_BYTES per page
+      before and after decompression
+
+A parser turns a page into a price. SCRAPER["PARSERS"] maps a host to the
+dotted path of a BaseParser subclass, other hosts get DEFAULT_PARSER, which
+reads schema.org JSON-LD offers, price meta tags and itemprop="price".
+
+Products are processed BATCH_SIZE at a time. Each batch's prices are
+written with bulk.update_prices() (summaries, live feed and alerts
+included) and its validators with one upsert of ScrapedPage rows.
+'''
+
+REDIRECTS = (301, 302, 303, 307, 308)
+
+
+def scraper_settings() -> dict:
+    config = {
+        "CONCURRENCY": 32,
+        "PER_HOST": 4,
+        "TIMEOUT": 15,
+        "MAX_BYTES": 2 * 1024 * 1024,
+        "MAX_REDIRECTS": 3,
+        "BATCH_SIZE": 500,
+        "REQUEST_LIMIT": 200,
+        "USER_AGENT": "GSSC-PriceTracker/1.0",
+        "PARSERS": {},
+        "DEFAULT_PARSER": "APPS.PRICE_TRACKER.scraper.StructuredDataParser",
+    }
+    config.update(getattr(settings, "SCRAPER", {}))
+    return config
+
+
+#=============================================================
+# HTTP CLIENT
+#=============================================================
+
+class HttpError(Exception):
+    pass
+
+
+class Page:
+    def __init__(self, url: str, status: int, headers: dict, body: bytes):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    @property
+    def text(self) -> str:
+        match = re.search(r"charset=([\w-]+)", self.headers.get("content-type", ""), re.IGNORECASE)
+        try:
+            return self.body.decode(match.group(1) if match else "utf-8", errors="replace")
+        except LookupError:
+            return self.body.decode("utf-8", errors="replace")
+
+
+class HostPool:
+    """
+    Keep-alive connections to one scheme://host:port
+    """
+
+    def __init__(self, scheme: str, host: str, port: int, limit: int):
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.slots = asyncio.Semaphore(limit)
+        self.context = ssl.create_default_context() if scheme == "https" else None
+        self.idle = []
+        self.opened = 0
+
+    async def connect(self) -> tuple:
+        """
+        (reader, writer, reused), an idle connection when there is one
+        """
+        while self.idle:
+            reader, writer = self.idle.pop()
+            if not reader.at_eof() and not writer.is_closing():
+                return reader, writer, True
+            writer.close()
+
+        reader, writer = await asyncio.open_connection(self.host, self.port, ssl=self.context)
+        self.opened += 1
+        return reader, writer, False
+
+    def release(self, reader, writer, keep: bool):
+        if keep:
+            self.idle.append((reader, writer))
+        else:
+            writer.close()
+
+    def close(self) -> list:
+        writers = [writer for _, writer in self.idle]
+        for writer in writers:
+            writer.close()
+        self.idle.clear()
+        return writers
+
+
+class HttpClient:
+    def __init__(self, config: dict = None):
+        self.config = config or scraper_settings()
+        self.slots = asyncio.Semaphore(self.config["CONCURRENCY"])
+        self.pools = {}
+
+    def pool(self, url: str) -> HostPool:
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise HttpError(f"Not an http(s) url: {url}")
+
+        key = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == "https" else 80))
+        if key not in self.pools:
+            self.pools[key] = HostPool(*key, self.config["PER_HOST"])
+        return self.pools[key]
+
+    @property
+    def connections(self) -> int:
+        return sum(pool.opened for pool in self.pools.values())
+
+    async def aclose(self):
+        writers = [writer for pool in self.pools.values() for writer in pool.close()]
+        await asyncio.gather(*(writer.wait_closed() for writer in writers), return_exceptions=True)
+
+    async def get(self, url: str, headers: dict = None) -> Page:
+        for _ in range(self.config["MAX_REDIRECTS"] + 1):
+            page = await self.request(url, headers or {})
+            if page.status not in REDIRECTS or "location" not in page.headers:
+                return page
+            url = urljoin(url, page.headers["location"])
+
+        raise HttpError(f"More than {self.config['MAX_REDIRECTS']} redirects")
+
+    async def request(self, url: str, headers: dict) -> Page:
+        pool = self.pool(url)
+        parts = urlsplit(url)
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+
+        lines = [
+            f"GET {target} HTTP/1.1",
+            f"Host: {parts.netloc.rsplit('@', 1)[-1]}",
+            f"User-Agent: {self.config['USER_AGENT']}",
+            "Accept-Encoding: gzip, deflate",
+            "Connection: keep-alive",
+            *(f"{name}: {value}" for name, value in headers.items()),
+        ]
+        request = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+        timeout = self.config["TIMEOUT"]
+
+        # Host slot first: requests queued for a busy host don't hold global slots
+        async with pool.slots, self.slots:
+            for attempt in range(2):
+                reader, writer, reused = await asyncio.wait_for(pool.connect(), timeout)
+                try:
+                    writer.write(request)
+                    status, response_headers, body, keep = await asyncio.wait_for(
+                        self.read_response(reader), timeout
+                    )
+                except (ConnectionError, asyncio.IncompleteReadError) as error:
+                    writer.close()
+                    # The server closed an idle keep-alive connection, retry on a fresh one
+                    if reused and attempt == 0:
+                        pool.close()
+                        continue
+                    raise HttpError(f"Connection lost: {error}") from None
+                except BaseException:
+                    writer.close()
+                    raise
+
+                pool.release(reader, writer, keep)
+                return Page(url, status, response_headers, body)
+
+    async def read_response(self, reader) -> tuple:
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("closed before the response")
+        version, status = status_line.decode("latin-1").split(None, 2)[:2]
+        status = int(status)
+
+        headers = {}
+        while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        keep = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+        max_bytes = self.config["MAX_BYTES"]
+
+        if status in (204, 304):
+            body = b""
+        elif headers.get("transfer-encoding", "").lower() == "chunked":
+            body = await self.read_chunked(reader)
+        elif "content-length" in headers:
+            length = int(headers["content-length"])
+            if length > max_bytes:
+                raise HttpError(f"Page larger than {max_bytes} bytes")
+            body = await reader.readexactly(length)
+        else:
+            body = await reader.read(max_bytes + 1)
+            keep = False
+
+        if len(body) > max_bytes:
+            raise HttpError(f"Page larger than {max_bytes} bytes")
+
+        encoding = headers.get("content-encoding", "").lower()
+        if encoding in ("gzip", "deflate"):
+            body = self.decompress(body, encoding)
+
+        return status, headers, body, keep
+
+    def decompress(self, body: bytes, encoding: str) -> bytes:
+        """
+        Stops at MAX_BYTES, a small compressed page can inflate to gigabytes
+        """
+        max_bytes = self.config["MAX_BYTES"]
+        wbits = zlib.MAX_WBITS | 16 if encoding == "gzip" else zlib.MAX_WBITS
+        try:
+            body = zlib.decompressobj(wbits).decompress(body, max_bytes + 1)
+        except zlib.error as error:
+            raise HttpError(f"Bad {encoding} body: {error}") from None
+
+        if len(body) > max_bytes:
+            raise HttpError(f"Page larger than {max_bytes} bytes")
+        return body
+
+    async def read_chunked(self, reader) -> bytes:
+        body = bytearray()
+        while size := int((await reader.readline()).split(b";")[0].strip() or b"0", 16):
+            body += await reader.readexactly(size)
+            await reader.readexactly(2)
+            if len(body) > self.config["MAX_BYTES"]:
+                raise HttpError(f"Page larger than {self.config['MAX_BYTES']} bytes")
+
+        # Trailers
+        while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+            pass
+        return bytes(body)
+
+
+#=============================================================
+# PARSERS
+#=============================================================
+
+PRICE_RE = re.compile(r"\d[\d,\s]*(?:\.\d+)?")
+
+
+def parse_price(value):
+    """
+    Decimal from "₦1,250,000.00", "1250000" or 1250000, None when there is no positive price
+    """
+    match = PRICE_RE.search(str(value))
+    if not match:
+        return None
+    try:
+        price = Decimal(re.sub(r"[,\s]", "", match.group()))
+    except InvalidOperation:
+        return None
+    return price if price > 0 else None
+
+
+class BaseParser:
+    """
+    A parser finds the price on a fetched product page, None when it has none.
+    product is {"id", "url"} of the product the page belongs to.
+    """
+
+    def parse(self, page: Page, product: dict):
+        raise NotImplementedError
+
+
+class StructuredDataParser(BaseParser):
+    JSON_LD_RE = re.compile(
+        r"<script[^>]*application/ld\+json[^>]*>(.*?)</script>", re.IGNORECASE | re.DOTALL
+    )
+    META_RE = re.compile(
+        r"<meta[^>]+(?:property|name|itemprop)=[\"'](?:product:price:amount|og:price:amount|price)[\"'][^>]*>",
+        re.IGNORECASE,
+    )
+    CONTENT_RE = re.compile(r"content=[\"']([^\"']+)[\"']", re.IGNORECASE)
+    ITEMPROP_RE = re.compile(r"itemprop=[\"']price[\"'][^>]*>([^<]+)<", re.IGNORECASE)
+
+    def parse(self, page: Page, product: dict):
+        html = page.text
+
+        for block in self.JSON_LD_RE.findall(html):
+            try:
+                price = self.offer_price(json.loads(block))
+            except ValueError:
+                continue
+            if price is not None:
+                return price
+
+        for tag in self.META_RE.findall(html):
+            content = self.CONTENT_RE.search(tag)
+            if content and (price := parse_price(content.group(1))) is not None:
+                return price
+
+        for text in self.ITEMPROP_RE.findall(html):
+            if (price := parse_price(text)) is not None:
+                return price
+
+        return None
+
+    def offer_price(self, data):
+        if isinstance(data, list):
+            for item in data:
+                if (price := self.offer_price(item)) is not None:
+                    return price
+        elif isinstance(data, dict):
+            for key in ("offers", "@graph"):
+                if key in data:
+                    return self.offer_price(data[key])
+            for key in ("price", "lowPrice"):
+                if key in data:
+                    return parse_price(data[key])
+        return None
+
+
+_parsers = {}
+
+
+def parser_for(url: str) -> BaseParser:
+    config = scraper_settings()
+    host = (urlsplit(url).hostname or "").removeprefix("www.")
+    path = config["PARSERS"].get(host, config["DEFAULT_PARSER"])
+
+    if path not in _parsers:
+        _parsers[path] = import_string(path)()
+    return _parsers[path]
+
+
+#=============================================================
+# SCRAPING
+#=============================================================
+
+async def fetch_product(client: HttpClient, product: dict) -> dict:
+    """
+    Fetches one product page, the result carries the price and the validators to keep
+    """
+    headers = {}
+    if product["etag"]:
+        headers["If-None-Match"] = product["etag"]
+    if product["last_modified"]:
+        headers["If-Modified-Since"] = product["last_modified"]
+
+    result = {**product, "status": None, "price": None, "error": ""}
+    try:
+        page = await client.get(product["url"], headers)
+        result["status"] = page.status
+
+        if page.status == 304:
+            return result
+        if page.status != 200:
+            result["error"] = f"HTTP {page.status}"
+            return result
+
+        result["price"] = parser_for(page.url).parse(page, product)
+        if result["price"] is None:
+            result["error"] = "No price found on the page"
+            # Parsed again next time instead of answered by a 304
+            result["etag"] = result["last_modified"] = ""
+        else:
+            result["etag"] = page.headers.get("etag", "")[:255]
+            result["last_modified"] = page.headers.get("last-modified", "")[:64]
+    except Exception as error:
+        # One broken page or shop must not stop the others
+        result["error"] = f"{type(error).__name__}: {error}"[:255]
+
+    return result
+
+
+async def fetch_products(client: HttpClient, products: list) -> list:
+    return await asyncio.gather(*(fetch_product(client, product) for product in products))
+
+
+def save_results(results: list) -> int:
+    """
+    Writes one batch of fetch results, returns how many prices changed
+    """
+    now = timezone.now()
+    changed = update_prices({r["id"]: r["price"] for r in results if r["price"] is not None})
+
+    ScrapedPage.objects.bulk_create(
+        [
+            ScrapedPage(
+                product_id=r["id"], url=r["url"], etag=r["etag"], last_modified=r["last_modified"],
+                status=r["status"], error=r["error"], checked_at=now,
+            )
+            for r in results
+        ],
+        update_conflicts=True,
+        unique_fields=["product"],
+        update_fields=["url", "etag", "last_modified", "status", "error", "checked_at"],
+    )
+    Product.objects.filter(id__in=[r["id"] for r in results if r["status"] in (200, 304)]).update(
+        last_scraped=now
+    )
+    return changed
+
+
+def stalest_products(limit: int):
+    """
+    The limit products with a website checked longest ago, never checked ones first
+    """
+    ids = (
+        Product.objects.exclude(website=None).exclude(website="")
+        .order_by(F("scraped_page__checked_at").asc(nulls_first=True), "id")
+        .values_list("id", flat=True)[:limit]
+    )
+    return Product.objects.filter(id__in=list(ids))
+
+
+def scrape_prices(queryset=None, config: dict = None) -> dict:
+    """
+    Scrapes every product of the queryset that has a website, returns the run's report
+    """
+    config = config or scraper_settings()
+    products = (Product.objects.all() if queryset is None else queryset).exclude(website=None).exclude(website="")
+    rows = products.order_by("id").values_list(
+        "id", "website", "scraped_page__url", "scraped_page__etag", "scraped_page__last_modified"
+    )
+
+    report = {"pages": 0, "changed": 0, "not_modified": 0, "failed": 0, "connections": 0}
+    started = time.perf_counter()
+
+    # One loop for the whole run, so the pools keep their connections across batches
+    loop = asyncio.new_event_loop()
+    try:
+        client = HttpClient(config)
+        last_id = 0
+        # Keyset batches, the writes of one batch never run under an open cursor
+        while batch := list(rows.filter(id__gt=last_id)[:config["BATCH_SIZE"]]):
+            last_id = batch[-1][0]
+            batch = [
+                {
+                    "id": product_id,
+                    "url": url,
+                    # Validators of another url would be meaningless
+                    "etag": (etag or "") if url == scraped_url else "",
+                    "last_modified": (last_modified or "") if url == scraped_url else "",
+                }
+                for product_id, url, scraped_url, etag, last_modified in batch
+            ]
+            results = loop.run_until_complete(fetch_products(client, batch))
+
+            report["pages"] += len(results)
+            report["not_modified"] += sum(r["status"] == 304 for r in results)
+            report["failed"] += sum(bool(r["error"]) for r in results)
+            report["changed"] += save_results(results)
+
+        loop.run_until_complete(client.aclose())
+        report["connections"] = client.connections
+    finally:
+        loop.close()
+
+    report["seconds"] = round(time.perf_counter() - started, 3)
+    report["pages_per_second"] = round(report["pages"] / report["seconds"], 1) if report["seconds"] else 0.0
+    return report
@@ -1,8 +1,15 @@
 from rest_framework import serializers
-from .models import Product
+from .models import PriceAlert, Product
 
 
 class ProductSerializer(serializers.ModelSerializer):
     class Meta:
         model = Product
         fields = "__all__"
+
+
+class PriceAlertSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PriceAlert
+        fields = ["id", "product", "target_price", "is_active", "triggered_at", "created_at"]
+        read_only_fields = ["triggered_at", "created_at"]
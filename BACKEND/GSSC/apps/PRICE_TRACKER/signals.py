@@ -0,0 +1,48 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from GSSC.cache import invalidate_tags
+
+from .alerts import record_price_change
+from .models import DistributorCustomer, PriceList, PriceListItem, Product
+from .summaries import product_state, record_product_change
+
+
+# Anything cached with the "catalog" tag depends on product names or prices.
+# bulk_create / queryset.update() skip these signals, call
+# invalidate_tags("catalog") and `manage.py rebuild_summaries` after bulk imports.
+
+@receiver(pre_save, sender=Product)
+def product_saving(sender, instance, **kwargs):
+    # Remember what the row looked like so post_save can apply the difference
+    instance._summary_state = None
+    if instance.pk:
+        old = Product.objects.filter(pk=instance.pk).values("category", "price").first()
+        if old:
+            instance._summary_state = product_state(old["category"], old["price"])
+
+
+@receiver(post_save, sender=Product)
+def product_saved(sender, instance, **kwargs):
+    old = getattr(instance, "_summary_state", None)
+    record_product_change(old, product_state(instance.category, instance.price))
+
+    # A new product has no alerts yet
+    if old is not None:
+        record_price_change(instance.pk, old["price"], instance.price)
+
+    invalidate_tags("catalog")
+
+
+@receiver(post_delete, sender=Product)
+def product_deleted(sender, instance, **kwargs):
+    record_product_change(product_state(instance.category, instance.price), None)
+    invalidate_tags("catalog")
+
+
+# Cached price maps (pricelists.py) depend on the lists and on who buys through which distributor
+@receiver([post_save, post_delete], sender=PriceList)
+@receiver([post_save, post_delete], sender=PriceListItem)
+@receiver([post_save, post_delete], sender=DistributorCustomer)
+def price_lists_changed(sender, **kwargs):
+    invalidate_tags("pricelists")
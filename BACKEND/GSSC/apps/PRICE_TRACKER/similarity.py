@@ -0,0 +1,257 @@
+import heapq
+import logging
+import math
+import re
+import threading
+
+from django.db import connections
+
+from GSSC.cache import MISSING, get_cache
+
+
+'''
+"Products like this one": k nearest neighbours over normalized spec vectors.
+
+Every product becomes a vector of numeric specs parsed from its text fields:
+
+    watts        max_power "550W", or the model name "VM-5KW"
+    efficiency   "21.5%"
+    voltage      max_system_voltage "1500V"
+    capacity_ah  battery model "PC-100Ah"
+    price
+
+Each feature is z-scored within the product's category, features a category
+does not have (or that never vary) are left out, and a missing value sits on
+the category mean so it does not pull the product anywhere.
+
+The neighbours of every product are computed once per category when the
+index is built (O(n^2) per category, the catalog has hundreds of products),
+so a query is a dict lookup.
+
+The index follows the "catalog" cache tag, which changes version after any
+product save or import. Requests never build it, except the first one of a
+process when no index exists anywhere. Instead:
+
+    - `manage.py build_similarity_index` (deploy, cron after imports)
+      builds it and stores it in the shared cache
+    - a process that sees a newer catalog version loads the stored index
+      when there is one for that version, otherwise it rebuilds it in a
+      background thread and stores it for the other processes
+    - until then requests keep getting the previous index
+'''
+
+logger = logging.getLogger(__name__)
+
+SPEC_FEATURES = ("watts", "efficiency", "voltage", "capacity_ah", "price")
+
+SPEC_FIELDS = ("id", "category", "model", "price", "max_power", "max_system_voltage", "efficiency")
+
+NEIGHBOURS = 20   # precomputed per product
+
+UNIT_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(k?)(w|v|ah|%)(?![a-z])", re.IGNORECASE)
+
+
+def parse_unit(text, unit: str):
+    """
+    First number followed by unit in text, "5KW" with unit "w" -> 5000.0
+    """
+    for value, kilo, found in UNIT_RE.findall(text or ""):
+        if found.lower() == unit:
+            return float(value) * (1000 if kilo else 1)
+    return None
+
+
+def spec_vector(product: dict) -> dict:
+    price = product.get("price")
+
+    return {
+        "watts": parse_unit(product.get("max_power"), "w") or parse_unit(product.get("model"), "w"),
+        "efficiency": parse_unit(product.get("efficiency"), "%"),
+        "voltage": parse_unit(product.get("max_system_voltage"), "v"),
+        "capacity_ah": parse_unit(product.get("model"), "ah"),
+        "price": float(price) if price is not None else None,
+    }
+
+
+class CategoryIndex:
+    def __init__(self, products: list, neighbours: int = NEIGHBOURS):
+        specs = {p["id"]: spec_vector(p) for p in products}
+        self.prices = {product_id: spec["price"] for product_id, spec in specs.items()}
+
+        self.features = []
+        scales = []
+        for feature in SPEC_FEATURES:
+            values = [spec[feature] for spec in specs.values() if spec[feature] is not None]
+            if len(values) < 2:
+                continue
+
+            mean = sum(values) / len(values)
+            std = math.sqrt(sum((v - mean) ** 2 for v in values) / len(values))
+            if std > 0:
+                self.features.append(feature)
+                scales.append((mean, std))
+
+        self.vectors = {
+            product_id: tuple(
+                0.0 if spec[feature] is None else (spec[feature] - mean) / std
+                for feature, (mean, std) in zip(self.features, scales)
+            )
+            for product_id, spec in specs.items()
+        }
+
+        self.neighbours = {
+            product_id: self.nearest(vector, neighbours, exclude=product_id)
+            for product_id, vector in self.vectors.items()
+        }
+
+    def nearest(self, vector, limit: int, exclude=None, max_price=None) -> list:
+        """
+        [(distance, product_id), ...] closest first, brute force
+        """
+        return heapq.nsmallest(limit, (
+            (math.dist(vector, other), product_id)
+            for product_id, other in self.vectors.items()
+            if product_id != exclude and self.below(product_id, max_price)
+        ))
+
+    def below(self, product_id, max_price) -> bool:
+        if max_price is None:
+            return True
+        price = self.prices[product_id]
+        return price is not None and price < max_price
+
+    def similar(self, product_id, limit: int = 5, max_price=None) -> list:
+        neighbours = [
+            (distance, other) for distance, other in self.neighbours[product_id]
+            if self.below(other, max_price)
+        ]
+
+        # A price filter can leave too few precomputed neighbours, fall back to a scan
+        if len(neighbours) < limit and len(neighbours) < len(self.neighbours[product_id]):
+            neighbours = self.nearest(self.vectors[product_id], limit, product_id, max_price)
+
+        return neighbours[:limit]
+
+
+class SimilarityIndex:
+    def __init__(self, products, version=None):
+        by_category = {}
+        for product in products:
+            by_category.setdefault(product["category"], []).append(product)
+
+        self.version = version
+        self.categories = {
+            category: CategoryIndex(items) for category, items in by_category.items()
+        }
+        self.category_of = {
+            product["id"]: product["category"] for items in by_category.values() for product in items
+        }
+
+    def similar(self, product_id, limit: int = 5, cheaper: bool = False):
+        """
+        [(distance, product_id), ...] in the same category, None for an unknown product
+        """
+        category = self.category_of.get(product_id)
+        if category is None:
+            return None
+
+        index = self.categories[category]
+        max_price = index.prices[product_id] if cheaper else None
+        if cheaper and max_price is None:
+            return []
+
+        return index.similar(product_id, limit, max_price)
+
+
+#=============================================================
+# CATALOG INDEX (one per process, follows the catalog version)
+#=============================================================
+
+INDEX_KEY = "similarity-index"
+
+INDEX_TTL = 24 * 60 * 60
+
+_index = None
+_index_lock = threading.Lock()
+_build_lock = threading.Lock()
+_rebuilding = False
+
+
+def catalog_version():
+    return get_cache().tag_version("catalog")
+
+
+def build_similarity_index(version=None) -> SimilarityIndex:
+    from .models import Product
+
+    products = Product.objects.values(*SPEC_FIELDS).iterator(chunk_size=1000)
+    return SimilarityIndex(products, version)
+
+
+def refresh_similarity_index() -> SimilarityIndex:
+    """
+    Builds the index of the current catalog, stores it in the shared cache and serves it
+    """
+    global _index
+
+    cache = get_cache()
+    # Read before building: a product saved meanwhile leaves the stored index stale
+    versions = {"catalog": catalog_version()}
+    index = build_similarity_index(versions["catalog"])
+    cache.set(INDEX_KEY, index, INDEX_TTL, tags=("catalog",), tag_versions=versions)
+
+    with _index_lock:
+        _index = index
+    return index
+
+
+def rebuild_in_background():
+    global _rebuilding
+
+    with _index_lock:
+        if _rebuilding:
+            return
+        _rebuilding = True
+
+    def rebuild():
+        global _rebuilding
+        try:
+            refresh_similarity_index()
+        except Exception:
+            logger.exception("Rebuilding the similarity index failed")
+        finally:
+            _rebuilding = False
+            connections.close_all()
+
+    threading.Thread(target=rebuild, name="similarity-index", daemon=True).start()
+
+
+def get_similarity_index() -> SimilarityIndex:
+    global _index
+
+    index = _index
+    if index is not None and (_rebuilding or index.version == catalog_version()):
+        return index
+
+    stored = get_cache().get(INDEX_KEY)
+    if stored is not MISSING:
+        with _index_lock:
+            _index = stored
+        return stored
+
+    if index is None:
+        # Nothing to serve yet, one thread builds and the others wait for it
+        with _build_lock:
+            if _index is None:
+                refresh_similarity_index()
+        return _index
+
+    rebuild_in_background()
+    return index
+
+
+def reset_similarity_index():
+    global _index
+
+    with _index_lock:
+        _index = None
@@ -0,0 +1,66 @@
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+
+from .models import CategorySummary, Product
+
+
+def increment(model, lookup: dict, **deltas):
+    """
+    Adds deltas to the summary row matching lookup with one UPDATE,
+    creating the row the first time
+    """
+    changes = {field: F(field) + value for field, value in deltas.items()}
+
+    if model.objects.filter(**lookup).update(**changes):
+        return
+
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **deltas)
+    except IntegrityError:
+        # Created concurrently, add to it instead
+        model.objects.filter(**lookup).update(**changes)
+
+
+def product_state(category, price):
+    return {"category": category, "price": price}
+
+
+def record_product_change(old, new):
+    """
+    old / new are product_state() dicts, None for create / delete
+    """
+    for state, sign in ((old, -1), (new, 1)):
+        if state is None:
+            continue
+
+        price = state["price"]
+        increment(
+            CategorySummary,
+            {"category": state["category"]},
+            products=sign,
+            priced_products=sign if price is not None else 0,
+            price_sum=sign * Decimal(str(price or 0)),
+        )
+
+
+def rebuild_category_summaries():
+    rows = (
+        Product.objects.values("category")
+        .annotate(products=Count("id"), priced_products=Count("price"), price_sum=Sum("price"))
+        .order_by()
+    )
+
+    with transaction.atomic():
+        CategorySummary.objects.all().delete()
+        CategorySummary.objects.bulk_create(
+            CategorySummary(
+                category=row["category"],
+                products=row["products"],
+                priced_products=row["priced_products"],
+                price_sum=row["price_sum"] or 0,
+            )
+            for row in rows
+        )
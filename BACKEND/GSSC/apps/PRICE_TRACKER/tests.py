@@ -1,3 +1,614 @@
-from django.test import TestCase
+import asyncio
+import csv
+import gzip
+import json
+import threading
+from io import StringIO
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from rest_framework.test import APIClient
+
+from GSSC import admin_tools
+from GSSC.admin_tools import EstimatedCountPaginator
+from GSSC.cache import get_cache
+from GSSC.throttling import reset_rate_limits
+
+from .alerts import evaluate_price_changes, price_change_batch
+from .bulk import update_prices
+from .live import RESYNC, PriceHub, get_price_hub
+from .scraper import BaseParser, scrape_prices
+from .similarity import get_similarity_index, parse_unit, refresh_similarity_index, reset_similarity_index
+from .models import CategorySummary, PriceAlert, PriceAlertNotification, PriceChange, Product, ScrapedPage
+
+
+class PriceAlertTests(TestCase):
+    def setUp(self):
+        self.product = Product.objects.create(
+            category='solar_panel', company='SolarTech', model='ST-550W', price=Decimal('60000')
+        )
+        self.users = [
+            get_user_model().objects.create_user(
+                username=f'user{number}', email=f'user{number}@example.com'
+            )
+            for number in range(4)
+        ]
+        self.alerts = [
+            PriceAlert.objects.create(user=user, product=self.product, target_price=Decimal(target))
+            for user, target in zip(self.users, ['58000', '55000', '52000', '40000'])
+        ]
+
+    def fired(self):
+        return sorted(
+            str(target) for target in
+            PriceAlertNotification.objects.values_list('alert__target_price', flat=True)
+        )
+
+    def set_price(self, price):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.price = Decimal(price)
+            self.product.save()
+
+    def test_only_thresholds_crossed_by_the_drop_fire(self):
+        self.set_price('56000')
+        self.assertEqual(self.fired(), ['58000.00'])
+
+        # Going back up fires nothing, dropping again does not repeat 58000
+        self.set_price('59000')
+        self.set_price('52000')
+        self.assertEqual(self.fired(), ['52000.00', '55000.00', '58000.00'])
+        self.assertEqual(PriceAlert.objects.filter(is_active=True).count(), 1)
+
+    def test_a_batch_is_evaluated_once_with_its_first_and_last_price(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with price_change_batch():
+                for price in ['57000', '59000', '53000']:
+                    self.product.price = Decimal(price)
+                    self.product.save()
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(self.fired(), ['55000.00', '58000.00'])
+
+        fired = evaluate_price_changes({self.product.id: (Decimal('53000'), Decimal('39000'))})
+        self.assertEqual(fired, 2)
+
+    def test_notifications_are_delivered_once(self):
+        self.set_price('50000')
+        call_command('send_price_alerts', stdout=StringIO())
+        call_command('send_price_alerts', stdout=StringIO())
+
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(PriceAlertNotification.objects.filter(status='sent').count(), 3)
+        self.assertIn('50,000.00', mail.outbox[0].body)
+
+    def test_alert_below_the_current_price_fires_on_creation(self):
+        user = get_user_model().objects.create_user(
+            username='late', email='late@example.com'
+        )
+        client = APIClient()
+        client.force_authenticate(user)
+
+        response = client.post(
+            '/price-tracker/alerts/', {'product': self.product.id, 'target_price': '65000'}
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(response.json()['is_active'])
+        self.assertIn('65000.00', self.fired())
+
+
+class SimilarProductTests(TestCase):
+    def setUp(self):
+        get_cache().invalidate_tags('catalog')
+        reset_rate_limits()
+        reset_similarity_index()
+
+        self.panels = {
+            watts: Product.objects.create(
+                category='solar_panel', company='SolarTech', model=f'ST-{watts}W',
+                max_power=f'{watts}W', efficiency=efficiency, max_system_voltage='1500V',
+                price=Decimal(price),
+            )
+            for watts, efficiency, price in [
+                (400, '19.0%', '40000'),
+                (540, '21.0%', '52000'),
+                (550, '21.2%', '56000'),
+                (560, '21.4%', '53000'),
+                (700, '23.0%', '80000'),
+            ]
+        }
+        self.inverter = Product.objects.create(
+            category='inverter', company='VoltMax', model='VM-5KW', price=Decimal('90000')
+        )
+
+    def test_parse_unit(self):
+        self.assertEqual(parse_unit('VM-5KW', 'w'), 5000)
+        self.assertEqual(parse_unit('21.5%', '%'), 21.5)
+        self.assertEqual(parse_unit('PC-100Ah', 'ah'), 100)
+        self.assertIsNone(parse_unit('PC-100Ah', 'w'))
+
+    def test_neighbours_stay_in_the_category(self):
+        response = self.client.get(f'/price-tracker/{self.panels[550].id}/similar/?limit=2')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [row['model'] for row in response.json()['results']],
+            ['ST-560W', 'ST-540W'],
+        )
+
+        cheaper = self.client.get(f'/price-tracker/{self.panels[550].id}/similar/?limit=3&cheaper=1')
+        self.assertEqual(
+            [row['model'] for row in cheaper.json()['results']],
+            ['ST-560W', 'ST-540W', 'ST-400W'],
+        )
+        self.assertEqual(self.client.get('/price-tracker/999999/similar/').status_code, 404)
+
+    def test_index_follows_the_catalog_version(self):
+        index = get_similarity_index()
+        self.assertIs(get_similarity_index(), index)
+
+        self.panels[700].price = Decimal('55000')
+        self.panels[700].save()
+
+        # The old index is served while the new one is built off the request
+        with mock.patch('APPS.PRICE_TRACKER.similarity.rebuild_in_background') as rebuild:
+            self.assertIs(get_similarity_index(), index)
+        rebuild.assert_called_once()
+
+        refresh_similarity_index()
+        self.assertIsNot(get_similarity_index(), index)
+        self.assertEqual(get_similarity_index().categories['solar_panel'].prices[self.panels[700].id], 55000)
+
+    def test_processes_load_the_stored_index(self):
+        call_command('build_similarity_index', stdout=StringIO())
+
+        # Another process: no index of its own, only the shared cache
+        reset_similarity_index()
+        get_cache().l1.clear()
+        with mock.patch('APPS.PRICE_TRACKER.similarity.build_similarity_index') as build:
+            index = get_similarity_index()
+        build.assert_not_called()
+        self.assertEqual(index.similar(self.panels[550].id, limit=1)[0][1], self.panels[560].id)
+
+    def test_compare_aligns_specs_in_request_order(self):
+        ids = [self.panels[700].id, self.panels[400].id]
+        response = self.client.get(f'/price-tracker/compare/?ids={ids[0]},{ids[1]}')
+        self.assertEqual(response.status_code, 200)
+
+        data = response.json()
+        specs = {row['field']: row['values'] for row in data['specs']}
+        self.assertEqual(specs['max_power'], ['700W', '400W'])
+        self.assertNotIn('cell_type', specs)
+
+        best = {row['feature']: row['best'] for row in data['numeric']}
+        self.assertEqual(best['watts'], [0])
+        self.assertEqual(best['price'], [1])
+
+        self.assertEqual(self.client.get('/price-tracker/compare/?ids=999999').status_code, 404)
+        self.assertEqual(self.client.get('/price-tracker/compare/?ids=a').status_code, 400)
+
+
+@override_settings(LIVE_PRICES={'POLL_INTERVAL': 0.01, 'QUEUE_SIZE': 2, 'KEEPALIVE': 5})
+class LivePriceTests(TestCase):
+    def setUp(self):
+        self.panel = Product.objects.create(
+            category='solar_panel', company='SolarTech', model='ST-550W', price=Decimal('60000')
+        )
+        self.inverter = Product.objects.create(
+            category='inverter', company='VoltMax', model='VM-5KW', price=Decimal('90000')
+        )
+
+    def set_price(self, product, price):
+        with self.captureOnCommitCallbacks(execute=True):
+            product.price = Decimal(price)
+            product.save()
+
+    def test_committed_changes_feed_the_stream(self):
+        self.set_price(self.panel, '55000')
+        self.set_price(self.panel, '55000')    # unchanged, not recorded
+
+        self.assertEqual(
+            list(PriceChange.objects.values_list('product_id', 'category', 'old_price', 'price')),
+            [(self.panel.id, 'solar_panel', Decimal('60000'), Decimal('55000'))],
+        )
+
+    async def test_deltas_fan_out_per_category_with_backpressure(self):
+        hub = PriceHub()
+        panels = await hub.subscribe({'solar_panel'})
+        everything = await hub.subscribe()
+
+        hub.broadcast([(1, 'solar_panel', 7, Decimal('52000')), (2, 'inverter', 9, None)])
+        self.assertEqual(panels.queue.qsize(), 1)
+        self.assertEqual(everything.queue.qsize(), 2)
+
+        frame = panels.queue.get_nowait().decode()
+        self.assertIn('event: prices\nid: 2\n', frame)
+        self.assertIn('{"category":"solar_panel","changes":[[7,"52000"]]}', frame)
+
+        # A subscriber that stopped reading is told to resync instead of growing
+        hub.broadcast([(3, 'inverter', 9, Decimal('1'))])
+        self.assertEqual(list(everything.queue._queue), [RESYNC])
+
+        hub.unsubscribe(panels)
+        hub.unsubscribe(everything)
+        await hub.pump_task
+
+    async def test_reconnect_replays_missed_changes(self):
+        await PriceChange.objects.acreate(product=self.panel, category='solar_panel', price=Decimal('58000'))
+        await PriceChange.objects.acreate(product=self.inverter, category='inverter', price=Decimal('85000'))
+
+        response = await self.async_client.get(
+            '/price-tracker/stream/?category=inverter', headers={'Last-Event-ID': '0'}
+        )
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+        frames = response.streaming_content
+        self.assertEqual(await anext(frames), b'retry: 3000\n\n')
+        replayed = (await anext(frames)).decode()
+        self.assertIn(f'[[{self.inverter.id},"85000.00"]]', replayed)
+        self.assertNotIn('solar_panel', replayed)
+
+        # The ASGI server cancels the stream when the client goes away
+        hub = get_price_hub()
+        self.assertEqual(len(hub.subscribers), 1)
+        hub.subscribers.clear()
+        await asyncio.wait_for(hub.pump_task, 1)
+        self.assertIsNone(hub.last_id)
+
+    @override_settings(LIVE_PRICES={'POLL_INTERVAL': 0.01, 'QUEUE_SIZE': 2, 'KEEPALIVE': 5, 'REPLAY_LIMIT': 3})
+    async def test_replay_limit_counts_the_clients_categories(self):
+        # Many panel changes, then the two inverter changes the client missed
+        await PriceChange.objects.abulk_create([
+            PriceChange(product=self.panel, category='solar_panel', price=Decimal(50_000 + i)) for i in range(10)
+        ])
+        await PriceChange.objects.acreate(product=self.inverter, category='inverter', price=Decimal('85000'))
+        await PriceChange.objects.acreate(product=self.inverter, category='inverter', price=Decimal('84000'))
+
+        response = await self.async_client.get(
+            '/price-tracker/stream/?category=inverter', headers={'Last-Event-ID': '0'}
+        )
+        frames = response.streaming_content
+        await anext(frames)
+        replayed = (await anext(frames)).decode()
+        self.assertIn(f'[[{self.inverter.id},"84000.00"]]', replayed)
+
+        everything = await self.async_client.get('/price-tracker/stream/', headers={'Last-Event-ID': '0'})
+        frames = everything.streaming_content
+        await anext(frames)
+        self.assertEqual(await anext(frames), RESYNC)
+
+        hub = get_price_hub()
+        hub.subscribers.clear()
+        await asyncio.wait_for(hub.pump_task, 1)
+
+
+class ProductAdminTests(TestCase):
+    def setUp(self):
+        get_cache().invalidate_tags('catalog')
+        self.products = [
+            Product.objects.create(
+                category='solar_panel', company='SolarTech', model=f'ST-{watts}W', price=Decimal(price)
+            )
+            for watts, price in [(400, '40000'), (450, '45000'), (550, '55000')]
+        ]
+        self.admin = get_user_model().objects.create_superuser(username='admin', email='admin@example.com')
+        self.client.force_login(self.admin)
+
+    def test_bulk_update_keeps_summaries_and_feed(self):
+        panel = self.products[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            changed = update_prices({panel.id: '41000', self.products[1].id: Decimal('45000'), 0: '1'})
+
+        self.assertEqual(changed, 1)
+        summary = CategorySummary.objects.get(category='solar_panel')
+        self.assertEqual(summary.priced_products, 3)
+        self.assertEqual(summary.price_sum, Decimal('141000'))
+        self.assertEqual(
+            list(PriceChange.objects.values_list('product_id', 'old_price', 'price')),
+            [(panel.id, Decimal('40000'), Decimal('41000'))],
+        )
+
+    def test_percent_and_set_price_actions(self):
+        selected = [product.id for product in self.products[:2]]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/admin/PRICE_TRACKER/product/', {
+                'action': 'change_price_by_percent', '_selected_action': selected, 'value': '-10',
+            })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            sorted(Product.objects.filter(id__in=selected).values_list('price', flat=True)),
+            [Decimal('36000'), Decimal('40500')],
+        )
+        self.assertEqual(PriceChange.objects.count(), 2)
+
+        self.client.post('/admin/PRICE_TRACKER/product/', {
+            'action': 'set_price', '_selected_action': selected, 'value': 'cheap',
+        })
+        self.client.post('/admin/PRICE_TRACKER/product/', {
+            'action': 'change_price_by_percent', '_selected_action': selected, 'value': '-95',
+        })
+        self.assertEqual(Product.objects.get(id=selected[0]).price, Decimal('36000'))
+
+        self.client.post('/admin/PRICE_TRACKER/product/', {
+            'action': 'set_price', '_selected_action': selected, 'value': '30000',
+        })
+        self.assertEqual(Product.objects.filter(price=Decimal('30000')).count(), 2)
+        self.assertEqual(CategorySummary.objects.get(category='solar_panel').price_sum, Decimal('115000'))
+
+    def test_percent_action_on_a_price_filtered_changelist(self):
+        # Raised prices stay inside the band the changelist is filtered on
+        panels = [
+            Product(category='inverter', company='Bulk', model=f'INV-{i}', price=Decimal(50_000 + i))
+            for i in range(60)
+        ]
+        Product.objects.bulk_create(panels)
+        selected = list(Product.objects.filter(company='Bulk').values_list('id', flat=True))
+
+        with mock.patch('APPS.PRICE_TRACKER.admin.ACTION_PAGE_SIZE', 7), \
+                self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/admin/PRICE_TRACKER/product/?price_range=50k_100k', {
+                'action': 'change_price_by_percent', '_selected_action': selected, 'value': '10',
+            })
+
+        prices = dict(Product.objects.filter(company='Bulk').values_list('model', 'price'))
+        self.assertEqual(prices, {
+            f'INV-{i}': (Decimal(50_000 + i) * Decimal('1.1')).quantize(Decimal('0.01')) for i in range(60)
+        })
+        self.assertEqual(PriceChange.objects.filter(product__company='Bulk').count(), 60)
+
+    def test_tuned_changelists_render(self):
+        for url in ['/admin/PRICE_TRACKER/product/?price_range=50k_100k&q=ST-5',
+                    '/admin/PRICE_TRACKER/pricechange/', '/admin/PRICE_TRACKER/pricealert/',
+                    '/admin/QUOTATION_GENERATOR/quotation/', '/admin/QUOTATION_GENERATOR/quotationline/',
+                    '/admin/CALCULATOR/powercalculation/', '/admin/CONTACTS/solarprofile/',
+                    '/admin/AI_CHATBOT/message/']:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, url)
+
+        response = self.client.get('/admin/PRICE_TRACKER/product/?price_range=50k_100k')
+        self.assertEqual(response.context['cl'].result_count, 1)
+
+    def test_paginator_estimates_large_tables_and_caps_filtered_counts(self):
+        self.products[1].delete()
+        queryset = Product.objects.order_by('-pk')
+
+        self.assertEqual(EstimatedCountPaginator(queryset, 50).count, 2)
+
+        with mock.patch.object(admin_tools, 'EXACT_COUNT_BELOW', 1):
+            # MAX(id) - MIN(id) + 1 counts the deleted row
+            self.assertEqual(EstimatedCountPaginator(queryset, 50).count, 3)
+
+            with mock.patch.object(admin_tools, 'COUNT_LIMIT', 1):
+                self.assertEqual(EstimatedCountPaginator(queryset.filter(category='solar_panel'), 50).count, 1)
+
+
+class CatalogExportTests(TestCase):
+    def setUp(self):
+        reset_rate_limits()
+        self.products = [
+            Product.objects.create(category=category, company='SolarTech', model=model, price=Decimal(price))
+            for category, model, price in [
+                ('solar_panel', 'ST-550W', '52000'),
+                ('inverter', 'VM-5KW', '90000'),
+                ('solar_panel', 'ST-400W, "bifacial"', '40000'),
+            ]
+        ]
+
+    def export(self, query):
+        response = self.client.get(f'/price-tracker/export/?{query}')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_csv(self):
+        response, body = self.export('format=csv&filter=solar_panel')
+        self.assertTrue(response['Content-Type'].startswith('text/csv'))
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="catalog.csv"')
+
+        rows = list(csv.reader(body.splitlines()))
+        fields = [field.name for field in Product._meta.concrete_fields]
+        self.assertEqual(rows[0], fields)
+        self.assertEqual(
+            [row[fields.index('model')] for row in rows[1:]],
+            ['ST-550W', 'ST-400W, "bifacial"'],
+        )
+
+    def test_jsonl(self):
+        response, body = self.export('format=jsonl')
+        self.assertTrue(response['Content-Type'].startswith('application/x-ndjson'))
+
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([row['id'] for row in rows], [product.pk for product in self.products])
+        self.assertEqual(rows[1]['price'], '90000.00')
+
+    def test_unknown_formats_get_a_json_error(self):
+        response = self.client.get('/price-tracker/export/?format=json')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertIn('detail', response.json())
+
+
+class ShopHandler(BaseHTTPRequestHandler):
+    """
+    Stand-in shop: pages = {path: (html, etag)}, "/old" redirects to "/panel",
+    "/chunked" is sent gzipped in chunks
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.path == '/old':
+            self.send_response(301)
+            self.send_header('Location', '/panel')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        if self.path not in self.server.pages:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        html, etag = self.server.pages[self.path]
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        self.server.bodies += 1
+        body = html.encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('ETag', etag)
+        if self.path == '/chunked':
+            body = gzip.compress(body)
+            self.send_header('Content-Encoding', 'gzip')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            for start in range(0, len(body), 16):
+                chunk = body[start:start + 16]
+                self.wfile.write(b'%x\r\n%s\r\n' % (len(chunk), chunk))
+            self.wfile.write(b'0\r\n\r\n')
+        else:
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+
+class FixedPriceParser(BaseParser):
+    def parse(self, page, product):
+        return Decimal('1000') + product['id']
+
+
+@override_settings(SCRAPER={'PER_HOST': 2, 'BATCH_SIZE': 2})
+class ScraperTests(TestCase):
+    def setUp(self):
+        get_cache().invalidate_tags('catalog')
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), ShopHandler)
+        self.server.daemon_threads = True
+        self.server.connections = self.server.bodies = 0
+        self.server.pages = {
+            '/panel': (
+                '<script type="application/ld+json">'
+                '{"@type": "Product", "offers": {"@type": "Offer", "price": "52000", "priceCurrency": "NGN"}}'
+                '</script>', '"p1"'
+            ),
+            '/inverter': ('<meta property="product:price:amount" content="₦85,000">', '"i1"'),
+            '/chunked': ('<span itemprop="price">120,500.50</span>' + ' ' * 500, '"b1"'),
+        }
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        base = f'http://127.0.0.1:{self.server.server_address[1]}'
+        rows = [
+            ('solar_panel', 'ST-550W', '60000', '/panel'),
+            ('inverter', 'INV-5KW', None, '/inverter'),
+            ('battery', 'BAT-10', '118000', '/chunked'),
+            ('solar_panel', 'ST-550W-B', '52000', '/old'),
+            ('battery', 'BAT-GONE', '90000', '/gone'),
+        ]
+        self.products = [
+            Product.objects.create(category=category, company='Shop', model=model,
+                                   price=price and Decimal(price), website=base + path)
+            for category, model, price, path in rows
+        ]
+        Product.objects.create(category='battery', company='Shop', model='BAT-OFFLINE', price=Decimal('1'))
+
+    def scrape(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return scrape_prices()
+
+    def prices(self):
+        return [Product.objects.get(pk=product.pk).price for product in self.products]
+
+    def test_prices_refresh_and_unchanged_pages_are_skipped(self):
+        report = self.scrape()
+        self.assertEqual(
+            {key: report[key] for key in ('pages', 'changed', 'not_modified', 'failed')},
+            {'pages': 5, 'changed': 3, 'not_modified': 0, 'failed': 1},
+        )
+        self.assertEqual(self.prices(), [
+            Decimal('52000'), Decimal('85000'), Decimal('120500.50'), Decimal('52000'), Decimal('90000')
+        ])
+        self.assertEqual(PriceChange.objects.count(), 3)
+        self.assertEqual(ScrapedPage.objects.get(product=self.products[4]).error, 'HTTP 404')
+        self.assertGreater(report['pages_per_second'], 0)
+
+        # Keep-alive: never more connections than PER_HOST, across batches too
+        self.assertLessEqual(self.server.connections, 2)
+        self.assertEqual(report['connections'], self.server.connections)
+
+        bodies = self.server.bodies
+        report = self.scrape()
+        self.assertEqual((report['not_modified'], report['changed'], report['failed']), (4, 0, 1))
+        self.assertEqual(self.server.bodies, bodies)
+
+        self.server.pages['/panel'] = (self.server.pages['/panel'][0].replace('52000', '50000'), '"p2"')
+        report = self.scrape()
+        self.assertEqual((report['not_modified'], report['changed']), (2, 2))
+        self.assertEqual(self.prices()[0], Decimal('50000'))
+        self.assertEqual(self.prices()[3], Decimal('50000'))
+
+    def test_hosts_get_their_own_parser(self):
+        config = {'PER_HOST': 2, 'PARSERS': {'127.0.0.1': 'APPS.PRICE_TRACKER.tests.FixedPriceParser'}}
+        with self.settings(SCRAPER=config):
+            self.scrape()
+
+        panel = self.products[0]
+        self.assertEqual(Product.objects.get(pk=panel.pk).price, Decimal('1000') + panel.pk)
+
+    def test_update_button_is_for_staff(self):
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create_user(username='shopper'))
+        self.assertEqual(client.post('/price-tracker/update/').status_code, 403)
+
+        client.force_authenticate(get_user_model().objects.create_user(username='staff', is_staff=True))
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.post('/price-tracker/update/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('3 prices changed', response.json()['message'])
+
+    def test_update_button_checks_the_stalest_products(self):
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create_user(username='staff', is_staff=True))
+
+        def press():
+            with self.settings(SCRAPER={'PER_HOST': 2, 'REQUEST_LIMIT': 2}):
+                with self.captureOnCommitCallbacks(execute=True):
+                    return client.post('/price-tracker/update/').json()
+
+        def checked():
+            return set(ScrapedPage.objects.values_list('product_id', flat=True))
+
+        self.assertEqual(press()['pages'], 2)
+        self.assertEqual(checked(), {self.products[0].pk, self.products[1].pk})
+        press()
+        self.assertEqual(len(checked()), 4)
+
+        first_checked = ScrapedPage.objects.get(product=self.products[0]).checked_at
+        press()
+        self.assertEqual(len(checked()), 5)
+        self.assertGreater(ScrapedPage.objects.get(product=self.products[0]).checked_at, first_checked)
+
+    def test_decompressed_pages_are_capped(self):
+        # /chunked is ~80 gzipped bytes of a ~540 byte page
+        with self.settings(SCRAPER={'PER_HOST': 2, 'MAX_BYTES': 300}):
+            self.scrape()
+
+        self.assertIn('larger than 300 bytes', ScrapedPage.objects.get(product=self.products[2]).error)
+        self.assertEqual(self.prices()[2], Decimal('118000'))
+        self.assertEqual(self.prices()[0], Decimal('52000'))
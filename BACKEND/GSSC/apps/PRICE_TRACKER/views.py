@@ -1,11 +1,42 @@
-from rest_framework.generics import ListAPIView
-from rest_framework.permissions import AllowAny
+import csv
+import json
+
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.generics import ListAPIView, ListCreateAPIView, RetrieveUpdateDestroyAPIView
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
+from rest_framework.renderers import JSONRenderer
 from django.db.models import Q
+from django.http import HttpResponse, StreamingHttpResponse
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
-from .models import Product
-from .serializers import ProductSerializer
+from django.views.decorators.http import require_GET
+from GSSC.throttling import TokenBucketThrottle
+from .alerts import fire_if_below
+from .live import get_price_hub
+from .models import PriceAlert, Product
+from .serializers import PriceAlertSerializer, ProductSerializer
 from .pagination import ProductPagination
+from .renderers import CSVRenderer, JSONLinesRenderer
+from .scraper import scrape_prices, scraper_settings, stalest_products
+from .similarity import get_similarity_index, spec_vector
+
+
+def filter_products(queryset, filter_value):
+    """
+    ?filter= matching shared by the list and export endpoints
+    """
+    if filter_value:
+        queryset = queryset.filter(
+            Q(company__icontains=filter_value) |
+            Q(model__icontains=filter_value) |
+            Q(category__icontains=filter_value) |
+            Q(type__icontains=filter_value)
+        )
+
+    return queryset
 
 @method_decorator(csrf_exempt, name='dispatch')
 class PriceTrackerListView(ListAPIView):
@@ -16,21 +47,285 @@ class PriceTrackerListView(ListAPIView):
     serializer_class = ProductSerializer
     pagination_class = ProductPagination
     permission_classes = [AllowAny]
+    throttle_classes = [TokenBucketThrottle]
 
     def get_queryset(self):
-        queryset = Product.objects.all()
+        return filter_products(
+            Product.objects.all(),
+            self.request.query_params.get('filter')
+        )
+
+
+class ExportThrottle(TokenBucketThrottle):
+    """
+    A full catalog dump reads every product, charged well above a page
+    """
+    cost = 'export'
+
+
+class Echo:
+    """
+    File-like object for csv.writer that hands each row back instead of buffering it
+    """
+    def write(self, value):
+        return value
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class PriceTrackerExportView(APIView):
+    """
+    Full catalog dump for partners, streamed in constant memory
+    Frontend: GET /price-tracker/export/?filter=solar&format=csv
+              GET /price-tracker/export/?format=jsonl
+    """
+    permission_classes = [AllowAny]
+    throttle_classes = [ExportThrottle]
+    renderer_classes = [CSVRenderer, JSONLinesRenderer]
+
+    EXPORT_FIELDS = [
+        field.name for field in Product._meta.concrete_fields
+    ]
+    CHUNK_SIZE = 2000
+
+    def handle_exception(self, exc):
+        # Errors are JSON whatever format was asked for, an unknown
+        # ?format=json included (finalize_response reads the request's renderer)
+        response = super().handle_exception(exc)
+        self.request.accepted_renderer = JSONRenderer()
+        self.request.accepted_media_type = JSONRenderer.media_type
+        return response
+
+    def get(self, request, format=None):
+        rows = (
+            filter_products(Product.objects.all(), request.query_params.get('filter'))
+            .order_by('id')
+            .values_list(*self.EXPORT_FIELDS)
+            .iterator(chunk_size=self.CHUNK_SIZE)
+        )
+
+        if request.accepted_renderer.format == 'jsonl':
+            content = self.jsonl_rows(rows)
+        else:
+            content = self.csv_rows(rows)
+
+        response = StreamingHttpResponse(content, content_type=request.accepted_renderer.media_type)
+        response['Content-Disposition'] = (
+            f'attachment; filename="catalog.{request.accepted_renderer.format}"'
+        )
+        return response
+
+    def batched(self, lines):
+        # One write per few hundred rows instead of one per row
+        batch = []
+        for line in lines:
+            batch.append(line)
+            if len(batch) == 500:
+                yield ''.join(batch)
+                batch = []
+        if batch:
+            yield ''.join(batch)
+
+    def csv_rows(self, rows):
+        writer = csv.writer(Echo())
+        yield writer.writerow(self.EXPORT_FIELDS)
+        yield from self.batched(writer.writerow(row) for row in rows)
+
+    def jsonl_rows(self, rows):
+        fields = self.EXPORT_FIELDS
+        yield from self.batched(
+            json.dumps(dict(zip(fields, row)), default=str) + '\n'
+            for row in rows
+        )
+
+class ProductCompareView(APIView):
+    """
+    Side by side spec matrix, one column per product in the requested order
+    Frontend: GET /price-tracker/compare/?ids=12,15,18
+    """
+    permission_classes = [AllowAny]
+    throttle_classes = [TokenBucketThrottle]
+
+    MAX_PRODUCTS = 10
+    SPEC_FIELDS = [
+        'category', 'company', 'model', 'price', 'cell_type', 'glass_thickness',
+        'max_power', 'max_system_voltage', 'operating_temperature', 'efficiency',
+        'type', 'features',
+    ]
+    # Parsed numeric spec -> whether a higher value is better
+    BEST = {'watts': True, 'efficiency': True, 'voltage': True, 'capacity_ah': True, 'price': False}
+
+    def get(self, request):
+        try:
+            ids = [int(value) for value in request.query_params.get('ids', '').split(',') if value]
+        except ValueError:
+            ids = []
+        ids = list(dict.fromkeys(ids))
+
+        if not 1 <= len(ids) <= self.MAX_PRODUCTS:
+            return Response(
+                {"error": f"ids must list 1 to {self.MAX_PRODUCTS} product ids"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-        filter_value = self.request.query_params.get('filter')
+        found = {p['id']: p for p in Product.objects.filter(id__in=ids).values('id', *self.SPEC_FIELDS)}
+        missing = [product_id for product_id in ids if product_id not in found]
+        if missing:
+            return Response(
+                {"error": "Products not found", "ids": missing},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        products = [found[product_id] for product_id in ids]
+        vectors = [spec_vector(product) for product in products]
+
+        specs = [
+            {"field": field, "values": [product[field] for product in products]}
+            for field in self.SPEC_FIELDS
+            if any(product[field] not in (None, '') for product in products)
+        ]
+
+        numeric = []
+        for feature, higher_is_better in self.BEST.items():
+            values = [vector[feature] for vector in vectors]
+            known = [value for value in values if value is not None]
+            if not known:
+                continue
+
+            best = max(known) if higher_is_better else min(known)
+            numeric.append({
+                "feature": feature,
+                "values": values,
+                "best": [index for index, value in enumerate(values) if value == best],
+            })
+
+        return Response({"ids": ids, "specs": specs, "numeric": numeric})
+
+
+class SimilarProductsView(APIView):
+    """
+    Closest products of the same category by normalized specs
+    Frontend: GET /price-tracker/12/similar/?limit=5&cheaper=1
+    """
+    permission_classes = [AllowAny]
+    throttle_classes = [TokenBucketThrottle]
+
+    def get(self, request, pk):
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', 5)), 20))
+        except ValueError:
+            limit = 5
+        cheaper = request.query_params.get('cheaper') in ('1', 'true')
 
-        if filter_value:
-            queryset = queryset.filter(
-                Q(company__icontains=filter_value) |
-                Q(model__icontains=filter_value) |
-                Q(category__icontains=filter_value) |
-                Q(type__icontains=filter_value)
+        index = get_similarity_index()
+        neighbours = index.similar(pk, limit=limit, cheaper=cheaper)
+        if neighbours is None:
+            return Response(
+                {"error": "Product not found"},
+                status=status.HTTP_404_NOT_FOUND
             )
 
-        return queryset
+        products = Product.objects.in_bulk([product_id for _, product_id in neighbours])
+
+        return Response({
+            "product": pk,
+            "results": [
+                {**ProductSerializer(products[product_id]).data, "distance": round(distance, 4)}
+                for distance, product_id in neighbours
+                if product_id in products
+            ],
+        })
+
+
+class PriceAlertListView(ListCreateAPIView):
+    """
+    The user's price-drop alerts
+    Frontend: GET  /price-tracker/alerts/
+              POST /price-tracker/alerts/ {"product": 12, "target_price": "52000"}
+    Posting again for the same product replaces the target and re-arms the alert.
+    """
+    serializer_class = PriceAlertSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return PriceAlert.objects.filter(user=self.request.user).order_by('-created_at')
+
+    def perform_create(self, serializer):
+        alert, _ = PriceAlert.objects.update_or_create(
+            user=self.request.user,
+            product=serializer.validated_data['product'],
+            defaults={
+                'target_price': serializer.validated_data['target_price'],
+                'is_active': True,
+                'triggered_at': None,
+            }
+        )
+        fire_if_below(alert)
+        alert.refresh_from_db()
+        serializer.instance = alert
+
+
+class PriceAlertDetailView(RetrieveUpdateDestroyAPIView):
+    """
+    Frontend: PATCH  /price-tracker/alerts/<id>/ {"target_price": "50000", "is_active": true}
+              DELETE /price-tracker/alerts/<id>/
+    """
+    serializer_class = PriceAlertSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return PriceAlert.objects.filter(user=self.request.user)
+
+    def perform_update(self, serializer):
+        # Saving re-arms the alert unless it is being switched off
+        alert = serializer.save(
+            is_active=serializer.validated_data.get('is_active', True),
+            triggered_at=None,
+        )
+        if fire_if_below(alert):
+            alert.refresh_from_db()
 
+
+@require_GET
+async def price_stream_view(request):
+    """
+    Live price changes as Server-Sent Events, see live.py
+    Frontend: new EventSource('/price-tracker/stream/?category=solar_panel,inverter')
+    """
+    hub = get_price_hub()
+    if hub.full():
+        response = HttpResponse("Too many live price subscribers", status=503)
+        response['Retry-After'] = '30'
+        return response
+
+    categories = {c for c in request.GET.get('category', '').split(',') if c} or None
+    try:
+        last_event_id = int(request.headers.get('Last-Event-ID') or request.GET.get('last_event_id'))
+    except (TypeError, ValueError):
+        last_event_id = None
+
+    response = StreamingHttpResponse(
+        hub.stream(categories, last_event_id),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'     # nginx must not buffer the stream
+    return response
+
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
 def update_prices_view(request):
-    pass
\ No newline at end of file
+    """
+    Frontend: POST /price-tracker/update/ (staff), scrapes the SCRAPER
+    ['REQUEST_LIMIT'] product websites checked longest ago, so the request
+    stays short. Scheduled refreshes of the whole catalog use
+    `manage.py scrape_prices`.
+    """
+    report = scrape_prices(stalest_products(scraper_settings()['REQUEST_LIMIT']))
+    return Response({
+        'message': (
+            f"Checked {report['pages']} pages, {report['changed']} prices changed, "
+            f"{report['not_modified']} unchanged pages, {report['failed']} failed"
+        ),
+        **report,
+    })
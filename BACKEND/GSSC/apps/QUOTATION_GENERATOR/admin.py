@@ -1,7 +1,91 @@
 from django.contrib import admin
-from .models import Quotation
+
+from GSSC.admin_tools import LargeTableAdmin
+
+from .models import (
+    DailySalesSummary,
+    ProductSalesSummary,
+    Quotation,
+    QuotationBatch,
+    QuotationLine,
+    SiteQuotation,
+)
+
+
+class QuotationLineInline(admin.TabularInline):
+    model = QuotationLine
+    fields = ("item_name", "description", "product", "quantity", "unit_price", "line_total")
+    raw_id_fields = ("product",)
+    extra = 0
 
 
 @admin.register(Quotation)
-class QuotationAdmin(admin.ModelAdmin):
-    list_display = ("user", "estimated_total_price", "roi", "updated_at")
+class QuotationAdmin(LargeTableAdmin):
+    list_display = ("id", "user", "estimated_total_price", "roi", "updated_at")
+    list_select_related = ("user",)
+    search_fields = ("=id", "=user__username")
+    list_filter = (("updated_at", admin.DateFieldListFilter),)
+    raw_id_fields = ("user",)
+    readonly_fields = ("created_at", "updated_at")
+    inlines = [QuotationLineInline]
+
+
+@admin.register(QuotationLine)
+class QuotationLineAdmin(LargeTableAdmin):
+    list_display = ("id", "quotation", "item_name", "product", "quantity", "line_total", "quoted_at")
+    list_select_related = ("product",)
+    list_filter = ("item_name",)
+    search_fields = ("=quotation__id", "=product__id")
+    raw_id_fields = ("quotation", "product")
+
+
+@admin.register(DailySalesSummary)
+class DailySalesSummaryAdmin(admin.ModelAdmin):
+    list_display = ("day", "quotations", "quoted_total", "updated_at")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ProductSalesSummary)
+class ProductSalesSummaryAdmin(LargeTableAdmin):
+    list_display = ("product", "lines", "quantity", "revenue", "updated_at")
+    list_select_related = ("product",)
+    ordering = ("-revenue",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+class SiteQuotationInline(admin.TabularInline):
+    model = SiteQuotation
+    fields = ("row", "site", "location", "estimated_total_price", "roi", "error")
+    readonly_fields = fields
+    can_delete = False
+    extra = 0
+    max_num = 0
+
+
+@admin.register(QuotationBatch)
+class QuotationBatchAdmin(LargeTableAdmin):
+    list_display = ("id", "user", "name", "status", "sites", "quoted", "failed",
+                    "estimated_total_price", "created_at")
+    list_select_related = ("user",)
+    list_filter = ("status",)
+    search_fields = ("=id", "=user__username")
+    raw_id_fields = ("user",)
+    inlines = [SiteQuotationInline]
+
+
+@admin.register(SiteQuotation)
+class SiteQuotationAdmin(LargeTableAdmin):
+    list_display = ("id", "batch", "row", "site", "location", "estimated_total_price", "error")
+    list_select_related = ("batch__user",)
+    search_fields = ("=batch__id", "^site")
+    raw_id_fields = ("batch",)
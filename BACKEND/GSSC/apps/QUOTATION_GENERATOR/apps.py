@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class QuotationGeneratorConfig(AppConfig):
     name = 'APPS.QUOTATION_GENERATOR'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,354 @@
+import csv
+import io
+import json
+import logging
+import math
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from APPS.CALCULATOR.battery import battery_spec
+from APPS.CALCULATOR.services import hourly_power_consumption, power_to_panel_calculator
+from APPS.CALCULATOR.strings import MAX_DC_AC_RATIO
+from APPS.PRICE_TRACKER.models import Product
+from APPS.PRICE_TRACKER.similarity import parse_unit
+
+from .models import QuotationBatch, SiteQuotation
+from .services import ITEM_CATEGORIES, calculate_totals, product_description, user_quotation_options
+
+logger = logging.getLogger(__name__)
+
+
+'''
+Bulk quotations: one CSV of sites in, one QuotationBatch of SiteQuotations out.
+
+CSV columns (header required, unknown columns ignored):
+
+    site           name of the site
+    location       free text, carried through to the summary
+    monthly_kwh    monthly consumption, or
+    appliances     the calculator's appliance JSON {"fan": {"power_watts": ...}}
+    backup_hours   optional, default 0
+    panel_watt     optional, preferred panel wattage
+
+Each site is sized with the calculator services, the cheapest fitting
+catalog panel / inverter / battery is picked and the rows are priced from
+user_quotation_options() and calculate_totals(), exactly like the quotation
+page, so the uploader's price lists apply.
+
+The catalog is loaded once per batch, so pricing a chunk needs no database
+and each priced chunk is written in one bulk_create. Pricing is pure Python
+and runs in the request's thread: a thread pool would only take turns on
+the GIL. A bad row becomes a failed site with its error, never a failed
+batch.
+'''
+
+COLUMNS = ("site", "location", "monthly_kwh", "appliances", "backup_hours", "panel_watt")
+
+SUN_HOURS = 8    # as in power_to_panel_calculator
+
+SUMMARY_FIELDS = [
+    "row", "site", "location", "daily_kwh", "panel", "panels", "inverter", "inverters",
+    "battery", "batteries", "estimated_total_price", "roi", "error",
+]
+
+
+class BulkQuotationError(ValueError):
+    pass
+
+
+def bulk_settings() -> dict:
+    config = {
+        "CHUNK_SIZE": 25,
+        "MAX_SITES": 2000,
+    }
+    config.update(getattr(settings, "BULK_QUOTATIONS", {}))
+    return config
+
+
+def read_sites(content) -> list:
+    """
+    [(row number, {column: value}), ...] from CSV text or bytes
+    """
+    if isinstance(content, bytes):
+        content = content.decode("utf-8-sig")
+
+    reader = csv.DictReader(io.StringIO(content))
+    header = {(name or "").strip().lower() for name in reader.fieldnames or []}
+    if not header & {"monthly_kwh", "appliances"}:
+        raise BulkQuotationError("The CSV needs a monthly_kwh or an appliances column")
+
+    sites = []
+    for record in reader:
+        values = {(name or "").strip().lower(): (value or "").strip() for name, value in record.items()
+                  if isinstance(value, str)}
+        if any(values.values()):
+            sites.append((reader.line_num, {column: values.get(column, "") for column in COLUMNS}))
+
+    if not sites:
+        raise BulkQuotationError("The CSV has no sites")
+    if len(sites) > bulk_settings()["MAX_SITES"]:
+        raise BulkQuotationError(f"At most {bulk_settings()['MAX_SITES']} sites per upload")
+
+    return sites
+
+
+#=============================================================
+# CATALOG SNAPSHOT
+#=============================================================
+
+def catalog_snapshot(user=None) -> dict:
+    """
+    Priced panels, inverters and batteries plus the fixed rows, read once per batch
+    """
+    options = user_quotation_options(user)
+    snapshot = {"panels": [], "inverters": [], "batteries": [], "options": options}
+
+    categories = {category: name for name, category in ITEM_CATEGORIES.items()}
+    products = Product.objects.filter(category__in=categories).only(
+        "id", "category", "company", "model", "max_power", "type", "description", "features", "price"
+    )
+
+    for product in products:
+        name = categories[product.category]
+        description = product_description(product)
+        price = options.get(name, {}).get("unitPrices", {}).get(description)
+        if not price:
+            continue
+
+        entry = {"id": product.id, "name": name, "description": description, "price": price}
+        watts = parse_unit(product.max_power, "w") or parse_unit(product.model, "w")
+
+        if product.category == "solar_panel" and watts:
+            snapshot["panels"].append({**entry, "watts": watts})
+        elif product.category == "inverter" and watts:
+            snapshot["inverters"].append({**entry, "kw": watts / 1000})
+        elif product.category == "battery":
+            spec = battery_spec({
+                "model": product.model, "type": product.type,
+                "description": product.description, "features": product.features,
+            })
+            if spec:
+                snapshot["batteries"].append({**entry, "usable_kwh": spec["kwh"] * spec["dod"]})
+
+    return snapshot
+
+
+#=============================================================
+# SIZING AND PRICING (no database access)
+#=============================================================
+
+def number(value, name: str, default=None) -> float:
+    if value in (None, ""):
+        if default is None:
+            raise BulkQuotationError(f"{name} is required")
+        return default
+    try:
+        value = float(value)
+    except ValueError:
+        raise BulkQuotationError(f"{name} must be a number") from None
+    if value < 0 or not math.isfinite(value) or value > 1e9:
+        raise BulkQuotationError(f"{name} must be a positive number")
+    return value
+
+
+def appliance_load(appliances) -> dict:
+    """
+    The calculator's appliance JSON with every value a finite, non-negative number
+    """
+    if not isinstance(appliances, dict) or not all(isinstance(specs, dict) for specs in appliances.values()):
+        raise BulkQuotationError("appliances must be the calculator's appliance JSON")
+
+    for name, specs in appliances.items():
+        for field in ("power_watts", "quantity", "hours_per_day"):
+            value = specs.get(field, 0)
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise BulkQuotationError(f"appliances: {field} of {name} must be a number")
+            if not math.isfinite(value) or value < 0 or value > 1e9:
+                raise BulkQuotationError(f"appliances: {field} of {name} must be a positive number")
+        if "power_watts" not in specs or "quantity" not in specs:
+            raise BulkQuotationError(f"appliances: {name} needs power_watts and quantity")
+
+    return appliances
+
+
+def site_appliances(values: dict, backup_hours: float) -> dict:
+    """
+    The site's load as calculator appliances, a monthly figure becomes one
+    constant load over the sun and backup hours
+    """
+    if values["appliances"]:
+        try:
+            appliances = json.loads(values["appliances"])
+        except ValueError:
+            raise BulkQuotationError("appliances must be the calculator's appliance JSON") from None
+        return appliance_load(appliances)
+
+    monthly_kwh = number(values["monthly_kwh"], "monthly_kwh")
+    hours = SUN_HOURS + backup_hours
+    return {
+        "monthly_load": {
+            "power_watts": round(monthly_kwh * 1000 / 30 / hours, 1),
+            "quantity": 1,
+            "hours_per_day": hours,
+        }
+    }
+
+
+def cheapest(products: list, needed: float, size: str) -> tuple:
+    """
+    (product, quantity) covering needed at the lowest total price
+    """
+    return min(
+        ((product, max(1, math.ceil(needed / product[size]))) for product in products),
+        key=lambda choice: (choice[0]["price"] * choice[1], choice[1]),
+    )
+
+
+def item_row(product: dict, quantity: int) -> dict:
+    return {
+        "name": product["name"],
+        "enabled": True,
+        "description": product["description"],
+        "quantity": quantity,
+        "unitPrice": product["price"],
+        "totalPrice": round(product["price"] * quantity, 2),
+    }
+
+
+def quote_site(values: dict, catalog: dict) -> dict:
+    """
+    Sizing, chosen products and priced rows of one site
+    """
+    backup_hours = number(values["backup_hours"], "backup_hours", 0.0)
+    appliances = site_appliances(values, backup_hours)
+    panel_watt = number(values["panel_watt"], "panel_watt", 0.0)
+
+    if not catalog["panels"] or not catalog["inverters"]:
+        raise BulkQuotationError("The catalog has no priced panels or inverters")
+
+    # The requested wattage when the catalog has it, else the cheapest per watt
+    panels = [p for p in catalog["panels"] if p["watts"] == panel_watt] or catalog["panels"]
+    panel = min(panels, key=lambda p: p["price"] / p["watts"])
+
+    sizing = power_to_panel_calculator(appliances, int(panel["watts"]), backup_hours)["system_requirements"]
+    panel_count = sizing["solar_panel_quantity"]
+    if panel_count <= 0:
+        raise BulkQuotationError("The site has no load")
+
+    dc_kw = panel_count * panel["watts"] / 1000
+    inverter, inverters = cheapest(
+        catalog["inverters"], max(sizing["max_inverter_capacity_kw"], dc_kw / MAX_DC_AC_RATIO), "kw"
+    )
+
+    items = [item_row(panel, panel_count), item_row(inverter, inverters)]
+    system = {
+        "daily_kwh": sizing["total_daily_power_kwh"],
+        "inverter_kw": sizing["max_inverter_capacity_kw"],
+        "panel": panel["id"], "panels": panel_count,
+        "inverter": inverter["id"], "inverters": inverters,
+        "battery": None, "batteries": 0,
+    }
+
+    backup_kwh = hourly_power_consumption(appliances) * backup_hours / 1000
+    if backup_kwh and catalog["batteries"]:
+        battery, batteries = cheapest(catalog["batteries"], backup_kwh, "usable_kwh")
+        items.append(item_row(battery, batteries))
+        system.update(battery=battery["id"], batteries=batteries, backup_kwh=round(backup_kwh, 2))
+
+    # Fixed rows as the quotation page shows them, one of each
+    for name, option in catalog["options"].items():
+        if name not in ITEM_CATEGORIES:
+            description = option["descriptions"][0]
+            items.append(item_row({"name": name, "description": description,
+                              "price": option["unitPrices"][description]}, 1))
+
+    totals = calculate_totals(items)
+    return {
+        "system": system,
+        "items": items,
+        "roi": totals["roi"],
+        "estimated_total_price": totals["estimated_total_price"],
+    }
+
+
+def quote_chunk(batch_id: int, chunk: list, catalog: dict) -> list:
+    """
+    Unsaved SiteQuotations of one chunk of sites
+    """
+    quotations = []
+    for line, values in chunk:
+        quotation = SiteQuotation(
+            batch_id=batch_id, row=line, site=values["site"][:255], location=values["location"][:255]
+        )
+        try:
+            for field, value in quote_site(values, catalog).items():
+                setattr(quotation, field, value)
+        except BulkQuotationError as error:
+            quotation.error = str(error)[:255]
+        except Exception:
+            # Whatever the sizing chokes on stays this site's problem
+            logger.exception("Bulk quotation %s: row %s could not be quoted", batch_id, line)
+            quotation.error = "The site could not be quoted"
+        quotations.append(quotation)
+
+    return quotations
+
+
+#=============================================================
+# BATCH
+#=============================================================
+
+def create_batch(user, sites: list, name: str = "") -> QuotationBatch:
+    """
+    Prices the sites chunk by chunk and stores the batch
+    """
+    config = bulk_settings()
+    catalog = catalog_snapshot(user)
+    batch = QuotationBatch.objects.create(user=user, name=name[:255], sites=len(sites))
+
+    chunks = [sites[start:start + config["CHUNK_SIZE"]] for start in range(0, len(sites), config["CHUNK_SIZE"])]
+
+    try:
+        for chunk in chunks:
+            quotations = quote_chunk(batch.pk, chunk, catalog)
+            quoted = [q for q in quotations if not q.error]
+
+            with transaction.atomic():
+                SiteQuotation.objects.bulk_create(quotations)
+                QuotationBatch.objects.filter(pk=batch.pk).update(
+                    quoted=F("quoted") + len(quoted),
+                    failed=F("failed") + len(quotations) - len(quoted),
+                    estimated_total_price=F("estimated_total_price")
+                    + sum((q.estimated_total_price for q in quoted), Decimal("0")),
+                )
+    except Exception:
+        QuotationBatch.objects.filter(pk=batch.pk).update(status="failed", finished_at=timezone.now())
+        raise
+
+    QuotationBatch.objects.filter(pk=batch.pk).update(status="done", finished_at=timezone.now())
+    batch.refresh_from_db()
+    return batch
+
+
+def summary_rows(batch: QuotationBatch):
+    """
+    One summary row per site in CSV order, then the batch total
+    """
+    for site in batch.site_quotations.all().iterator(chunk_size=500):
+        system = site.system or {}
+        products = {item["name"]: item["description"] for item in site.items}
+
+        yield [
+            site.row, site.site, site.location, system.get("daily_kwh"),
+            products.get("Panel"), system.get("panels"),
+            products.get("Inverter"), system.get("inverters"),
+            products.get("Battery"), system.get("batteries"),
+            site.estimated_total_price, site.roi, site.error,
+        ]
+
+    yield ["total", f"{batch.quoted} quoted", f"{batch.failed} failed", "", "", "", "", "", "", "",
+           batch.estimated_total_price, "", ""]
@@ -0,0 +1,157 @@
+import functools
+import hashlib
+import itertools
+import json
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+from .models import IdempotencyKey
+
+
+'''
+Idempotency-Key support for the quotation POSTs.
+
+A client sends the same `Idempotency-Key: <uuid>` header on every retry of
+one action (double click, timeout, flaky network). The first request with a
+key claims it with a single INSERT ... ON CONFLICT DO NOTHING, runs and
+stores its response. Requests repeating the key then:
+
+    - get the stored response again, with `Idempotent-Replayed: true`,
+      without running the view
+    - get 409 + Retry-After while the first one is still running
+    - get 422 when the key was used for a different request (method,
+      path or parsed body differ, uploads compare by their SHA-256)
+
+Keys belong to the authenticated user and live for TTL seconds. A 5xx or
+an exception releases the key, so the retry really runs again. A claim
+without a response after LEASE seconds belongs to a request whose worker
+died, the next request with the key takes it over. Requests without the
+header behave as before.
+'''
+
+HEADER = "Idempotency-Key"
+
+_claimed = itertools.count()
+
+# Claims between two prunes of expired keys, per process
+PRUNE_EVERY = 100
+
+
+def idempotency_settings() -> dict:
+    config = {
+        "TTL": 24 * 60 * 60,
+        "LEASE": 5 * 60,
+        "RETRY_AFTER": 1,
+    }
+    config.update(getattr(settings, "IDEMPOTENCY_KEYS", {}))
+    return config
+
+
+def fingerprint_value(value):
+    if isinstance(value, UploadedFile):
+        # Hashed chunk by chunk, a large upload stays in its temporary file
+        digest = hashlib.sha256()
+        for chunk in value.chunks():
+            digest.update(chunk)
+        value.seek(0)
+        return f"{value.name}:{digest.hexdigest()}"
+    return value
+
+
+def request_fingerprint(request) -> str:
+    """
+    Method, path and the parsed data, never request.body: DRF has already
+    streamed a multipart body into request.data
+    """
+    data = request.data
+    if hasattr(data, "lists"):
+        data = {key: [fingerprint_value(value) for value in values] for key, values in data.lists()}
+
+    digest = hashlib.sha256(f"{request.method} {request.path}\n".encode())
+    digest.update(json.dumps(data, sort_keys=True, cls=JSONEncoder).encode())
+    return digest.hexdigest()
+
+
+def claim(user, key: str, fingerprint: str) -> tuple:
+    """
+    (record, owned): owned when this request claimed the key and has to run
+    """
+    config = idempotency_settings()
+    now = timezone.now()
+    expired = now - timedelta(seconds=config["TTL"])
+    abandoned = now - timedelta(seconds=config["LEASE"])
+
+    if next(_claimed) % PRUNE_EVERY == 0:
+        IdempotencyKey.objects.filter(created_at__lt=expired).delete()
+
+    for _ in range(2):
+        token = uuid.uuid4().hex
+        IdempotencyKey.objects.bulk_create(
+            [IdempotencyKey(user=user, key=key, fingerprint=fingerprint, token=token)],
+            ignore_conflicts=True,
+        )
+        record = IdempotencyKey.objects.get(user=user, key=key)
+        if record.token == token:
+            return record, True
+
+        running = record.status_code is None
+        if record.created_at >= (abandoned if running else expired):
+            return record, False
+
+        # An expired key, or a claim whose request never finished, is free again
+        IdempotencyKey.objects.filter(pk=record.pk, token=record.token).delete()
+
+    return record, False
+
+
+def idempotent(post):
+    """
+    Decorator for the post() of an APIView, see the module docstring
+    """
+    @functools.wraps(post)
+    def wrapper(view, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return post(view, request, *args, **kwargs)
+        if len(key) > 255:
+            return Response({"error": f"{HEADER} is longer than 255 characters"},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        fingerprint = request_fingerprint(request)
+        record, owned = claim(request.user, key, fingerprint)
+
+        if not owned:
+            if record.fingerprint != fingerprint:
+                return Response({"error": f"{HEADER} was already used for a different request"},
+                                status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+            if record.status_code is None:
+                return Response({"error": "A request with this key is still in progress"},
+                                status=status.HTTP_409_CONFLICT,
+                                headers={"Retry-After": str(idempotency_settings()["RETRY_AFTER"])})
+            return Response(record.response, status=record.status_code,
+                            headers={"Idempotent-Replayed": "true"})
+
+        try:
+            response = post(view, request, *args, **kwargs)
+        except BaseException:
+            IdempotencyKey.objects.filter(pk=record.pk).delete()
+            raise
+
+        if response.status_code >= 500:
+            IdempotencyKey.objects.filter(pk=record.pk).delete()
+        else:
+            # Stored as the JSON renderer would write it, a replay renders the same bytes
+            IdempotencyKey.objects.filter(pk=record.pk).update(
+                status_code=response.status_code,
+                response=json.loads(json.dumps(response.data, cls=JSONEncoder)),
+            )
+        return response
+
+    return wrapper
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from APPS.PRICE_TRACKER.models import CategorySummary
+from APPS.QUOTATION_GENERATOR.models import DailySalesSummary, ProductSalesSummary
+from APPS.QUOTATION_GENERATOR.summaries import rebuild_all_summaries
+
+
+class Command(BaseCommand):
+    help = "Rebuild the sales and catalog summary tables from quotations and products"
+
+    def handle(self, *args, **kwargs):
+        rebuild_all_summaries()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {DailySalesSummary.objects.count()} daily, "
+            f"{ProductSalesSummary.objects.count()} product and "
+            f"{CategorySummary.objects.count()} category summaries"
+        ))
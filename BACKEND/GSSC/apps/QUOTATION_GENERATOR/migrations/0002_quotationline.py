@@ -0,0 +1,32 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('PRICE_TRACKER', '0001_initial'),
+        ('QUOTATION_GENERATOR', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuotationLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('item_name', models.CharField(max_length=100)),
+                ('description', models.CharField(blank=True, max_length=255)),
+                ('quantity', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('unit_price', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('line_total', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('quoted_at', models.DateTimeField()),
+                ('product', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='quotation_lines', to='PRICE_TRACKER.product')),
+                ('quotation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lines', to='QUOTATION_GENERATOR.quotation')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['product', 'quoted_at'], name='QUOTATION_G_product_8661c9_idx'), models.Index(fields=['item_name', 'quoted_at'], name='QUOTATION_G_item_na_76c774_idx')],
+            },
+        ),
+    ]
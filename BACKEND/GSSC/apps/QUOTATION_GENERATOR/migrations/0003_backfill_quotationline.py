@@ -0,0 +1,79 @@
+from decimal import Decimal, InvalidOperation
+
+from django.db import migrations
+
+# Frozen copy of services.build_quotation_lines so later changes to the
+# service do not change what this migration writes
+ITEM_CATEGORIES = {
+    "Panel": "solar_panel",
+    "Inverter": "inverter",
+    "Battery": "battery",
+}
+
+
+def to_decimal(value, max_digits):
+    try:
+        number = Decimal(str(value if value is not None else "0"))
+    except (InvalidOperation, ValueError):
+        return Decimal("0")
+
+    if not number.is_finite() or abs(number) >= Decimal(10) ** (max_digits - 2):
+        return Decimal("0")
+    return number.quantize(Decimal("0.01"))
+
+
+def backfill_lines(apps, schema_editor):
+    Product = apps.get_model("PRICE_TRACKER", "Product")
+    Quotation = apps.get_model("QUOTATION_GENERATOR", "Quotation")
+    QuotationLine = apps.get_model("QUOTATION_GENERATOR", "QuotationLine")
+
+    names = {category: name for name, category in ITEM_CATEGORIES.items()}
+    lookup = {}
+    for p in Product.objects.filter(category__in=names).iterator():
+        if p.category == "solar_panel":
+            description = f"{p.company} {p.model} ({p.max_power})"
+        else:
+            description = f"{p.company} {p.model}"
+        lookup[f"{names[p.category]}|{description}"] = p.id
+
+    lines = []
+    for quotation in Quotation.objects.iterator(chunk_size=500):
+        for item in quotation.items or []:
+            if not isinstance(item, dict) or not item.get("enabled"):
+                continue
+
+            name = str(item.get("name") or "")[:100]
+            description = str(item.get("description") or "")[:255]
+
+            lines.append(QuotationLine(
+                quotation_id=quotation.id,
+                product_id=lookup.get(f"{name}|{description}"),
+                item_name=name,
+                description=description,
+                quantity=to_decimal(item.get("quantity"), 10),
+                unit_price=to_decimal(item.get("unitPrice"), 12),
+                line_total=to_decimal(item.get("totalPrice"), 14),
+                quoted_at=quotation.updated_at,
+            ))
+
+        if len(lines) >= 1000:
+            QuotationLine.objects.bulk_create(lines)
+            lines = []
+
+    QuotationLine.objects.bulk_create(lines)
+
+
+def remove_lines(apps, schema_editor):
+    apps.get_model("QUOTATION_GENERATOR", "QuotationLine").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('PRICE_TRACKER', '0001_initial'),
+        ('QUOTATION_GENERATOR', '0002_quotationline'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_lines, remove_lines),
+    ]
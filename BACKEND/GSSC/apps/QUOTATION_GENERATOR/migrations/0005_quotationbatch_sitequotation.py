@@ -0,0 +1,53 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:24
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('QUOTATION_GENERATOR', '0004_dailysalessummary_productsalessummary'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuotationBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(blank=True, max_length=255)),
+                ('status', models.CharField(choices=[('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='running', max_length=10)),
+                ('sites', models.IntegerField(default=0)),
+                ('quoted', models.IntegerField(default=0)),
+                ('failed', models.IntegerField(default=0)),
+                ('estimated_total_price', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='quotation_batches', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SiteQuotation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('row', models.IntegerField()),
+                ('site', models.CharField(blank=True, max_length=255)),
+                ('location', models.CharField(blank=True, max_length=255)),
+                ('system', models.JSONField(default=dict)),
+                ('items', models.JSONField(default=list)),
+                ('roi', models.DecimalField(blank=True, decimal_places=2, max_digits=6, null=True)),
+                ('estimated_total_price', models.DecimalField(blank=True, decimal_places=2, max_digits=14, null=True)),
+                ('error', models.CharField(blank=True, max_length=255)),
+                ('batch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='site_quotations', to='QUOTATION_GENERATOR.quotationbatch')),
+            ],
+            options={
+                'ordering': ['batch', 'row'],
+                'constraints': [models.UniqueConstraint(fields=('batch', 'row'), name='unique_site_row_per_batch')],
+            },
+        ),
+    ]
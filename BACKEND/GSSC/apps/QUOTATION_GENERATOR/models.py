@@ -28,3 +28,172 @@ class Quotation(models.Model):
 
     def __str__(self):
         return f"Quotation for {self.user}"
+
+
+class QuotationLine(models.Model):
+    """
+    One enabled row of Quotation.items, written alongside the JSON so
+    analytics can GROUP BY product / item in SQL
+    """
+    quotation = models.ForeignKey(
+        Quotation,
+        on_delete=models.CASCADE,
+        related_name="lines"
+    )
+    product = models.ForeignKey(
+        "PRICE_TRACKER.Product",
+        on_delete=models.SET_NULL,
+        related_name="quotation_lines",
+        null=True,
+        blank=True
+    )
+
+    item_name = models.CharField(max_length=100)     # "Panel", "DB Box", ...
+    description = models.CharField(max_length=255, blank=True)
+    quantity = models.DecimalField(max_digits=10, decimal_places=2)
+    unit_price = models.DecimalField(max_digits=12, decimal_places=2)
+    line_total = models.DecimalField(max_digits=14, decimal_places=2)
+
+    # Copied from the quotation on every save so date filters stay on this table
+    quoted_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["product", "quoted_at"]),
+            models.Index(fields=["item_name", "quoted_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.item_name} x {self.quantity} ({self.quotation_id})"
+
+
+class DailySalesSummary(models.Model):
+    """
+    Quotations per day of their last save, maintained on every save
+    """
+    day = models.DateField(unique=True)
+    quotations = models.IntegerField(default=0)
+    quoted_total = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-day']
+
+    def __str__(self):
+        return f"{self.day}: {self.quotations} quotations"
+
+
+class ProductSalesSummary(models.Model):
+    """
+    How often each catalog product is quoted, summed over QuotationLine
+    """
+    product = models.OneToOneField(
+        "PRICE_TRACKER.Product",
+        on_delete=models.CASCADE,
+        related_name="sales_summary"
+    )
+    lines = models.IntegerField(default=0)
+    quantity = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    revenue = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-revenue"]),
+        ]
+
+    def __str__(self):
+        return f"Sales of product {self.product_id}"
+
+
+class QuotationBatch(models.Model):
+    """
+    One bulk upload of sites, each priced into a SiteQuotation.
+    Separate from Quotation, which holds one quotation per user.
+    """
+    STATUS_CHOICES = [
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="quotation_batches"
+    )
+    name = models.CharField(max_length=255, blank=True)   # uploaded file name
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='running')
+
+    sites = models.IntegerField(default=0)
+    quoted = models.IntegerField(default=0)
+    failed = models.IntegerField(default=0)
+    estimated_total_price = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Batch {self.pk} of {self.user} ({self.sites} sites)"
+
+
+class SiteQuotation(models.Model):
+    """
+    Sizing, chosen products and priced rows of one site in a batch
+    """
+    batch = models.ForeignKey(
+        QuotationBatch,
+        on_delete=models.CASCADE,
+        related_name="site_quotations"
+    )
+    row = models.IntegerField()      # line of the site in the uploaded CSV
+    site = models.CharField(max_length=255, blank=True)
+    location = models.CharField(max_length=255, blank=True)
+
+    system = models.JSONField(default=dict)   # sizing results and chosen products
+    items = models.JSONField(default=list)    # same rows as Quotation.items
+    roi = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True)
+    estimated_total_price = models.DecimalField(max_digits=14, decimal_places=2, null=True, blank=True)
+    error = models.CharField(max_length=255, blank=True)
+
+    class Meta:
+        ordering = ['batch', 'row']
+        constraints = [
+            models.UniqueConstraint(fields=["batch", "row"], name="unique_site_row_per_batch"),
+        ]
+
+    def __str__(self):
+        return f"{self.site or f'Row {self.row}'} in batch {self.batch_id}"
+
+
+class IdempotencyKey(models.Model):
+    """
+    Idempotency-Key of a quotation POST and the response replayed to its
+    retries, see idempotency.py
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="idempotency_keys"
+    )
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)   # sha256 of method, path and body
+    token = models.CharField(max_length=32)         # request that claimed the key
+
+    status_code = models.IntegerField(null=True, blank=True)   # null while that request runs
+    response = models.JSONField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "key"], name="unique_idempotency_key_per_user"),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}: {self.key} ({self.status_code or 'running'})"
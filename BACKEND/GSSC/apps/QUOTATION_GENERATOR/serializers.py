@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Quotation
+from .models import Quotation, QuotationBatch, SiteQuotation
 
 
 class QuotationSerializer(serializers.ModelSerializer):
@@ -13,3 +13,34 @@ class QuotationSerializer(serializers.ModelSerializer):
             "created_at",
             "updated_at",
         ]
+
+
+class SiteQuotationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SiteQuotation
+        fields = [
+            "row",
+            "site",
+            "location",
+            "system",
+            "items",
+            "roi",
+            "estimated_total_price",
+            "error",
+        ]
+
+
+class QuotationBatchSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = QuotationBatch
+        fields = [
+            "id",
+            "name",
+            "status",
+            "sites",
+            "quoted",
+            "failed",
+            "estimated_total_price",
+            "created_at",
+            "finished_at",
+        ]
@@ -1,20 +1,282 @@
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
 
+from django.contrib.auth import get_user_model
+from django.db import transaction
 
-def calculate_totals(items):
+from GSSC.cache import cached
+from APPS.PRICE_TRACKER.models import Product
+from APPS.PRICE_TRACKER.pricelists import price_map
+
+from .models import Quotation, QuotationLine
+from .summaries import record_sales_change, sales_state
+
+# Quotation row name -> Product.category
+ITEM_CATEGORIES = {
+    "Panel": "solar_panel",
+    "Inverter": "inverter",
+    "Battery": "battery",
+}
+
+
+def product_description(product):
+    """
+    Label shown in the quotation table, also used to map rows back to products
     """
-    Calculates total price and dummy ROI
+    if product.category == "solar_panel":
+        return f"{product.company} {product.model} ({product.max_power})"
+    return f"{product.company} {product.model}"
+
+
+def calculate_totals(items, prices=None):
+    """
+    Calculates total price and dummy ROI.
+    prices = unit_price_map(user): rows it knows are repriced with the
+    user's price, the others keep the prices sent by the client.
     """
     total_price = Decimal("0.00")
+    priced = []
 
     for item in items:
+        # Rows come straight from the client, anything but an object is dropped
+        if not isinstance(item, dict):
+            continue
+
+        key = f"{item.get('name')}|{item.get('description')}"
+        if prices and key in prices:
+            unit_price = Decimal(str(prices[key]))
+            item = {
+                **item,
+                "unitPrice": prices[key],
+                "totalPrice": float((unit_price * to_decimal(item.get("quantity"))).quantize(Decimal("0.01"))),
+            }
+        priced.append(item)
+
         if item.get("enabled"):
-            total_price += Decimal(str(item.get("totalPrice", 0)))
+            total_price += to_decimal(item.get("totalPrice"), max_digits=14)
 
     # Dummy ROI logic (replace with real solar math later)
     roi = Decimal("15.00") if total_price > 0 else Decimal("0.00")
 
     return {
         "estimated_total_price": total_price,
-        "roi": roi
+        "roi": roi,
+        "items": priced,
+    }
+
+
+@cached(ttl=600, tags=("catalog",))
+def quotation_options():
+    """
+    Description + unit prices for every quotation row.
+    Cached until the catalog changes.
+    """
+    data = {}
+
+    # ---- Solar Panels ----
+    panels = Product.objects.filter(category="solar_panel")
+    data["Panel"] = {
+        "descriptions": [
+            product_description(p)
+            for p in panels
+        ],
+        "unitPrices": {
+            product_description(p): float(p.price or 0)
+            for p in panels
+        },
+    }
+
+    # ---- Inverters ----
+    inverters = Product.objects.filter(category="inverter")
+    data["Inverter"] = {
+        "descriptions": [
+            product_description(i)
+            for i in inverters
+        ],
+        "unitPrices": {
+            product_description(i): float(i.price or 0)
+            for i in inverters
+        },
+    }
+
+    # ---- Batteries ----
+    batteries = Product.objects.filter(category="battery")
+    data["Battery"] = {
+        "descriptions": [
+            product_description(b)
+            for b in batteries
+        ],
+        "unitPrices": {
+            product_description(b): float(b.price or 0)
+            for b in batteries
+        },
+    }
+
+    # ---- Fixed items ----
+    fixed_items = [
+        "Panel Mount Structure",
+        "DB Box",
+        "Tin Coated Cable",
+        "AC Cable",
+        "Installation Accessories",
+        "AC/DC Earthing Bore",
+        "Net Metering Green Meter",
+    ]
+
+    for item in fixed_items:
+        data[item] = {
+            "descriptions": ["Standard"],
+            "unitPrices": {"Standard": 0},
+        }
+
+    return data
+
+
+@cached(ttl=600, tags=("catalog",))
+def product_lookup():
+    """
+    {"<row name>|<description>": product_id} for every catalog product
+    """
+    names = {category: name for name, category in ITEM_CATEGORIES.items()}
+
+    return {
+        f"{names[p.category]}|{product_description(p)}": p.id
+        for p in Product.objects.only("id", "category", "company", "model", "max_power")
+        if p.category in names
+    }
+
+
+@cached(ttl=600, tags=("catalog",))
+def product_rows():
+    """
+    {product_id: "<row name>|<description>"}, the inverse of product_lookup()
+    """
+    return {product_id: key for key, product_id in product_lookup().items()}
+
+
+def unit_price_map(user) -> dict:
+    """
+    {"<row name>|<description>": unit price} of every product the user's
+    price lists override, dict lookups for calculate_totals()
+    """
+    rows = product_rows()
+    return {
+        rows[product_id]: float(price)
+        for product_id, price in price_map(user).items()
+        if product_id in rows
     }
+
+
+def user_quotation_options(user):
+    """
+    quotation_options() with the user's price list prices in unitPrices
+    """
+    options = quotation_options()
+    prices = unit_price_map(user)
+    if not prices:
+        return options
+
+    # The cached options are shared, copy the rows that change
+    options = dict(options)
+    copied = set()
+    for key, price in prices.items():
+        name, description = key.split("|", 1)
+        if name not in options:
+            continue
+        if name not in copied:
+            options[name] = {**options[name], "unitPrices": dict(options[name]["unitPrices"])}
+            copied.add(name)
+        options[name]["unitPrices"][description] = price
+
+    return options
+
+
+def to_decimal(value, default="0", max_digits=12):
+    """
+    value with 2 decimal places, default unless it is a finite number that
+    fits a DecimalField of max_digits
+    """
+    try:
+        number = Decimal(str(value if value is not None else default))
+    except (InvalidOperation, ValueError):
+        return Decimal(default)
+
+    if not number.is_finite() or abs(number) >= Decimal(10) ** (max_digits - 2):
+        return Decimal(default)
+    return number.quantize(Decimal("0.01"))
+
+
+def build_quotation_lines(quotation, items):
+    """
+    QuotationLine objects (unsaved) for the enabled rows of items
+    """
+    lookup = product_lookup()
+    lines = []
+
+    for item in items:
+        if not isinstance(item, dict) or not item.get("enabled"):
+            continue
+
+        name = str(item.get("name") or "")[:100]
+        description = str(item.get("description") or "")[:255]
+
+        lines.append(QuotationLine(
+            quotation=quotation,
+            product_id=lookup.get(f"{name}|{description}"),
+            item_name=name,
+            description=description,
+            quantity=to_decimal(item.get("quantity"), max_digits=10),
+            unit_price=to_decimal(item.get("unitPrice"), max_digits=12),
+            line_total=to_decimal(item.get("totalPrice"), max_digits=14),
+            quoted_at=quotation.updated_at,
+        ))
+
+    return lines
+
+
+def sync_quotation_lines(quotation, items):
+    """
+    Replaces the quotation's lines with the current items
+    """
+    with transaction.atomic():
+        QuotationLine.objects.filter(quotation=quotation).delete()
+        QuotationLine.objects.bulk_create(build_quotation_lines(quotation, items))
+
+
+def save_quotation(user, items):
+    """
+    Saves the user's quotation, its lines and the sales summaries in one transaction.
+
+    The quotation row is written with one INSERT ... ON CONFLICT (user) DO
+    UPDATE, so concurrent first saves of a user never hit the unique
+    constraint, and its RETURNING gives the id back. The upsert can't tell
+    what it replaced, so the user row is locked and the old quotation read
+    first: that serializes the saves of one user, including the first, and
+    each one subtracts exactly the summary contribution of the quotation
+    it replaces.
+    """
+    results = calculate_totals(items, unit_price_map(user))
+    items = results["items"]
+
+    quotation = Quotation(
+        user=user,
+        items=items,
+        roi=results["roi"],
+        # As the column stores it, the summaries add what the next save subtracts
+        estimated_total_price=results["estimated_total_price"].quantize(Decimal("0.01")),
+    )
+
+    with transaction.atomic():
+        list(get_user_model().objects.select_for_update().filter(pk=user.pk).values_list("pk", flat=True))
+        old_state = sales_state(Quotation.objects.filter(user=user).first())
+
+        Quotation.objects.bulk_create(
+            [quotation],
+            update_conflicts=True,
+            unique_fields=["user"],
+            update_fields=["items", "roi", "estimated_total_price", "updated_at"],
+        )
+
+        sync_quotation_lines(quotation, items)
+        record_sales_change(old_state, sales_state(quotation))
+
+    return quotation
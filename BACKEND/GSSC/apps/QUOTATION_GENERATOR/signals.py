@@ -0,0 +1,14 @@
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+
+from .models import Quotation
+from .summaries import record_sales_change, sales_state
+
+
+# Saves go through services.save_quotation, which updates the summaries itself.
+# Deletes (admin, user deletion cascade) are handled here, before the lines
+# are gone.
+
+@receiver(pre_delete, sender=Quotation)
+def quotation_deleting(sender, instance, **kwargs):
+    record_sales_change(sales_state(instance), None)
@@ -0,0 +1,108 @@
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from APPS.PRICE_TRACKER.summaries import increment, rebuild_category_summaries
+
+from .models import DailySalesSummary, ProductSalesSummary, Quotation, QuotationLine
+
+
+'''
+Sales summaries are updated with deltas: every quotation change subtracts
+the quotation's previous contribution and adds the new one, so dashboard
+reads touch a handful of summary rows no matter how many quotations exist.
+
+`manage.py rebuild_summaries` recomputes everything from the source tables
+if the running totals ever drift (bulk imports, manual SQL, ...).
+'''
+
+
+def sales_state(quotation):
+    """
+    What one quotation contributes to the summaries, None if there is no quotation
+    """
+    if quotation is None:
+        return None
+
+    products = (
+        QuotationLine.objects.filter(quotation=quotation, product__isnull=False)
+        .values("product_id")
+        .annotate(lines=Count("id"), quantity=Sum("quantity"), revenue=Sum("line_total"))
+        .order_by()
+    )
+
+    return {
+        "day": timezone.localdate(quotation.updated_at),
+        "total": quotation.estimated_total_price or Decimal("0"),
+        "products": {
+            row["product_id"]: (row["lines"], row["quantity"], row["revenue"])
+            for row in products
+        },
+    }
+
+
+def record_sales_change(old, new):
+    for state, sign in ((old, -1), (new, 1)):
+        if state is None:
+            continue
+
+        increment(
+            DailySalesSummary,
+            {"day": state["day"]},
+            quotations=sign,
+            quoted_total=sign * state["total"],
+        )
+
+        for product_id, (lines, quantity, revenue) in state["products"].items():
+            increment(
+                ProductSalesSummary,
+                {"product_id": product_id},
+                lines=sign * lines,
+                quantity=sign * quantity,
+                revenue=sign * revenue,
+            )
+
+
+def rebuild_sales_summaries():
+    days = (
+        Quotation.objects.annotate(day=TruncDate("updated_at"))
+        .values("day")
+        .annotate(quotations=Count("id"), quoted_total=Sum("estimated_total_price"))
+        .order_by()
+    )
+    products = (
+        QuotationLine.objects.filter(product__isnull=False)
+        .values("product_id")
+        .annotate(lines=Count("id"), quantity=Sum("quantity"), revenue=Sum("line_total"))
+        .order_by()
+    )
+
+    with transaction.atomic():
+        DailySalesSummary.objects.all().delete()
+        DailySalesSummary.objects.bulk_create(
+            DailySalesSummary(
+                day=row["day"],
+                quotations=row["quotations"],
+                quoted_total=row["quoted_total"] or 0,
+            )
+            for row in days
+        )
+
+        ProductSalesSummary.objects.all().delete()
+        ProductSalesSummary.objects.bulk_create(
+            ProductSalesSummary(
+                product_id=row["product_id"],
+                lines=row["lines"],
+                quantity=row["quantity"],
+                revenue=row["revenue"],
+            )
+            for row in products
+        )
+
+
+def rebuild_all_summaries():
+    rebuild_category_summaries()
+    rebuild_sales_summaries()
@@ -1,3 +1,594 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import threading
+from datetime import timedelta
+from importlib import import_module
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.apps import apps as django_apps
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connections
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from GSSC.cache import get_cache
+from APPS.PRICE_TRACKER.models import (
+    CategorySummary,
+    Distributor,
+    DistributorCustomer,
+    PriceList,
+    PriceListItem,
+    Product,
+)
+from APPS.PRICE_TRACKER.pricelists import price_map
+
+from . import services
+from .models import (
+    DailySalesSummary,
+    IdempotencyKey,
+    ProductSalesSummary,
+    Quotation,
+    QuotationBatch,
+    QuotationLine,
+    SiteQuotation,
+)
+from .services import product_description, save_quotation
+from .summaries import rebuild_all_summaries
+
+
+class SummaryTests(TestCase):
+    def setUp(self):
+        get_cache().invalidate_tags("catalog")
+
+        self.panel = Product.objects.create(
+            category="solar_panel", company="SolarTech", model="ST-550W",
+            max_power="550W", price=Decimal("50000"),
+        )
+        self.inverter = Product.objects.create(
+            category="inverter", company="PowerCo", model="PC-5K", price=Decimal("200000"),
+        )
+        self.user = get_user_model().objects.create_user(
+            username="buyer", email="buyer@example.com", password="secret-pass-123"
+        )
+
+    def items(self, panels):
+        return [
+            {
+                "name": "Panel",
+                "enabled": True,
+                "description": product_description(self.panel),
+                "quantity": panels,
+                "unitPrice": 50000,
+                "totalPrice": panels * 50000,
+            },
+            {
+                "name": "Inverter",
+                "enabled": True,
+                "description": product_description(self.inverter),
+                "quantity": 1,
+                "unitPrice": 200000,
+                "totalPrice": 200000,
+            },
+        ]
+
+    def snapshot(self):
+        return (
+            list(DailySalesSummary.objects.values_list("day", "quotations", "quoted_total")),
+            sorted(ProductSalesSummary.objects.values_list("product_id", "lines", "quantity", "revenue")),
+            sorted(
+                CategorySummary.objects.filter(products__gt=0)
+                .values_list("category", "products", "priced_products", "price_sum")
+            ),
+        )
+
+    def test_saves_update_the_running_totals(self):
+        first = save_quotation(self.user, self.items(10))
+        second = save_quotation(self.user, self.items(12))
+        self.assertEqual((first.pk, second.pk), (Quotation.objects.get().pk,) * 2)
+
+        day = DailySalesSummary.objects.get()
+        self.assertEqual(day.quotations, 1)
+        self.assertEqual(day.quoted_total, Decimal("800000"))
+        self.assertEqual(self.panel.sales_summary.quantity, Decimal("12"))
+        self.assertEqual(self.panel.sales_summary.revenue, Decimal("600000"))
+
+        panels = CategorySummary.objects.get(category="solar_panel")
+        self.assertEqual(panels.products, 1)
+        self.assertEqual(panels.average_price, Decimal("50000"))
+
+    def test_running_totals_match_a_rebuild(self):
+        save_quotation(self.user, self.items(10))
+        self.panel.price = Decimal("48000")
+        self.panel.save()
+        self.inverter.delete()
+        Quotation.objects.get(user=self.user).delete()
+
+        incremental = self.snapshot()
+        rebuild_all_summaries()
+
+        self.assertEqual(incremental[2], self.snapshot()[2])
+        self.assertEqual(DailySalesSummary.objects.filter(quotations__gt=0).count(), 0)
+        self.assertEqual(ProductSalesSummary.objects.filter(lines__gt=0).count(), 0)
+        self.assertTrue(all(row[1] == 0 for row in incremental[0]))
+
+
+class QuotationLineTests(TestCase):
+    def setUp(self):
+        get_cache().invalidate_tags("catalog", "pricelists")
+
+        self.panel = Product.objects.create(
+            category="solar_panel", company="SolarTech", model="ST-550W",
+            max_power="550W", price=Decimal("50000"),
+        )
+        self.inverter = Product.objects.create(
+            category="inverter", company="PowerCo", model="PC-5K", price=Decimal("200000"),
+        )
+        self.buyers = [
+            get_user_model().objects.create_user(username=f"buyer{number}", password=None)
+            for number in range(2)
+        ]
+        self.staff = APIClient()
+        self.staff.force_authenticate(
+            get_user_model().objects.create_user(username="staff", password=None, is_staff=True)
+        )
+
+    def items(self, panels, inverter=True):
+        items = quotation_items(self.panel, panels)
+        if inverter:
+            items.append({"name": "Inverter", "enabled": True, "description": product_description(self.inverter),
+                          "quantity": 1, "unitPrice": 200000, "totalPrice": 200000})
+        return items
+
+    def test_rows_that_are_not_numbers_or_objects_are_dropped(self):
+        items = [
+            "Panel", 5, None,
+            {"name": "Panel", "enabled": True, "description": product_description(self.panel),
+             "quantity": "nan", "unitPrice": "1e400", "totalPrice": "inf"},
+            {"name": "Cable", "enabled": True, "quantity": "-Infinity", "unitPrice": 99999999999,
+             "totalPrice": "12.345"},
+        ]
+        quotation = save_quotation(self.buyers[0], items)
+
+        self.assertEqual(len(quotation.items), 2)
+        self.assertEqual(quotation.estimated_total_price, Decimal("12.34"))
+        self.assertEqual(
+            sorted(QuotationLine.objects.values_list("item_name", "quantity", "unit_price", "line_total")),
+            [("Cable", 0, 0, Decimal("12.34")), ("Panel", 0, 0, 0)],
+        )
+
+        client = APIClient()
+        client.force_authenticate(self.buyers[1])
+        response = client.post("/quotation/save/", {"items": ["bad", {"enabled": True}]}, format="json")
+        self.assertEqual(response.status_code, 200)
+
+    def test_top_quoted_products(self):
+        save_quotation(self.buyers[0], self.items(10))
+        save_quotation(self.buyers[1], self.items(4, inverter=False))
+
+        response = self.staff.get("/quotation/analytics/products/?since=2000-01-01")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(row["model"], row["quotations"], Decimal(str(row["quantity"]))) for row in response.json()],
+            [("ST-550W", 2, Decimal("14")), ("PC-5K", 1, Decimal("1"))],
+        )
+
+        inverters = self.staff.get("/quotation/analytics/products/?since=2000-01-01&category=inverter&limit=x")
+        self.assertEqual([row["model"] for row in inverters.json()], ["PC-5K"])
+
+        later = self.staff.get("/quotation/analytics/products/?since=2999-01-01")
+        self.assertEqual(later.json(), [])
+
+        client = APIClient()
+        client.force_authenticate(self.buyers[0])
+        self.assertEqual(client.get("/quotation/analytics/products/").status_code, 403)
+
+    def test_item_spend(self):
+        save_quotation(self.buyers[0], self.items(10))
+        save_quotation(self.buyers[1], self.items(4))
+
+        rows = self.staff.get("/quotation/analytics/items/?since=2000-01-01").json()
+        self.assertEqual(set(rows), {"Panel", "DB Box", "Inverter"})
+        self.assertEqual(rows["Panel"]["lines"], 2)
+        self.assertEqual(Decimal(str(rows["Panel"]["total"])), Decimal("700000"))
+        self.assertEqual(Decimal(str(rows["Panel"]["averageLineTotal"])), Decimal("350000"))
+
+    def test_backfill_migration_writes_lines_of_existing_quotations(self):
+        backfill = import_module("APPS.QUOTATION_GENERATOR.migrations.0003_backfill_quotationline")
+        quotations = [
+            Quotation.objects.create(user=self.buyers[0], items=self.items(10), estimated_total_price=0),
+            Quotation.objects.create(user=self.buyers[1], items=[
+                "junk", {"name": "Off", "enabled": False},
+                {"name": "Cable", "enabled": True, "quantity": "nan", "totalPrice": "1e400"},
+            ]),
+        ]
+
+        backfill.backfill_lines(django_apps, None)
+
+        lines = QuotationLine.objects.filter(quotation=quotations[0])
+        self.assertEqual(
+            sorted((line.item_name, line.product_id, line.quantity) for line in lines),
+            [("DB Box", None, 1), ("Inverter", self.inverter.id, 1), ("Panel", self.panel.id, 10)],
+        )
+        self.assertTrue(all(line.quoted_at == quotations[0].updated_at for line in lines))
+        self.assertEqual(
+            list(QuotationLine.objects.filter(quotation=quotations[1]).values_list("item_name", "quantity", "line_total")),
+            [("Cable", 0, 0)],
+        )
+
+        backfill.remove_lines(django_apps, None)
+        self.assertFalse(QuotationLine.objects.exists())
+
+
+@override_settings(BULK_QUOTATIONS={"CHUNK_SIZE": 1})
+class BulkQuotationTests(TestCase):
+    def setUp(self):
+        get_cache().invalidate_tags("catalog")
+
+        Product.objects.create(
+            category="solar_panel", company="SolarTech", model="ST-550W",
+            max_power="550W", price=Decimal("50000"),
+        )
+        Product.objects.create(
+            category="solar_panel", company="SolarTech", model="ST-400W",
+            max_power="400W", price=Decimal("45000"),
+        )
+        for model, price in (("VM-5KW", "200000"), ("VM-10KW", "300000")):
+            Product.objects.create(category="inverter", company="VoltMax", model=model, price=Decimal(price))
+        Product.objects.create(
+            category="battery", company="PowerCell", model="PC-100Ah", type="Lithium-ion",
+            price=Decimal("80000"),
+        )
+
+        self.user = get_user_model().objects.create_user(username="installer", password=None)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def upload(self):
+        appliances = json.dumps({"ac": {"power_watts": 1000, "quantity": 2, "hours_per_day": 6}})
+        rows = io.StringIO()
+        writer = csv.writer(rows)
+        writer.writerow(["site", "location", "monthly_kwh", "appliances", "backup_hours"])
+        writer.writerow(["Warehouse", "Lahore", "600", "", ""])
+        writer.writerow(["Office", "Karachi", "", appliances, "4"])
+        writer.writerow(["Depot", "Multan", "many", "", ""])
+
+        return self.client.post("/quotation/bulk/", {"csv": rows.getvalue(), "name": "sites.csv"}, format="json")
+
+    def test_sites_are_sized_and_priced(self):
+        response = self.upload()
+        self.assertEqual(response.status_code, 201)
+
+        data = response.json()
+        self.assertEqual((data["status"], data["sites"], data["quoted"], data["failed"]), ("done", 3, 2, 1))
+
+        detail = self.client.get(f"/quotation/bulk/{data['id']}/").json()
+        sites = {site["site"]: site for site in detail["siteQuotations"]}
+
+        # 600 kWh / 30 days over 8 sun hours = 2.5 kW, 2.5 kW x 1.3 / 550 W -> 6 panels
+        warehouse = sites["Warehouse"]
+        self.assertEqual(warehouse["system"]["panels"], 6)
+        self.assertEqual(warehouse["system"]["inverters"], 1)
+        self.assertEqual(Decimal(warehouse["estimated_total_price"]), Decimal("500000"))
+
+        # 2 kW for 4 backup hours = 8 kWh, 100 Ah x 12.8 V x 0.9 usable per battery -> 7
+        office = sites["Office"]
+        self.assertEqual(office["system"]["batteries"], 7)
+        self.assertIn("Battery", [item["name"] for item in office["items"]])
+
+        self.assertEqual(sites["Depot"]["error"], "monthly_kwh must be a number")
+        self.assertEqual(
+            Decimal(data["estimated_total_price"]),
+            Decimal(warehouse["estimated_total_price"]) + Decimal(office["estimated_total_price"]),
+        )
+
+        # The single-quotation flow is untouched
+        self.assertFalse(Quotation.objects.exists())
+
+    def test_summary_download(self):
+        batch_id = self.upload().json()["id"]
+
+        response = self.client.get(f"/quotation/bulk/{batch_id}/summary/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("attachment", response["Content-Disposition"])
+
+        rows = list(csv.reader(io.StringIO(response.content.decode())))
+        self.assertEqual(rows[0][:3], ["row", "site", "location"])
+        self.assertEqual([row[1] for row in rows[1:4]], ["Warehouse", "Office", "Depot"])
+        self.assertEqual(rows[-1][0], "total")
+
+        other = get_user_model().objects.create_user(username="other", password=None)
+        client = APIClient()
+        client.force_authenticate(other)
+        self.assertEqual(client.get(f"/quotation/bulk/{batch_id}/summary/").status_code, 404)
+
+    def test_bad_appliance_values_fail_only_their_site(self):
+        rows = io.StringIO()
+        writer = csv.writer(rows)
+        writer.writerow(["site", "appliances"])
+        for site, power in (("NaN", "NaN"), ("Huge", "1e308"), ("Negative", "-500"), ("Text", '"500"')):
+            writer.writerow([site, '{"ac": {"power_watts": %s, "quantity": 1}}' % power])
+        writer.writerow(["Fine", '{"ac": {"power_watts": 1000, "quantity": 1}}'])
+
+        response = self.client.post("/quotation/bulk/", {"csv": rows.getvalue()}, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.json()["quoted"], response.json()["failed"]), (1, 4))
+
+        errors = dict(SiteQuotation.objects.values_list("site", "error"))
+        self.assertEqual(errors["NaN"], "appliances: power_watts of ac must be a positive number")
+        self.assertEqual(errors["Negative"], "appliances: power_watts of ac must be a positive number")
+        self.assertEqual(errors["Text"], "appliances: power_watts of ac must be a number")
+        self.assertEqual(errors["Fine"], "")
+
+    def test_unexpected_errors_become_site_errors(self):
+        with mock.patch("APPS.QUOTATION_GENERATOR.bulk.power_to_panel_calculator", side_effect=OverflowError):
+            with self.assertLogs("APPS.QUOTATION_GENERATOR.bulk", "ERROR"):
+                data = self.upload().json()
+
+        self.assertEqual((data["status"], data["quoted"], data["failed"]), ("done", 0, 3))
+        self.assertEqual(
+            SiteQuotation.objects.get(site="Warehouse").error, "The site could not be quoted",
+        )
+
+    def test_invalid_uploads_are_rejected(self):
+        response = self.client.post("/quotation/bulk/", {"csv": "site,location\nA,B\n"}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(QuotationBatch.objects.exists())
+
+
+class PriceListTests(TestCase):
+    def setUp(self):
+        get_cache().invalidate_tags("catalog", "pricelists")
+
+        self.panel = Product.objects.create(
+            category="solar_panel", company="SolarTech", model="ST-550W",
+            max_power="550W", price=Decimal("50000"),
+        )
+        self.inverter = Product.objects.create(
+            category="inverter", company="PowerCo", model="PC-5K", price=Decimal("200000"),
+        )
+        self.battery = Product.objects.create(
+            category="battery", company="PowerCell", model="PC-100Ah", price=Decimal("80000"),
+        )
+
+        users = get_user_model().objects
+        self.installer = users.create_user(username="installer", password=None)
+        self.vip = users.create_user(username="vip", password=None)
+        self.walk_in = users.create_user(username="walk-in", password=None)
+
+        self.distributor = Distributor.objects.create(name="Lahore Solar Supply", region="Punjab")
+        for user in (self.installer, self.vip):
+            DistributorCustomer.objects.create(user=user, distributor=self.distributor)
+
+        self.set_prices(PriceList.objects.create(name="List prices"), panel="48000", inverter="195000")
+        self.set_prices(PriceList.objects.create(name="Punjab", distributor=self.distributor), panel="46000")
+        self.set_prices(PriceList.objects.create(name="VIP", user=self.vip), panel="45000", battery="75000")
+
+    def set_prices(self, price_list, **prices):
+        for name, price in prices.items():
+            PriceListItem.objects.create(price_list=price_list, product=getattr(self, name), price=Decimal(price))
+
+    def test_layers_resolve_customer_over_distributor_over_global(self):
+        self.assertEqual(price_map(self.walk_in), {
+            self.panel.id: Decimal("48000"), self.inverter.id: Decimal("195000"),
+        })
+        self.assertEqual(price_map(self.installer), {
+            self.panel.id: Decimal("46000"), self.inverter.id: Decimal("195000"),
+        })
+        self.assertEqual(price_map(self.vip), {
+            self.panel.id: Decimal("45000"), self.inverter.id: Decimal("195000"), self.battery.id: Decimal("75000"),
+        })
+
+        # Cached until a list changes
+        with self.assertNumQueries(0):
+            price_map(self.vip)
+        PriceList.objects.filter(user=self.vip).get().items.filter(product=self.panel).delete()
+        self.assertEqual(price_map(self.vip)[self.panel.id], Decimal("46000"))
+
+    def test_options_and_totals_use_the_users_prices(self):
+        client = APIClient()
+        client.force_authenticate(self.vip)
+
+        options = client.get("/quotation/options/").json()
+        panel = product_description(self.panel)
+        self.assertEqual(options["Panel"]["unitPrices"][panel], 45000.0)
+        self.assertEqual(options["Inverter"]["unitPrices"][product_description(self.inverter)], 195000.0)
+
+        # Other users still see their own prices, the shared options are untouched
+        client.force_authenticate(self.walk_in)
+        self.assertEqual(client.get("/quotation/options/").json()["Panel"]["unitPrices"][panel], 48000.0)
+
+        items = [
+            {"name": "Panel", "enabled": True, "description": panel, "quantity": 10,
+             "unitPrice": 50000, "totalPrice": 500000},
+            {"name": "DB Box", "enabled": True, "description": "Standard", "quantity": 1,
+             "unitPrice": 1500, "totalPrice": 1500},
+        ]
+        response = client.post("/quotation/calculate/", {"items": items}, format="json")
+        self.assertEqual(Decimal(str(response.json()["estimatedTotalPrice"])), Decimal("481500"))
+
+        quotation = save_quotation(self.vip, items)
+        self.assertEqual(quotation.estimated_total_price, Decimal("451500"))
+        self.assertEqual(quotation.items[0]["unitPrice"], 45000.0)
+
+
+def quotation_items(panel, panels):
+    return [
+        {"name": "Panel", "enabled": True, "description": product_description(panel),
+         "quantity": panels, "unitPrice": 50000, "totalPrice": panels * 50000},
+        {"name": "DB Box", "enabled": True, "description": "Standard",
+         "quantity": 1, "unitPrice": 1500, "totalPrice": 1500},
+    ]
+
+
+class IdempotencyTests(TestCase):
+    def setUp(self):
+        get_cache().invalidate_tags("catalog", "pricelists")
+
+        self.panel = Product.objects.create(
+            category="solar_panel", company="SolarTech", model="ST-550W",
+            max_power="550W", price=Decimal("50000"),
+        )
+        self.user = get_user_model().objects.create_user(username="installer", password=None)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def save(self, panels, key):
+        return self.client.post(
+            "/quotation/save/", {"items": quotation_items(self.panel, panels)}, format="json",
+            headers={"Idempotency-Key": key} if key else {},
+        )
+
+    def spy(self, side_effect=None):
+        spy = mock.patch(
+            "APPS.QUOTATION_GENERATOR.views.save_quotation",
+            side_effect=side_effect or services.save_quotation,
+        ).start()
+        self.addCleanup(mock.patch.stopall)
+        return spy
+
+    def test_retries_replay_the_stored_response(self):
+        spy = self.spy()
+
+        first = self.save(10, "key-1")
+        again = self.save(10, "key-1")
+        self.assertEqual(spy.call_count, 1)
+        self.assertEqual(again.status_code, 200)
+        self.assertEqual(again.json(), first.json())
+        self.assertEqual(again["Idempotent-Replayed"], "true")
+
+        self.assertEqual(self.save(12, "key-1").status_code, 422)
+        self.save(12, None)
+        self.save(12, None)
+        self.assertEqual(spy.call_count, 3)
+
+        # Keys are per user
+        other = get_user_model().objects.create_user(username="other", password=None)
+        self.client.force_authenticate(other)
+        self.assertEqual(self.save(10, "key-1").status_code, 200)
+        self.assertEqual(spy.call_count, 4)
+
+    def test_a_retry_during_the_first_request_gets_409(self):
+        retries = []
+
+        def save_with_double_click(user, items):
+            retries.append(self.save(10, "key-2"))
+            return services.save_quotation(user, items)
+
+        self.spy(save_with_double_click)
+        self.assertEqual(self.save(10, "key-2").status_code, 200)
+
+        self.assertEqual(retries[0].status_code, 409)
+        self.assertEqual(retries[0]["Retry-After"], "1")
+
+    def test_a_failed_request_releases_its_key(self):
+        spy = self.spy([RuntimeError("database went away"), None])
+
+        with self.assertRaises(RuntimeError):
+            self.save(10, "key-3")
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+        self.assertEqual(self.save(10, "key-3").status_code, 200)
+        self.assertEqual(spy.call_count, 2)
+
+    def test_a_claim_past_its_lease_is_taken_over(self):
+        spy = self.spy()
+        self.save(10, "key-4")
+        # As if the worker had died before storing its response
+        IdempotencyKey.objects.update(status_code=None, response=None)
+        self.assertEqual(self.save(10, "key-4").status_code, 409)
+
+        IdempotencyKey.objects.update(created_at=timezone.now() - timedelta(minutes=6))
+        self.assertEqual(self.save(10, "key-4").status_code, 200)
+        self.assertEqual(spy.call_count, 2)
+        self.assertEqual(IdempotencyKey.objects.get().status_code, 200)
+
+    def test_uploads_are_compared_by_their_content(self):
+        def upload(content):
+            return self.client.post(
+                "/quotation/bulk/", {"file": SimpleUploadedFile("sites.csv", content)},
+                format="multipart", headers={"Idempotency-Key": "upload"},
+            )
+
+        first = upload(b"site,location\nA,B\n")
+        self.assertEqual(first.status_code, 400)
+        again = upload(b"site,location\nA,B\n")
+        self.assertEqual(again["Idempotent-Replayed"], "true")
+        self.assertEqual(again.json(), first.json())
+
+        self.assertEqual(upload(b"site,location\nA,C\n").status_code, 422)
+
+
+class ConcurrentSaveTests(TransactionTestCase):
+    THREADS = 8
+    SAVES = 5
+
+    def setUp(self):
+        get_cache().invalidate_tags("catalog", "pricelists")
+
+        self.panel = Product.objects.create(
+            category="solar_panel", company="SolarTech", model="ST-550W",
+            max_power="550W", price=Decimal("50000"),
+        )
+        self.user = get_user_model().objects.create_user(username="installer", password=None)
+
+    def hammer(self, work):
+        errors = []
+        start = threading.Barrier(self.THREADS)
+
+        def run(number):
+            try:
+                start.wait()
+                work(number)
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=run, args=(number,)) for number in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return errors
+
+    def test_concurrent_saves_leave_one_quotation_and_exact_totals(self):
+        def work(number):
+            for save in range(self.SAVES):
+                save_quotation(self.user, quotation_items(self.panel, number * self.SAVES + save + 1))
+
+        self.assertEqual(self.hammer(work), [])
+
+        quotation = Quotation.objects.get()
+        self.assertEqual(QuotationLine.objects.count(), 2)
+
+        day = DailySalesSummary.objects.get()
+        self.assertEqual(day.quotations, 1)
+        self.assertEqual(day.quoted_total, quotation.estimated_total_price)
+        self.assertEqual(
+            self.panel.sales_summary.revenue, quotation.estimated_total_price - Decimal("1500")
+        )
+
+    def test_a_key_sent_from_many_threads_saves_once(self):
+        responses = []
+        spy = mock.patch(
+            "APPS.QUOTATION_GENERATOR.views.save_quotation", side_effect=services.save_quotation
+        ).start()
+        self.addCleanup(mock.patch.stopall)
+
+        def work(number):
+            client = APIClient()
+            client.force_authenticate(self.user)
+            responses.append(client.post(
+                "/quotation/save/", {"items": quotation_items(self.panel, 10)}, format="json",
+                headers={"Idempotency-Key": "double-click"},
+            ).status_code)
+
+        self.assertEqual(self.hammer(work), [])
+        self.assertEqual(spy.call_count, 1)
+        self.assertEqual(len(responses), self.THREADS)
+        self.assertTrue(set(responses) <= {200, 409})
+        self.assertEqual(IdempotencyKey.objects.get().status_code, 200)
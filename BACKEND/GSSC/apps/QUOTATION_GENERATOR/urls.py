@@ -5,6 +5,12 @@ from .views import (
     SaveQuotationView,
     RequestOldQuotationView,
     EmailQuotationView,
+    TopQuotedProductsView,
+    ItemSpendView,
+    SalesSummaryView,
+    BulkQuotationView,
+    QuotationBatchView,
+    QuotationBatchSummaryView,
 )
 
 urlpatterns = [
@@ -13,4 +19,10 @@ urlpatterns = [
     path("save/", SaveQuotationView.as_view()),
     path("old/", RequestOldQuotationView.as_view()),
     path("email/", EmailQuotationView.as_view()),
+    path("analytics/products/", TopQuotedProductsView.as_view()),
+    path("analytics/items/", ItemSpendView.as_view()),
+    path("analytics/summary/", SalesSummaryView.as_view()),
+    path("bulk/", BulkQuotationView.as_view()),
+    path("bulk/<int:pk>/", QuotationBatchView.as_view()),
+    path("bulk/<int:pk>/summary/", QuotationBatchSummaryView.as_view()),
 ]
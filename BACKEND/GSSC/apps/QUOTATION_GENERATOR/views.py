@@ -1,91 +1,52 @@
+import csv
+from datetime import datetime, time, timedelta
+
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework import status
+from django.db.models import Avg, Count, Sum
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 
-from .models import Quotation
-from .serializers import QuotationSerializer
-from .services import calculate_totals
+from APPS.PRICE_TRACKER.models import CategorySummary
 
-from APPS.PRICE_TRACKER.models import Product
+from .bulk import SUMMARY_FIELDS, BulkQuotationError, create_batch, read_sites, summary_rows
+from .idempotency import idempotent
+from .models import DailySalesSummary, ProductSalesSummary, Quotation, QuotationBatch, QuotationLine
+from .serializers import QuotationBatchSerializer, QuotationSerializer, SiteQuotationSerializer
+from .services import (
+    calculate_totals,
+    save_quotation,
+    unit_price_map,
+    user_quotation_options,
+)
 
 
 class QuotationOptionsView(APIView):
     """
     GET:
-    Returns description + unit prices for quotation table
+    Returns description + unit prices for quotation table,
+    with the prices of the user's price lists
     """
 
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        data = {}
-
-        # ---- Solar Panels ----
-        panels = Product.objects.filter(category="solar_panel")
-        data["Panel"] = {
-            "descriptions": [
-                f"{p.company} {p.model} ({p.max_power})"
-                for p in panels
-            ],
-            "unitPrices": {
-                f"{p.company} {p.model} ({p.max_power})": float(p.price or 0)
-                for p in panels
-            },
-        }
-
-        # ---- Inverters ----
-        inverters = Product.objects.filter(category="inverter")
-        data["Inverter"] = {
-            "descriptions": [
-                f"{i.company} {i.model}"
-                for i in inverters
-            ],
-            "unitPrices": {
-                f"{i.company} {i.model}": float(i.price or 0)
-                for i in inverters
-            },
-        }
-
-        # ---- Batteries ----
-        batteries = Product.objects.filter(category="battery")
-        data["Battery"] = {
-            "descriptions": [
-                f"{b.company} {b.model}"
-                for b in batteries
-            ],
-            "unitPrices": {
-                f"{b.company} {b.model}": float(b.price or 0)
-                for b in batteries
-            },
-        }
-
-        # ---- Fixed items ----
-        fixed_items = [
-            "Panel Mount Structure",
-            "DB Box",
-            "Tin Coated Cable",
-            "AC Cable",
-            "Installation Accessories",
-            "AC/DC Earthing Bore",
-            "Net Metering Green Meter",
-        ]
-
-        for item in fixed_items:
-            data[item] = {
-                "descriptions": ["Standard"],
-                "unitPrices": {"Standard": 0},
-            }
+        data = user_quotation_options(request.user)
 
         return Response(data, status=status.HTTP_200_OK)
 
 class CalculateQuotationView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @idempotent
     def post(self, request):
         items = request.data.get("items", [])
 
-        results = calculate_totals(items)
+        results = calculate_totals(items, unit_price_map(request.user))
 
         return Response({
             "roi": results["roi"],
@@ -95,19 +56,11 @@ class CalculateQuotationView(APIView):
 class SaveQuotationView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @idempotent
     def post(self, request):
         items = request.data.get("items", [])
 
-        results = calculate_totals(items)
-
-        quotation, _ = Quotation.objects.update_or_create(
-            user=request.user,
-            defaults={
-                "items": items,
-                "roi": results["roi"],
-                "estimated_total_price": results["estimated_total_price"],
-            }
-        )
+        save_quotation(request.user, items)
 
         return Response({
             "message": "Quotation saved successfully"
@@ -135,8 +88,208 @@ class RequestOldQuotationView(APIView):
 class EmailQuotationView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @idempotent
     def post(self, request):
         # You can integrate Django Email / Celery later
         return Response({
             "message": "Quotation emailed successfully"
         })
+
+
+def analytics_since(request):
+    """
+    ?since=YYYY-MM-DD, defaults to the start of the current month
+    """
+    since = parse_date(request.query_params.get("since") or "")
+    if since is None:
+        return timezone.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    return timezone.make_aware(datetime.combine(since, time.min))
+
+
+class TopQuotedProductsView(APIView):
+    """
+    GET /quotation/analytics/products/?category=solar_panel&since=2026-01-01&limit=10
+    Most quoted catalog products, one GROUP BY over QuotationLine
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        lines = QuotationLine.objects.filter(
+            quoted_at__gte=analytics_since(request),
+            product__isnull=False,
+        )
+
+        category = request.query_params.get("category")
+        if category:
+            lines = lines.filter(product__category=category)
+
+        try:
+            limit = min(int(request.query_params.get("limit", 10)), 100)
+        except ValueError:
+            limit = 10
+
+        rows = (
+            lines.values("product_id", "product__company", "product__model", "product__category")
+            .annotate(
+                quotations=Count("quotation_id", distinct=True),
+                quantity=Sum("quantity"),
+                revenue=Sum("line_total"),
+            )
+            .order_by("-quotations", "-quantity")[:limit]
+        )
+
+        return Response([
+            {
+                "productId": row["product_id"],
+                "company": row["product__company"],
+                "model": row["product__model"],
+                "category": row["product__category"],
+                "quotations": row["quotations"],
+                "quantity": row["quantity"],
+                "revenue": row["revenue"],
+            }
+            for row in rows
+        ])
+
+
+class ItemSpendView(APIView):
+    """
+    GET /quotation/analytics/items/?since=2026-01-01
+    Average spend per quotation row (Panel, Inverter, Battery, ...)
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        rows = (
+            QuotationLine.objects.filter(quoted_at__gte=analytics_since(request))
+            .values("item_name")
+            .annotate(
+                lines=Count("id"),
+                averageLineTotal=Avg("line_total"),
+                averageUnitPrice=Avg("unit_price"),
+                total=Sum("line_total"),
+            )
+            .order_by("item_name")
+        )
+
+        return Response({
+            row.pop("item_name"): row
+            for row in rows
+        })
+
+
+class SalesSummaryView(APIView):
+    """
+    GET /quotation/analytics/summary/?days=30
+    Dashboard totals read from the summary tables, the cost does not
+    grow with the number of quotations
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        try:
+            days = max(1, min(int(request.query_params.get("days", 30)), 366))
+        except ValueError:
+            days = 30
+
+        since = timezone.localdate() - timedelta(days=days - 1)
+
+        daily = DailySalesSummary.objects.filter(day__gte=since, quotations__gt=0)
+        categories = CategorySummary.objects.order_by("category")
+        products = (
+            ProductSalesSummary.objects.filter(lines__gt=0)
+            .select_related("product")
+            .order_by("-revenue")[:10]
+        )
+
+        return Response({
+            "daily": [
+                {
+                    "day": row.day,
+                    "quotations": row.quotations,
+                    "quotedTotal": row.quoted_total,
+                }
+                for row in daily
+            ],
+            "categories": [
+                {
+                    "category": row.category,
+                    "products": row.products,
+                    "averagePrice": row.average_price,
+                }
+                for row in categories
+            ],
+            "topProducts": [
+                {
+                    "productId": row.product_id,
+                    "company": row.product.company,
+                    "model": row.product.model,
+                    "lines": row.lines,
+                    "quantity": row.quantity,
+                    "revenue": row.revenue,
+                }
+                for row in products
+            ],
+        })
+
+
+class BulkQuotationView(APIView):
+    """
+    POST /quotation/bulk/   multipart "file" with a CSV of sites
+                            (or JSON {"csv": "...", "name": "..."})
+    Sizes and prices every site, see bulk.py for the columns
+    """
+    permission_classes = [IsAuthenticated]
+
+    @idempotent
+    def post(self, request):
+        upload = request.FILES.get("file")
+        if upload is not None:
+            content, name = upload.read(), upload.name
+        else:
+            content, name = request.data.get("csv") or "", request.data.get("name") or ""
+
+        try:
+            sites = read_sites(content)
+        except (BulkQuotationError, UnicodeDecodeError) as error:
+            return Response({"error": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+
+        batch = create_batch(request.user, sites, name=name)
+
+        return Response({
+            **QuotationBatchSerializer(batch).data,
+            "summary": f"/quotation/bulk/{batch.pk}/summary/",
+        }, status=status.HTTP_201_CREATED)
+
+
+class QuotationBatchView(APIView):
+    """
+    GET /quotation/bulk/<id>/   the batch with every site quotation
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        batch = get_object_or_404(QuotationBatch, pk=pk, user=request.user)
+
+        return Response({
+            **QuotationBatchSerializer(batch).data,
+            "siteQuotations": SiteQuotationSerializer(batch.site_quotations.all(), many=True).data,
+        })
+
+
+class QuotationBatchSummaryView(APIView):
+    """
+    GET /quotation/bulk/<id>/summary/   one CSV row per site plus the total
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        batch = get_object_or_404(QuotationBatch, pk=pk, user=request.user)
+
+        response = HttpResponse(content_type="text/csv")
+        response["Content-Disposition"] = f'attachment; filename="quotation-batch-{batch.pk}.csv"'
+
+        writer = csv.writer(response)
+        writer.writerow(SUMMARY_FIELDS)
+        writer.writerows(summary_rows(batch))
+        return response
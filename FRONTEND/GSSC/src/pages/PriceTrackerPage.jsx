@@ -27,6 +27,22 @@ const PriceTrackerPage = () => {
     // eslint-disable-next-line react-hooks/exhaustive-deps
   }, [filter, currentPage])
 
+  // Price changes are pushed by the server instead of re-fetching the page
+  useEffect(() => {
+    const unsubscribe = priceTrackerAPI.subscribePrices(
+      filter,
+      (changes) => {
+        const prices = new Map(changes)
+        setData((rows) =>
+          rows.map((row) => (prices.has(row.id) ? { ...row, price: prices.get(row.id) } : row))
+        )
+      },
+      () => fetchData()
+    )
+    return unsubscribe
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [filter, currentPage])
+
   const fetchData = async () => {
     setLoading(true)
     setError(null)
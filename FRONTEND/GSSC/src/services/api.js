@@ -1,7 +1,8 @@
 import axios from 'axios'
 
-// Base URL for Django backend - adjust this to match your Django server
-const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000'
+// Base URL for Django backend - adjust this to match your Django server.
+// A production build is served by Django itself, same origin by default
+const API_BASE_URL = import.meta.env.VITE_API_BASE_URL ?? (import.meta.env.PROD ? '' : 'http://localhost:8000')
 
 // Create axios instance
 const api = axios.create({
@@ -192,6 +193,40 @@ export const priceTrackerAPI = {
     const response = await api.post('/price-tracker/update/')
     return response.data
   },
+
+  // Live price changes (Server-Sent Events), returns a function that closes the stream.
+  // onChange gets [[productId, price], ...], onResync means the page should be reloaded.
+  subscribePrices: (category, onChange, onResync) => {
+    const source = new EventSource(
+      `${API_BASE_URL}/price-tracker/stream/?category=${encodeURIComponent(category)}`
+    )
+    source.addEventListener('prices', (event) => onChange(JSON.parse(event.data).changes))
+    source.addEventListener('resync', () => onResync())
+    return () => source.close()
+  },
+}
+
+// Idempotency-Key per quotation action: a double click or a retry after a
+// network error reuses the key of the request still waiting for an answer,
+// so the backend runs it once and replays the response to the others.
+const pendingKeys = new Map()
+
+const postOnce = async (url, data) => {
+  const signature = `${url} ${JSON.stringify(data)}`
+  const key = pendingKeys.get(signature) || crypto.randomUUID()
+  pendingKeys.set(signature, key)
+
+  try {
+    const response = await api.post(url, data, { headers: { 'Idempotency-Key': key } })
+    pendingKeys.delete(signature)
+    return response
+  } catch (error) {
+    // Without a response the request may still have run, keep the key for the retry
+    if (error.response) {
+      pendingKeys.delete(signature)
+    }
+    throw error
+  }
 }
 
 // Quotation Generator API endpoints
@@ -204,7 +239,7 @@ export const quotationAPI = {
 
   // Calculate quotation - send table data, receive ROI and total price
   calculateQuotation: async (quotationData) => {
-    const response = await api.post('/quotation/calculate/', quotationData)
+    const response = await postOnce('/quotation/calculate/', quotationData)
     return response.data
   },
 
@@ -216,13 +251,13 @@ export const quotationAPI = {
 
   // Save current quotation
   saveQuotation: async (quotationData) => {
-    const response = await api.post('/quotation/save/', quotationData)
+    const response = await postOnce('/quotation/save/', quotationData)
     return response.data
   },
 
   // Email quotation
   emailQuotation: async (quotationData) => {
-    const response = await api.post('/quotation/email/', quotationData)
+    const response = await postOnce('/quotation/email/', quotationData)
     return response.data
   },
 }